@@ -8,9 +8,8 @@ import sys
 # Add app to path
 sys.path.insert(0, os.path.realpath(os.path.join(os.path.dirname(__file__), '..')))
 
-from app.core.database import Base
-from app.models.contact import ContactSubmission, ROICalculation
-from app.core.config import settings
+from app.core.database import Base, engine
+from app.models import casestudy, contact  # noqa: F401 - registers every table on Base.metadata
 
 config = context.config
 
@@ -20,7 +19,8 @@ if config.config_file_name is not None:
 target_metadata = Base.metadata
 
 def get_database_url():
-    return settings.DATABASE_URL
+    # The sync engine's URL; DATABASE_URL may name an async driver
+    return engine.url.render_as_string(hide_password=False)
 
 def run_migrations_offline() -> None:
     url = get_database_url()
@@ -0,0 +1,55 @@
+"""Make contact_submissions.email unique
+
+Contact step 1 and /submit insert with ON CONFLICT (email) DO NOTHING,
+which needs a unique index on email. Tables created before this revision
+only had a plain index, and may hold several rows per email; all but the
+furthest-along (then newest) row of each email are deleted first.
+
+Revision ID: 0001
+Revises: 
+Create Date: 2026-10-19 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0001'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+INDEX_NAME = "ix_contact_submissions_email"
+
+
+def _email_index():
+    indexes = sa.inspect(op.get_bind()).get_indexes("contact_submissions")
+    return next((index for index in indexes if index["name"] == INDEX_NAME), None)
+
+
+def upgrade() -> None:
+    index = _email_index()
+    if index is not None and index["unique"]:
+        # Created by create_all from the current models
+        return
+
+    op.execute("""
+        DELETE FROM contact_submissions WHERE id IN (
+            SELECT id FROM (
+                SELECT id, ROW_NUMBER() OVER (
+                    PARTITION BY email ORDER BY COALESCE(form_step, 0) DESC, id DESC
+                ) AS position
+                FROM contact_submissions
+            ) ranked
+            WHERE position > 1
+        )
+    """)
+    if index is not None:
+        op.drop_index(INDEX_NAME, table_name="contact_submissions")
+    op.create_index(INDEX_NAME, "contact_submissions", ["email"], unique=True)
+
+
+def downgrade() -> None:
+    op.drop_index(INDEX_NAME, table_name="contact_submissions")
+    op.create_index(INDEX_NAME, "contact_submissions", ["email"], unique=False)
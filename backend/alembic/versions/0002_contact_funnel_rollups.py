@@ -0,0 +1,83 @@
+"""Add contact_funnel_rollups
+
+Hourly per-step lead counts by UTM attribution, maintained by every
+contact step write. Backfilled from the submissions already stored: each
+lead counts towards steps 1 through its form_step, in the hour it was
+created.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-19 00:00:00.000000
+
+"""
+from collections import Counter
+from datetime import timezone
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0002'
+down_revision = '0001'
+branch_labels = None
+depends_on = None
+
+submissions = sa.table(
+    "contact_submissions",
+    sa.column("form_step", sa.Integer),
+    sa.column("created_at", sa.DateTime),
+    sa.column("utm_source", sa.String),
+    sa.column("utm_medium", sa.String),
+    sa.column("utm_campaign", sa.String)
+)
+
+
+def upgrade() -> None:
+    if sa.inspect(op.get_bind()).has_table("contact_funnel_rollups"):
+        return
+
+    rollups = op.create_table(
+        "contact_funnel_rollups",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("bucket_hour", sa.DateTime(), nullable=False),
+        sa.Column("utm_source", sa.String(length=100), nullable=False),
+        sa.Column("utm_medium", sa.String(length=100), nullable=False),
+        sa.Column("utm_campaign", sa.String(length=100), nullable=False),
+        sa.Column("form_step", sa.Integer(), nullable=False),
+        sa.Column("submissions", sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint(
+            "bucket_hour", "utm_source", "utm_medium", "utm_campaign", "form_step",
+            name="uq_contact_funnel_rollups_key"
+        )
+    )
+    op.create_index("ix_contact_funnel_rollups_id", "contact_funnel_rollups", ["id"], unique=False)
+
+    counts = Counter()
+    for row in op.get_bind().execute(sa.select(submissions).where(submissions.c.created_at.is_not(None))):
+        created_at = row.created_at
+        if created_at.tzinfo is not None:
+            created_at = created_at.astimezone(timezone.utc).replace(tzinfo=None)
+        bucket = created_at.replace(minute=0, second=0, microsecond=0)
+        attribution = (row.utm_source or "", row.utm_medium or "", row.utm_campaign or "")
+        for step in range(1, (row.form_step or 1) + 1):
+            counts[(bucket, *attribution, step)] += 1
+
+    if counts:
+        op.bulk_insert(rollups, [
+            {
+                "bucket_hour": bucket,
+                "utm_source": utm_source,
+                "utm_medium": utm_medium,
+                "utm_campaign": utm_campaign,
+                "form_step": step,
+                "submissions": total
+            }
+            for (bucket, utm_source, utm_medium, utm_campaign, step), total in counts.items()
+        ])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_contact_funnel_rollups_id", table_name="contact_funnel_rollups")
+    op.drop_table("contact_funnel_rollups")
@@ -0,0 +1,44 @@
+"""Add lead_change_events
+
+Append-only changelog of lead writes, replayed by the lead SSE feed. It
+starts empty: the feed only needs changes made from now on.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-19 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0003'
+down_revision = '0002'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    if sa.inspect(op.get_bind()).has_table("lead_change_events"):
+        return
+
+    op.create_table(
+        "lead_change_events",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("submission_id", sa.Integer(), nullable=False),
+        sa.Column("event_type", sa.String(length=20), nullable=False),
+        sa.Column("is_qualified", sa.Boolean(), nullable=True),
+        sa.Column("lead_score", sa.Integer(), nullable=True),
+        sa.Column("payload", sa.JSON(), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+        sa.PrimaryKeyConstraint("id")
+    )
+    op.create_index("ix_lead_change_events_id", "lead_change_events", ["id"], unique=False)
+    op.create_index("ix_lead_change_events_submission_id", "lead_change_events", ["submission_id"], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index("ix_lead_change_events_submission_id", table_name="lead_change_events")
+    op.drop_index("ix_lead_change_events_id", table_name="lead_change_events")
+    op.drop_table("lead_change_events")
@@ -0,0 +1,40 @@
+"""Add case_study_neighbors
+
+Precomputed top-k similar case studies. It starts empty; the similarity
+index fills it on the next application start (ensure_built).
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-19 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0004'
+down_revision = '0003'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    if sa.inspect(op.get_bind()).has_table("case_study_neighbors"):
+        return
+
+    op.create_table(
+        "case_study_neighbors",
+        sa.Column("case_study_id", sa.Integer(), nullable=False),
+        sa.Column("rank", sa.Integer(), nullable=False),
+        sa.Column("neighbor_id", sa.Integer(), nullable=False),
+        sa.Column("score", sa.Float(), nullable=False),
+        sa.Column("computed_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+        sa.ForeignKeyConstraint(["case_study_id"], ["case_studies.id"], ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(["neighbor_id"], ["case_studies.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("case_study_id", "rank")
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("case_study_neighbors")
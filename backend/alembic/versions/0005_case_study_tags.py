@@ -0,0 +1,40 @@
+"""Add case_study_tags
+
+Normalized technology and process type tags for indexed filtering. It
+starts empty; ensure_tags_built backfills it on the next application
+start.
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-19 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0005'
+down_revision = '0004'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    if sa.inspect(op.get_bind()).has_table("case_study_tags"):
+        return
+
+    op.create_table(
+        "case_study_tags",
+        sa.Column("case_study_id", sa.Integer(), nullable=False),
+        sa.Column("tag_type", sa.String(length=20), nullable=False),
+        sa.Column("tag", sa.String(length=100), nullable=False),
+        sa.ForeignKeyConstraint(["case_study_id"], ["case_studies.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("case_study_id", "tag_type", "tag")
+    )
+    op.create_index("ix_case_study_tags_lookup", "case_study_tags", ["tag_type", "tag", "case_study_id"], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index("ix_case_study_tags_lookup", table_name="case_study_tags")
+    op.drop_table("case_study_tags")
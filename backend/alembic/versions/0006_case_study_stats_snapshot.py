@@ -0,0 +1,55 @@
+"""Add case_study_stats_snapshot and case_study_industry_counts
+
+Running totals behind GET /case-studies/stats. Both start empty; the
+reconcile at the next application start recounts them from case_studies.
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-19 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0006'
+down_revision = '0005'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+
+    if not inspector.has_table("case_study_stats_snapshot"):
+        op.create_table(
+            "case_study_stats_snapshot",
+            sa.Column("id", sa.Integer(), nullable=False),
+            sa.Column("published_count", sa.Integer(), nullable=False),
+            sa.Column("featured_count", sa.Integer(), nullable=False),
+            sa.Column("industries_served", sa.Integer(), nullable=False),
+            sa.Column("cost_savings_sum", sa.Float(), nullable=False),
+            sa.Column("implementation_time_sum", sa.Float(), nullable=False),
+            sa.Column("implementation_time_count", sa.Integer(), nullable=False),
+            sa.Column("roi_percentage_sum", sa.Float(), nullable=False),
+            sa.Column("roi_percentage_count", sa.Integer(), nullable=False),
+            sa.Column("efficiency_gain_sum", sa.Float(), nullable=False),
+            sa.Column("efficiency_gain_count", sa.Integer(), nullable=False),
+            sa.Column("reconciled_at", sa.DateTime(timezone=True), nullable=True),
+            sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+            sa.PrimaryKeyConstraint("id")
+        )
+
+    if not inspector.has_table("case_study_industry_counts"):
+        op.create_table(
+            "case_study_industry_counts",
+            sa.Column("industry", sa.String(length=100), nullable=False),
+            sa.Column("published_count", sa.Integer(), nullable=False),
+            sa.PrimaryKeyConstraint("industry")
+        )
+
+
+def downgrade() -> None:
+    op.drop_table("case_study_industry_counts")
+    op.drop_table("case_study_stats_snapshot")
@@ -1,27 +1,168 @@
-from fastapi import APIRouter, Depends, HTTPException, Request, Query, status
+import asyncio
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, Query, status
+from pydantic import TypeAdapter
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func, and_, or_, Integer
+from sqlalchemy import select, func, and_, or_, literal, union_all, Integer
+from sqlalchemy.orm import selectinload
 from slowapi import Limiter
 from slowapi.util import get_remote_address
-from typing import List, Optional
+from typing import Dict, Iterable, List, Optional, Set
 
-from app.core.database import get_async_session
-from app.models.casestudy import CaseStudy, CaseStudyMetric, CaseStudyTimeline, CaseStudyInquiry, IndustryBenchmark
+from app.core.config import settings
+from app.core.database import get_async_session, AsyncSessionLocal, schema_columns
+from app.core.security import counted_by_view_beacon, require_view_beacon
+from app.models.casestudy import (
+    CaseStudy, CaseStudyMetric, CaseStudyTimeline, CaseStudyInquiry, CaseStudyNeighbor, CaseStudyTag,
+    IndustryBenchmark
+)
 from app.schemas.casestudy import (
     CaseStudyCreate,
     CaseStudyUpdate,
     CaseStudyResponse,
     CaseStudyListResponse,
+    CaseStudySearchResult,
     CaseStudyInquiryCreate,
     CaseStudyInquiryResponse,
     IndustryBenchmarkCreate,
     IndustryBenchmarkResponse,
     CaseStudyFilter,
-    CaseStudyStats
+    CaseStudyStats,
+    CaseStudyFacets
 )
+from app.utils.case_study_stats import case_study_stats_store
+from app.utils.counter_buffer import case_study_counters
+from app.utils.content_events import ContentChanges, register_change_listener
+from app.utils.response_cache import ResponseCache
+from app.utils.search import search_case_studies
+from app.utils.tags import TECHNOLOGY, PROCESS_TYPE
+from app.utils.server_timing import TimedRoute
+import logging
 
-router = APIRouter()
+router = APIRouter(route_class=TimedRoute)
 limiter = Limiter(key_func=get_remote_address)
+logger = logging.getLogger(__name__)
+
+# Serialized response bodies for the public read endpoints
+case_study_cache = ResponseCache(
+    max_entries=settings.CASE_STUDY_CACHE_MAX_ENTRIES,
+    ttl_seconds=settings.CASE_STUDY_CACHE_TTL_SECONDS
+)
+
+# Published slug -> case study id, so cached detail reads skip the lookup
+case_study_slugs: Dict[str, int] = {}
+
+CASE_STUDIES_TAG = "case_studies"
+BENCHMARKS_TAG = "benchmarks"
+
+case_study_list_adapter = TypeAdapter(List[CaseStudyListResponse])
+benchmark_list_adapter = TypeAdapter(List[IndustryBenchmarkResponse])
+search_result_adapter = TypeAdapter(List[CaseStudySearchResult])
+
+# List pages only need these; the long-form text columns stay in the table
+case_study_list_columns = schema_columns(CaseStudy, CaseStudyListResponse)
+benchmark_columns = schema_columns(IndustryBenchmark, IndustryBenchmarkResponse)
+
+def case_study_tag(case_study_id: int) -> str:
+    return f"case_study:{case_study_id}"
+
+def normalize_filter(value: Optional[str], fold_case: bool = True) -> Optional[str]:
+    """Canonical form of a filter value so equivalent queries share a cache entry"""
+    if value is None:
+        return None
+    value = value.strip()
+    if fold_case:
+        value = value.lower()
+    return value or None
+
+def case_study_filters(industry: Optional[str], company_size: Optional[str], technology: Optional[str],
+                       process_type: Optional[str], is_featured: Optional[bool], published_only: bool):
+    """WHERE clauses shared by the list and facet queries"""
+    conditions = []
+    if published_only:
+        conditions.append(CaseStudy.is_published == True)
+    if industry:
+        conditions.append(CaseStudy.industry.ilike(f"%{industry}%"))
+    if company_size:
+        conditions.append(CaseStudy.company_size.ilike(f"%{company_size}%"))
+    # Tag filters are semi-joins on the (tag_type, tag, case_study_id) index
+    for tag_type, tag in ((TECHNOLOGY, technology), (PROCESS_TYPE, process_type)):
+        if tag:
+            conditions.append(CaseStudy.id.in_(
+                select(CaseStudyTag.case_study_id).where(
+                    and_(CaseStudyTag.tag_type == tag_type, CaseStudyTag.tag == tag)
+                )
+            ))
+    if is_featured is not None:
+        conditions.append(CaseStudy.is_featured == is_featured)
+    return conditions
+
+def json_response(body: bytes) -> Response:
+    return Response(content=body, media_type="application/json")
+
+def case_study_detail_builder(db: AsyncSession, case_study_id: int):
+    """Build the detail document: the study, then its metrics and timeline in one query each"""
+    async def build():
+        query = select(CaseStudy).options(
+            selectinload(CaseStudy.metrics),
+            selectinload(CaseStudy.timeline_items)
+        ).where(
+            and_(CaseStudy.id == case_study_id, CaseStudy.is_published == True)
+        )
+        result = await db.execute(query)
+        case_study = result.scalar_one_or_none()
+        
+        if not case_study:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Case study not found"
+            )
+        
+        body = CaseStudyResponse.model_validate(case_study).model_dump_json().encode()
+        return body, (case_study_tag(case_study_id),)
+    return build
+
+async def rebuild_case_study_details(case_study_ids: Iterable[int]):
+    """Re-serialize changed detail documents so the next read is a cache hit"""
+    async with AsyncSessionLocal() as session:
+        for case_study_id in case_study_ids:
+            try:
+                await case_study_cache.get_or_build(
+                    ("detail", case_study_id),
+                    case_study_detail_builder(session, case_study_id)
+                )
+            except HTTPException:
+                # Deleted or unpublished; nothing to serve
+                pass
+            except Exception as e:
+                logger.error(f"Rebuilding case study {case_study_id} detail failed: {e}")
+
+# Strong references to in-flight rebuilds so they are not garbage collected
+_rebuild_tasks: Set[asyncio.Task] = set()
+
+def invalidate_case_study_cache(changes: ContentChanges):
+    """Drop cached reads affected by a committed case study or benchmark write"""
+    tags = []
+    if changes.case_study_ids:
+        tags.append(CASE_STUDIES_TAG)
+        tags.extend(case_study_tag(case_study_id) for case_study_id in changes.case_study_ids)
+        for slug, case_study_id in list(case_study_slugs.items()):
+            if case_study_id in changes.case_study_ids:
+                del case_study_slugs[slug]
+    if changes.benchmarks_changed:
+        tags.append(BENCHMARKS_TAG)
+    case_study_cache.invalidate_tags(tags)
+
+    if changes.case_study_ids:
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # Committed from a synchronous script; the next read rebuilds instead
+            return
+        task = loop.create_task(rebuild_case_study_details(sorted(changes.case_study_ids)))
+        _rebuild_tasks.add(task)
+        task.add_done_callback(_rebuild_tasks.discard)
+
+register_change_listener(invalidate_case_study_cache)
 
 @router.get("/", response_model=List[CaseStudyListResponse])
 async def get_case_studies(
@@ -35,36 +176,30 @@ async def get_case_studies(
     published_only: bool = Query(True),
     db: AsyncSession = Depends(get_async_session)
 ):
-    try:
-        query = select(CaseStudy)
-        
-        # Apply filters
-        if published_only:
-            query = query.where(CaseStudy.is_published == True)
-        
-        if industry:
-            query = query.where(CaseStudy.industry.ilike(f"%{industry}%"))
-        
-        if company_size:
-            query = query.where(CaseStudy.company_size.ilike(f"%{company_size}%"))
-        
-        if technology:
-            query = query.where(CaseStudy.technologies_used.contains([technology]))
-        
-        if process_type:
-            query = query.where(CaseStudy.process_types.contains([process_type]))
-            
-        if is_featured is not None:
-            query = query.where(CaseStudy.is_featured == is_featured)
+    # ilike filters are case-insensitive; tag matches are exact
+    industry = normalize_filter(industry)
+    company_size = normalize_filter(company_size)
+    technology = normalize_filter(technology, fold_case=False)
+    process_type = normalize_filter(process_type, fold_case=False)
+
+    async def build():
+        query = select(*case_study_list_columns).where(*case_study_filters(
+            industry, company_size, technology, process_type, is_featured, published_only
+        ))
         
         # Order by featured first, then by publish date
         query = query.order_by(CaseStudy.is_featured.desc(), CaseStudy.publish_date.desc())
         query = query.offset(skip).limit(limit)
         
         result = await db.execute(query)
-        case_studies = result.scalars().all()
+        case_studies = result.mappings().all()
         
-        return [CaseStudyListResponse.from_orm(cs) for cs in case_studies]
+        body = case_study_list_adapter.dump_json(case_study_list_adapter.validate_python(case_studies))
+        return body, (CASE_STUDIES_TAG,)
+
+    key = ("list", skip, limit, industry, company_size, technology, process_type, is_featured, published_only)
+    try:
+        return json_response(await case_study_cache.get_or_build(key, build))
         
     except Exception as e:
         raise HTTPException(
@@ -77,15 +212,19 @@ async def get_featured_case_studies(
     limit: int = Query(6, ge=1, le=20),
     db: AsyncSession = Depends(get_async_session)
 ):
-    try:
-        query = select(CaseStudy).where(
+    async def build():
+        query = select(*case_study_list_columns).where(
             and_(CaseStudy.is_featured == True, CaseStudy.is_published == True)
         ).order_by(CaseStudy.publish_date.desc()).limit(limit)
         
         result = await db.execute(query)
-        case_studies = result.scalars().all()
+        case_studies = result.mappings().all()
         
-        return [CaseStudyListResponse.from_orm(cs) for cs in case_studies]
+        body = case_study_list_adapter.dump_json(case_study_list_adapter.validate_python(case_studies))
+        return body, (CASE_STUDIES_TAG,)
+
+    try:
+        return json_response(await case_study_cache.get_or_build(("featured", limit), build))
         
     except Exception as e:
         raise HTTPException(
@@ -97,30 +236,15 @@ async def get_featured_case_studies(
 async def get_case_study_stats(
     db: AsyncSession = Depends(get_async_session)
 ):
+    async def build():
+        # One-row read of the incrementally maintained snapshot
+        stats = await case_study_stats_store.read(db)
+        
+        body = CaseStudyStats(**stats).model_dump_json().encode()
+        return body, (CASE_STUDIES_TAG,)
+
     try:
-        # Get aggregate statistics
-        stats_query = select(
-            func.count(CaseStudy.id).label('total_case_studies'),
-            func.sum(CaseStudy.cost_savings).label('total_cost_savings'),
-            func.avg(CaseStudy.implementation_time).label('avg_implementation_time'),
-            func.avg(CaseStudy.roi_percentage).label('avg_roi'),
-            func.avg(CaseStudy.efficiency_gain).label('avg_efficiency_gain'),
-            func.count(func.distinct(CaseStudy.industry)).label('industries_served'),
-            func.sum(func.cast(CaseStudy.is_featured, Integer)).label('featured_count')
-        ).where(CaseStudy.is_published == True)
-        
-        result = await db.execute(stats_query)
-        stats = result.first()
-        
-        return CaseStudyStats(
-            total_case_studies=stats.total_case_studies or 0,
-            total_cost_savings=stats.total_cost_savings or 0.0,
-            avg_implementation_time=stats.avg_implementation_time or 0.0,
-            avg_roi=stats.avg_roi or 0.0,
-            avg_efficiency_gain=stats.avg_efficiency_gain or 0.0,
-            industries_served=stats.industries_served or 0,
-            featured_count=stats.featured_count or 0
-        )
+        return json_response(await case_study_cache.get_or_build(("stats",), build))
         
     except Exception as e:
         raise HTTPException(
@@ -128,29 +252,128 @@ async def get_case_study_stats(
             detail="Failed to retrieve statistics"
         )
 
-@router.get("/{slug}", response_model=CaseStudyResponse)
-async def get_case_study_by_slug(
-    slug: str,
+@router.get("/facets", response_model=CaseStudyFacets)
+async def get_case_study_facets(
+    industry: Optional[str] = Query(None),
+    company_size: Optional[str] = Query(None),
+    technology: Optional[str] = Query(None),
+    process_type: Optional[str] = Query(None),
+    is_featured: Optional[bool] = Query(None),
+    published_only: bool = Query(True),
     db: AsyncSession = Depends(get_async_session)
 ):
+    industry = normalize_filter(industry)
+    company_size = normalize_filter(company_size)
+    technology = normalize_filter(technology, fold_case=False)
+    process_type = normalize_filter(process_type, fold_case=False)
+
+    async def build():
+        filtered = select(CaseStudy.id, CaseStudy.industry, CaseStudy.company_size).where(
+            *case_study_filters(industry, company_size, technology, process_type, is_featured, published_only)
+        ).cte("filtered")
+
+        # All four facets over the filtered set in one round trip
+        facet_query = union_all(
+            select(literal("industry").label("facet"), filtered.c.industry.label("value"), func.count().label("count"))
+            .group_by(filtered.c.industry),
+            select(literal("company_size"), filtered.c.company_size, func.count())
+            .group_by(filtered.c.company_size),
+            select(CaseStudyTag.tag_type, CaseStudyTag.tag, func.count())
+            .join(filtered, filtered.c.id == CaseStudyTag.case_study_id)
+            .group_by(CaseStudyTag.tag_type, CaseStudyTag.tag)
+        )
+        result = await db.execute(facet_query)
+
+        facets = {"industry": [], "company_size": [], TECHNOLOGY: [], PROCESS_TYPE: []}
+        for row in result:
+            facets[row.facet].append({"value": row.value, "count": row.count})
+        for counts in facets.values():
+            counts.sort(key=lambda c: (-c["count"], c["value"]))
+
+        body = CaseStudyFacets(
+            industries=facets["industry"],
+            company_sizes=facets["company_size"],
+            technologies=facets[TECHNOLOGY],
+            process_types=facets[PROCESS_TYPE]
+        ).model_dump_json().encode()
+        return body, (CASE_STUDIES_TAG,)
+
+    key = ("facets", industry, company_size, technology, process_type, is_featured, published_only)
     try:
-        query = select(CaseStudy).where(
-            and_(CaseStudy.slug == slug, CaseStudy.is_published == True)
+        return json_response(await case_study_cache.get_or_build(key, build))
+        
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to retrieve case study facets"
         )
-        result = await db.execute(query)
-        case_study = result.scalar_one_or_none()
+
+@router.get("/search", response_model=List[CaseStudySearchResult])
+async def search_case_studies_endpoint(
+    q: str = Query(..., min_length=1, max_length=200),
+    skip: int = Query(0, ge=0),
+    limit: int = Query(20, ge=1, le=100),
+    db: AsyncSession = Depends(get_async_session)
+):
+    # Matching is case-insensitive; highlights come from the stored text
+    q = " ".join(q.lower().split())
+
+    async def build():
+        hits = await search_case_studies(db, q, skip, limit)
+        return search_result_adapter.dump_json(search_result_adapter.validate_python(hits)), (CASE_STUDIES_TAG,)
+
+    try:
+        return json_response(await case_study_cache.get_or_build(("search", q, skip, limit), build))
         
-        if not case_study:
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to search case studies"
+        )
+
+async def published_case_study_id(db: AsyncSession, slug: str) -> int:
+    """Id of the published study with this slug, from the slug map when known"""
+    case_study_id = case_study_slugs.get(slug)
+    if case_study_id is None:
+        result = await db.execute(
+            select(CaseStudy.id).where(
+                and_(CaseStudy.slug == slug, CaseStudy.is_published == True)
+            )
+        )
+        case_study_id = result.scalar()
+        if case_study_id is None:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Case study not found"
             )
+        case_study_slugs[slug] = case_study_id
+    return case_study_id
+
+@router.get("/{slug}", response_model=CaseStudyResponse)
+async def get_case_study_by_slug(
+    slug: str,
+    request: Request,
+    db: AsyncSession = Depends(get_async_session)
+):
+    try:
+        case_study_id = await published_case_study_id(db, slug)
+
+        try:
+            body = await case_study_cache.get_or_build(
+                ("detail", case_study_id),
+                case_study_detail_builder(db, case_study_id)
+            )
+        except HTTPException:
+            # Unpublished since the slug was mapped
+            case_study_slugs.pop(slug, None)
+            raise
         
-        # Increment view count
-        case_study.view_count += 1
-        await db.commit()
+        # Counted in memory and written in batches; the read stays read-only.
+        # Reads nginx mirrored to the view beacon below are already counted.
+        if not counted_by_view_beacon(request):
+            case_study_counters.add_view(case_study_id)
         
-        return CaseStudyResponse.from_orm(case_study)
+        return json_response(body)
         
     except HTTPException:
         raise
@@ -160,6 +383,15 @@ async def get_case_study_by_slug(
             detail="Failed to retrieve case study"
         )
 
+@router.post("/{slug}/view", status_code=status.HTTP_204_NO_CONTENT, dependencies=[Depends(require_view_beacon)])
+async def record_case_study_view(
+    slug: str,
+    db: AsyncSession = Depends(get_async_session)
+):
+    """View beacon mirrored by nginx for detail reads, which it may serve from the static snapshot"""
+    case_study_counters.add_view(await published_case_study_id(db, slug))
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
+
 @router.post("/{case_study_id}/inquire", response_model=CaseStudyInquiryResponse)
 @limiter.limit("5/minute")
 async def create_case_study_inquiry(
@@ -170,11 +402,10 @@ async def create_case_study_inquiry(
 ):
     try:
         # Verify case study exists
-        case_study_query = select(CaseStudy).where(CaseStudy.id == case_study_id)
+        case_study_query = select(CaseStudy.id).where(CaseStudy.id == case_study_id)
         case_study_result = await db.execute(case_study_query)
-        case_study = case_study_result.scalar_one_or_none()
         
-        if not case_study:
+        if case_study_result.scalar() is None:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Case study not found"
@@ -197,8 +428,7 @@ async def create_case_study_inquiry(
         await db.refresh(db_inquiry)
         
         # Increment lead generation count for case study
-        case_study.lead_generation_count += 1
-        await db.commit()
+        case_study_counters.add_lead(case_study_id)
         
         return CaseStudyInquiryResponse.from_orm(db_inquiry)
         
@@ -217,8 +447,11 @@ async def get_industry_benchmarks(
     process_type: Optional[str] = Query(None),
     db: AsyncSession = Depends(get_async_session)
 ):
-    try:
-        query = select(IndustryBenchmark)
+    industry = normalize_filter(industry)
+    process_type = normalize_filter(process_type)
+
+    async def build():
+        query = select(*benchmark_columns)
         
         if industry:
             query = query.where(IndustryBenchmark.industry.ilike(f"%{industry}%"))
@@ -229,9 +462,15 @@ async def get_industry_benchmarks(
         query = query.order_by(IndustryBenchmark.industry, IndustryBenchmark.process_type)
         
         result = await db.execute(query)
-        benchmarks = result.scalars().all()
+        benchmarks = result.mappings().all()
         
-        return [IndustryBenchmarkResponse.from_orm(b) for b in benchmarks]
+        body = benchmark_list_adapter.dump_json(benchmark_list_adapter.validate_python(benchmarks))
+        return body, (BENCHMARKS_TAG,)
+
+    try:
+        return json_response(
+            await case_study_cache.get_or_build(("benchmarks", industry, process_type), build)
+        )
         
     except Exception as e:
         raise HTTPException(
@@ -246,33 +485,31 @@ async def get_similar_case_studies(
     db: AsyncSession = Depends(get_async_session)
 ):
     try:
-        # Get the current case study
-        current_query = select(CaseStudy).where(CaseStudy.id == case_study_id)
-        current_result = await db.execute(current_query)
-        current_case_study = current_result.scalar_one_or_none()
-        
-        if not current_case_study:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Case study not found"
-            )
-        
-        # Find similar case studies based on industry and company size
-        similar_query = select(CaseStudy).where(
+        # Neighbors are precomputed by the similarity index
+        similar_query = select(*case_study_list_columns).join(
+            CaseStudyNeighbor, CaseStudyNeighbor.neighbor_id == CaseStudy.id
+        ).where(
             and_(
-                CaseStudy.id != case_study_id,
-                CaseStudy.is_published == True,
-                or_(
-                    CaseStudy.industry == current_case_study.industry,
-                    CaseStudy.company_size == current_case_study.company_size
-                )
+                CaseStudyNeighbor.case_study_id == case_study_id,
+                CaseStudy.is_published == True
             )
-        ).order_by(CaseStudy.view_count.desc()).limit(limit)
+        ).order_by(CaseStudyNeighbor.rank).limit(limit)
         
         result = await db.execute(similar_query)
-        similar_studies = result.scalars().all()
+        similar_studies = result.mappings().all()
+        
+        if not similar_studies:
+            # Distinguish an unknown study from one without similar work
+            exists = await db.execute(select(CaseStudy.id).where(CaseStudy.id == case_study_id))
+            if exists.scalar() is None:
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail="Case study not found"
+                )
         
-        return [CaseStudyListResponse.from_orm(cs) for cs in similar_studies]
+        return json_response(case_study_list_adapter.dump_json(
+            case_study_list_adapter.validate_python(similar_studies)
+        ))
         
     except HTTPException:
         raise
@@ -280,4 +517,4 @@ async def get_similar_case_studies(
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Failed to retrieve similar case studies"
-        )
\ No newline at end of file
+        )
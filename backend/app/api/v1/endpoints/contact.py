@@ -1,12 +1,15 @@
-from fastapi import APIRouter, Depends, HTTPException, Request, status
+from fastapi import APIRouter, Depends, HTTPException, Header, Request, Response, Query, status
+from fastapi.responses import StreamingResponse
+from pydantic import TypeAdapter
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, update
 from slowapi import Limiter
 from slowapi.util import get_remote_address
-from typing import List
-import re
+from typing import List, Optional
+from datetime import datetime
 
-from app.core.database import get_async_session
+from app.core.database import get_async_session, dialect_insert, schema_columns
+from app.core.security import require_admin_token
 from app.models.contact import ContactSubmission
 from app.schemas.contact import (
     ContactSubmissionCreate,
@@ -20,32 +23,38 @@ from app.schemas.contact import (
 )
 from app.utils.lead_scoring import calculate_lead_score
 from app.utils.email import send_notification_email
+from app.utils.export import stream_export, export_headers, export_media_type, export_range
+from app.utils.email_filter import email_prefilter
+from app.utils.funnel import LEAD_ATTRIBUTION_COLUMNS, advance_funnel, record_funnel_progress, get_funnel_report
+from app.utils.lead_events import lead_event_hub, record_lead_change, stream_lead_events
+from app.utils.server_timing import TimedRoute
 
-# Input validation functions
-def validate_email_format(email: str) -> bool:
-    """Additional email validation beyond pydantic"""
-    pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
-    return bool(re.match(pattern, email))
+async def find_submission_id(db: AsyncSession, email: str):
+    """Look up the submission id registered for an email"""
+    result = await db.execute(select(ContactSubmission.id).where(ContactSubmission.email == email))
+    return result.scalar()
 
-def validate_phone_format(phone: str) -> bool:
-    """Validate phone number format"""
-    if not phone:
-        return True  # Optional field
-    # Allow international formats: +1234567890, (123) 456-7890, 123-456-7890, etc.
-    pattern = r'^[\+]?[\d\s\(\)\-]{10,20}$'
-    return bool(re.match(pattern, phone))
+async def insert_submission_if_new(db: AsyncSession, values: dict):
+    """Insert a submission unless its email is taken.
 
-def sanitize_input(text: str, max_length: int = 1000) -> str:
-    """Sanitize text input to prevent XSS and other attacks"""
-    if not text:
-        return ""
-    # Remove potential harmful characters but keep essential ones
-    sanitized = re.sub(r'[<>"\'\\/]', '', text)
-    return sanitized[:max_length].strip()
+    Returns the new row's funnel attribution (see LEAD_ATTRIBUTION_COLUMNS),
+    or None when the email already exists.
 
-router = APIRouter()
+    The unique index on email settles concurrent inserts, including ones
+    from other workers whose prefilters have not seen the email yet.
+    """
+    stmt = dialect_insert(ContactSubmission).values(**values).on_conflict_do_nothing(
+        index_elements=[ContactSubmission.email]
+    ).returning(*LEAD_ATTRIBUTION_COLUMNS)
+    result = await db.execute(stmt)
+    return result.first()
+
+router = APIRouter(route_class=TimedRoute)
 limiter = Limiter(key_func=get_remote_address)
 
+contact_list_adapter = TypeAdapter(List[ContactSubmissionResponse])
+contact_list_columns = schema_columns(ContactSubmission, ContactSubmissionResponse)
+
 @router.post("/submit", response_model=ContactSubmissionResponse)
 @limiter.limit("5/minute")
 async def submit_contact_form(
@@ -55,25 +64,52 @@ async def submit_contact_form(
 ):
     try:
         # Calculate lead score
-        lead_score = calculate_lead_score(contact_data.dict())
+        contact_values = contact_data.model_dump()
+        lead_score = calculate_lead_score(contact_values)
         is_qualified = lead_score >= 70
         
         # Get client info
         client_ip = request.client.host
         user_agent = request.headers.get("user-agent", "")
         
-        # Create contact submission
-        db_contact = ContactSubmission(
-            **contact_data.dict(),
-            lead_score=lead_score,
-            is_qualified=is_qualified,
-            ip_address=client_ip,
-            user_agent=user_agent
-        )
+        # Create contact submission, or complete the existing lead for this email
+        values = {
+            **contact_values,
+            "lead_score": lead_score,
+            "is_qualified": is_qualified,
+            "ip_address": client_ip,
+            "user_agent": user_agent
+        }
+        lead = await insert_submission_if_new(db, values)
+        event_type = "created"
+        if lead is None:
+            event_type = "updated"
+            result = await db.execute(
+                select(*LEAD_ATTRIBUTION_COLUMNS).where(ContactSubmission.email == contact_data.email)
+            )
+            lead = result.first()
+            # Only the fields this request set; stored ones it left out are
+            # kept, and form_step only moves forward (advance_funnel)
+            changes = {
+                **contact_data.model_dump(exclude_unset=True, exclude={"form_step"}),
+                "lead_score": lead_score,
+                "is_qualified": is_qualified,
+                "ip_address": client_ip,
+                "user_agent": user_agent
+            }
+            await db.execute(
+                update(ContactSubmission).where(ContactSubmission.id == lead.id).values(**changes)
+            )
+            await advance_funnel(db, lead, contact_data.form_step or 1)
+        else:
+            await record_funnel_progress(db, lead, 0, contact_data.form_step or 1)
+        submission_id = lead.id
         
-        db.add(db_contact)
+        db_contact = await db.get(ContactSubmission, submission_id, populate_existing=True)
+        event = await record_lead_change(db, submission_id, db_contact, event_type)
         await db.commit()
-        await db.refresh(db_contact)
+        email_prefilter.add(contact_data.email)
+        lead_event_hub.publish(event)
         
         # Send notification email (non-blocking)
         try:
@@ -98,50 +134,50 @@ async def submit_contact_step1(
     db: AsyncSession = Depends(get_async_session)
 ):
     try:
-        # Validate email format
-        if not validate_email_format(step_data.email):
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Invalid email format"
-            )
-        
-        # Sanitize inputs
-        step_data.first_name = sanitize_input(step_data.first_name, 100)
-        step_data.last_name = sanitize_input(step_data.last_name, 100)
-        
-        # Check if email already exists (using safe SQLAlchemy query)
-        stmt = select(ContactSubmission.id).where(ContactSubmission.email == step_data.email)
-        result = await db.execute(stmt)
-        existing_submission = result.first()
-        
-        if existing_submission:
+        # Only hit the database for emails the prefilter may have seen
+        existing_id = None
+        if email_prefilter.might_contain(step_data.email):
+            existing_id = await find_submission_id(db, step_data.email)
+        
+        if existing_id is None:
+            # Create initial submission
+            client_ip = request.client.host
+            user_agent = request.headers.get("user-agent", "")
+            
+            step_values = {
+                "first_name": step_data.first_name,
+                "last_name": step_data.last_name,
+                "email": step_data.email,
+                "form_step": 1,
+                "utm_source": step_data.utm_source,
+                "utm_medium": step_data.utm_medium,
+                "utm_campaign": step_data.utm_campaign,
+                "referrer": step_data.referrer,
+                "ip_address": client_ip,
+                "user_agent": user_agent
+            }
+            lead = await insert_submission_if_new(db, step_values)
+            if lead is None:
+                existing_id = await find_submission_id(db, step_data.email)
+            else:
+                submission_id = lead.id
+                await record_funnel_progress(db, lead, 0, 1)
+                event = await record_lead_change(db, submission_id, step_values, "created")
+                await db.commit()
+                lead_event_hub.publish(event)
+            email_prefilter.add(step_data.email)
+        
+        if existing_id is not None:
             return {
                 "status": "exists",
                 "message": "Email already registered",
-                "submission_id": existing_submission[0]
+                "submission_id": existing_id
             }
         
-        # Create initial submission
-        client_ip = request.client.host
-        user_agent = request.headers.get("user-agent", "")
-        
-        db_contact = ContactSubmission(
-            first_name=step_data.first_name,
-            last_name=step_data.last_name,
-            email=step_data.email,
-            form_step=1,
-            ip_address=client_ip,
-            user_agent=user_agent
-        )
-        
-        db.add(db_contact)
-        await db.commit()
-        await db.refresh(db_contact)
-        
         return {
             "status": "success",
             "message": "Step 1 completed",
-            "submission_id": db_contact.id
+            "submission_id": submission_id
         }
         
     except Exception as e:
@@ -160,19 +196,6 @@ async def update_contact_step2(
     db: AsyncSession = Depends(get_async_session)
 ):
     try:
-        # Validate phone format if provided
-        if step_data.phone and not validate_phone_format(step_data.phone):
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Invalid phone number format"
-            )
-        
-        # Sanitize inputs
-        step_data.company = sanitize_input(step_data.company, 255)
-        step_data.job_title = sanitize_input(step_data.job_title, 255)
-        if step_data.phone:
-            step_data.phone = sanitize_input(step_data.phone, 50)
-        
         stmt = select(ContactSubmission).where(ContactSubmission.id == submission_id)
         result = await db.execute(stmt)
         contact = result.first()
@@ -188,11 +211,13 @@ async def update_contact_step2(
             company=step_data.company,
             job_title=step_data.job_title,
             phone=step_data.phone,
-            company_size=step_data.company_size,
-            form_step=2
+            company_size=step_data.company_size
         )
         await db.execute(stmt)
+        await advance_funnel(db, contact[0], 2)
+        event = await record_lead_change(db, submission_id, contact[0], "updated")
         await db.commit()
+        lead_event_hub.publish(event)
         
         return {
             "status": "success",
@@ -221,10 +246,83 @@ async def get_contact_submissions(
     if limit > 100 or limit <= 0:
         limit = 100
     
-    stmt = select(ContactSubmission).order_by(ContactSubmission.created_at.desc()).offset(skip).limit(limit)
+    stmt = select(*contact_list_columns).order_by(ContactSubmission.created_at.desc()).offset(skip).limit(limit)
     result = await db.execute(stmt)
-    contacts = result.scalars().all()
-    return [ContactSubmissionResponse.from_attributes(contact) for contact in contacts]
+    contacts = result.mappings().all()
+    # Validated and serialized as one batch, straight from the row mappings
+    body = contact_list_adapter.dump_json(contact_list_adapter.validate_python(contacts))
+    return Response(content=body, media_type="application/json")
+
+@router.get("/export", dependencies=[Depends(require_admin_token)])
+async def export_contact_submissions(
+    export_format: str = Query("csv", alias="format", pattern="^(csv|ndjson)$"),
+    start_date: Optional[datetime] = Query(None),
+    end_date: Optional[datetime] = Query(None),
+    industry: Optional[str] = Query(None),
+    is_qualified: Optional[bool] = Query(None),
+    gzip: bool = Query(False)
+):
+    """Stream matching submissions as CSV or NDJSON without loading ORM objects.
+
+    Covers the last EXPORT_DEFAULT_DAYS unless start_date is given, and at
+    most EXPORT_MAX_DAYS.
+    """
+    try:
+        start, end = export_range(start_date, end_date)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    
+    stmt = select(*ContactSubmission.__table__.columns).where(
+        ContactSubmission.created_at >= start,
+        ContactSubmission.created_at < end
+    )
+    if industry:
+        stmt = stmt.where(ContactSubmission.industry == industry)
+    if is_qualified is not None:
+        stmt = stmt.where(ContactSubmission.is_qualified == is_qualified)
+    
+    stmt = stmt.order_by(ContactSubmission.id)
+    
+    return StreamingResponse(
+        stream_export(stmt, export_format, gzip),
+        media_type=export_media_type(export_format, gzip),
+        headers=export_headers("contact_submissions", export_format, gzip)
+    )
+
+@router.get("/stream", dependencies=[Depends(require_admin_token)])
+async def stream_leads(
+    qualified_only: bool = Query(False),
+    min_score: int = Query(0, ge=0, le=100),
+    last_event_id: Optional[int] = Header(None)
+):
+    """Server-Sent Events feed of new and updated leads for the sales dashboard"""
+    return StreamingResponse(
+        stream_lead_events(last_event_id, qualified_only, min_score),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@router.get("/analytics/funnel", response_model=dict)
+async def get_contact_funnel(
+    start_date: Optional[datetime] = Query(None),
+    end_date: Optional[datetime] = Query(None),
+    utm_source: Optional[str] = Query(None),
+    utm_medium: Optional[str] = Query(None),
+    utm_campaign: Optional[str] = Query(None),
+    group_by_utm: bool = Query(False),
+    db: AsyncSession = Depends(get_async_session)
+):
+    """Step-by-step conversion of the contact form, read from hourly rollups"""
+    try:
+        return await get_funnel_report(
+            db, start_date, end_date, utm_source, utm_medium, utm_campaign, group_by_utm
+        )
+        
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to retrieve funnel analytics"
+        )
 
 @router.put("/{submission_id}/step3", response_model=dict)
 @limiter.limit("10/minute")
@@ -235,9 +333,6 @@ async def update_contact_step3(
     db: AsyncSession = Depends(get_async_session)
 ):
     try:
-        # Sanitize inputs
-        step_data.industry = sanitize_input(step_data.industry, 100)
-        
         stmt = select(ContactSubmission).where(ContactSubmission.id == submission_id)
         result = await db.execute(stmt)
         contact = result.first()
@@ -252,11 +347,13 @@ async def update_contact_step3(
         stmt = update(ContactSubmission).where(ContactSubmission.id == submission_id).values(
             industry=step_data.industry,
             budget_range=step_data.budget_range,
-            project_timeline=step_data.project_timeline,
-            form_step=3
+            project_timeline=step_data.project_timeline
         )
         await db.execute(stmt)
+        await advance_funnel(db, contact[0], 3)
+        event = await record_lead_change(db, submission_id, contact[0], "updated")
         await db.commit()
+        lead_event_hub.publish(event)
         
         return {
             "status": "success",
@@ -282,10 +379,6 @@ async def update_contact_step4(
     db: AsyncSession = Depends(get_async_session)
 ):
     try:
-        # Sanitize inputs
-        step_data.project_description = sanitize_input(step_data.project_description, 5000)
-        step_data.specific_challenges = sanitize_input(step_data.specific_challenges, 5000)
-        
         stmt = select(ContactSubmission).where(ContactSubmission.id == submission_id)
         result = await db.execute(stmt)
         contact = result.first()
@@ -300,11 +393,13 @@ async def update_contact_step4(
         stmt = update(ContactSubmission).where(ContactSubmission.id == submission_id).values(
             project_description=step_data.project_description,
             ai_experience=step_data.ai_experience,
-            specific_challenges=step_data.specific_challenges,
-            form_step=4
+            specific_challenges=step_data.specific_challenges
         )
         await db.execute(stmt)
+        await advance_funnel(db, contact[0], 4)
+        event = await record_lead_change(db, submission_id, contact[0], "updated")
         await db.commit()
+        lead_event_hub.publish(event)
         
         return {
             "status": "success",
@@ -330,11 +425,6 @@ async def update_contact_step5(
     db: AsyncSession = Depends(get_async_session)
 ):
     try:
-        # Sanitize inputs
-        if step_data.current_ai_tools:
-            step_data.current_ai_tools = sanitize_input(step_data.current_ai_tools, 5000)
-        step_data.expected_outcomes = sanitize_input(step_data.expected_outcomes, 5000)
-        
         stmt = select(ContactSubmission).where(ContactSubmission.id == submission_id)
         result = await db.execute(stmt)
         contact = result.first()
@@ -374,12 +464,14 @@ async def update_contact_step5(
         stmt = update(ContactSubmission).where(ContactSubmission.id == submission_id).values(
             current_ai_tools=step_data.current_ai_tools,
             expected_outcomes=step_data.expected_outcomes,
-            form_step=5,
             lead_score=lead_score,
             is_qualified=is_qualified
         )
         await db.execute(stmt)
+        await advance_funnel(db, contact[0], 5)
+        event = await record_lead_change(db, submission_id, contact[0], "updated")
         await db.commit()
+        lead_event_hub.publish(event)
         
         # Send notification email (non-blocking)
         try:
@@ -1,30 +1,16 @@
-from fastapi import APIRouter, Depends, HTTPException, Request, status
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, Query, status
+from fastapi.responses import StreamingResponse
+from pydantic import TypeAdapter
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, update
 from slowapi import Limiter
 from slowapi.util import get_remote_address
-from typing import List
-import re
+from typing import List, Optional
+from datetime import datetime
 
-from app.core.database import get_async_session
+from app.core.database import get_async_session, schema_columns
+from app.core.security import require_admin_token
 from app.models.contact import ROICalculation
-
-# Input validation functions for ROI
-def validate_financial_input(value: float, field_name: str, min_val: float = 0) -> float:
-    """Validate financial inputs"""
-    if not isinstance(value, (int, float)) or value < min_val:
-        raise ValueError(f"{field_name} must be a positive number")
-    if value > 1e12:  # Prevent extremely large values
-        raise ValueError(f"{field_name} value too large")
-    return float(value)
-
-def sanitize_text_input(text: str, max_length: int = 100) -> str:
-    """Sanitize text inputs for ROI calculation"""
-    if not text:
-        return ""
-    # Remove harmful characters
-    sanitized = re.sub(r'[<>"\'\\/]', '', text)
-    return sanitized[:max_length].strip()
 from app.schemas.roi import (
     ROICalculationInput,
     ROICalculationResult,
@@ -36,10 +22,15 @@ from app.schemas.roi import (
 from app.utils.roi_calculator import calculate_roi, quick_roi_calculation
 from app.utils.advanced_roi import AdvancedROICalculator
 from app.utils.email import send_roi_report_email
+from app.utils.export import stream_export, export_headers, export_media_type, export_range
+from app.utils.server_timing import TimedRoute
 
-router = APIRouter()
+router = APIRouter(route_class=TimedRoute)
 limiter = Limiter(key_func=get_remote_address)
 
+roi_list_adapter = TypeAdapter(List[ROICalculationResponse])
+roi_list_columns = schema_columns(ROICalculation, ROICalculationResponse)
+
 @router.post("/calculate", response_model=ROICalculationResult)
 @limiter.limit("10/minute")
 async def calculate_roi_endpoint(
@@ -48,28 +39,8 @@ async def calculate_roi_endpoint(
     db: AsyncSession = Depends(get_async_session)
 ):
     try:
-        # Validate and sanitize inputs
-        roi_data = roi_input.dict()
-        
-        # Validate financial inputs
-        roi_data['current_revenue'] = validate_financial_input(roi_data['current_revenue'], 'Current revenue')
-        roi_data['current_costs'] = validate_financial_input(roi_data['current_costs'], 'Current costs')
-        roi_data['current_processing_time'] = validate_financial_input(roi_data['current_processing_time'], 'Processing time')
-        roi_data['volume_processed'] = validate_financial_input(roi_data['volume_processed'], 'Volume processed')
-        
-        if 'error_rate' in roi_data and roi_data['error_rate'] is not None:
-            roi_data['error_rate'] = validate_financial_input(roi_data['error_rate'], 'Error rate', 0)
-            if roi_data['error_rate'] > 100:
-                raise ValueError("Error rate cannot exceed 100%")
-        
-        if 'labor_costs' in roi_data and roi_data['labor_costs'] is not None:
-            roi_data['labor_costs'] = validate_financial_input(roi_data['labor_costs'], 'Labor costs')
-        
-        # Sanitize text inputs
-        roi_data['company'] = sanitize_text_input(roi_data.get('company', ''), 255)
-        roi_data['industry'] = sanitize_text_input(roi_data['industry'], 100)
-        roi_data['company_size'] = sanitize_text_input(roi_data['company_size'], 50)
-        roi_data['process_type'] = sanitize_text_input(roi_data['process_type'], 100)
+        # Inputs are validated and sanitized by the schema; unset optionals fall back to calculator defaults
+        roi_data = roi_input.model_dump(exclude_none=True)
         
         # Perform ROI calculation
         calculation_result = calculate_roi(roi_data)
@@ -77,16 +48,16 @@ async def calculate_roi_endpoint(
         # Save to database with validated data
         db_roi = ROICalculation(
             email=roi_input.email,
-            company=roi_data['company'],
-            industry=roi_data['industry'],
-            company_size=roi_data['company_size'],
-            current_revenue=roi_data['current_revenue'],
-            current_costs=roi_data['current_costs'],
-            process_type=roi_data['process_type'],
-            current_processing_time=roi_data['current_processing_time'],
-            volume_processed=roi_data['volume_processed'],
-            error_rate=roi_data.get('error_rate'),
-            labor_costs=roi_data.get('labor_costs'),
+            company=roi_input.company,
+            industry=roi_input.industry,
+            company_size=roi_input.company_size,
+            current_revenue=roi_input.current_revenue,
+            current_costs=roi_input.current_costs,
+            process_type=roi_input.process_type,
+            current_processing_time=roi_input.current_processing_time,
+            volume_processed=roi_input.volume_processed,
+            error_rate=roi_input.error_rate,
+            labor_costs=roi_input.labor_costs,
             potential_savings=calculation_result["potential_savings"],
             efficiency_gain=calculation_result["efficiency_gain"],
             payback_period=calculation_result["payback_period"],
@@ -122,15 +93,7 @@ async def quick_roi_calculation_endpoint(
     quick_input: ROIQuickCalculation
 ):
     try:
-        # Validate inputs for quick calculation
-        quick_data = quick_input.dict()
-        quick_data['monthly_volume'] = validate_financial_input(quick_data['monthly_volume'], 'Monthly volume', 1)
-        quick_data['hours_per_task'] = validate_financial_input(quick_data['hours_per_task'], 'Hours per task', 0.01)
-        
-        if 'hourly_rate' in quick_data and quick_data['hourly_rate'] is not None:
-            quick_data['hourly_rate'] = validate_financial_input(quick_data['hourly_rate'], 'Hourly rate', 1)
-        
-        result = quick_roi_calculation(quick_data)
+        result = quick_roi_calculation(quick_input.model_dump())
         return ROIQuickResult(**result)
         
     except Exception as e:
@@ -149,7 +112,8 @@ async def advanced_roi_calculation_endpoint(
     try:
         # Use advanced ROI calculator
         calculator = AdvancedROICalculator()
-        advanced_result = calculator.calculate_advanced_roi(roi_input.dict())
+        roi_data = roi_input.model_dump()
+        advanced_result = calculator.calculate_advanced_roi(roi_data)
         
         # Save to database with advanced metrics
         db_roi = ROICalculation(
@@ -169,7 +133,7 @@ async def advanced_roi_calculation_endpoint(
             payback_period=advanced_result["payback_period"],
             three_year_roi=advanced_result["three_year_roi"],
             implementation_cost=advanced_result["implementation_cost"],
-            calculation_inputs=roi_input.dict(),
+            calculation_inputs=roi_data,
             calculation_results=advanced_result
         )
         
@@ -208,10 +172,12 @@ async def get_roi_calculations(
         if limit > 100 or limit <= 0:
             limit = 100
             
-        stmt = select(ROICalculation).order_by(ROICalculation.created_at.desc()).offset(skip).limit(limit)
+        stmt = select(*roi_list_columns).order_by(ROICalculation.created_at.desc()).offset(skip).limit(limit)
         result = await db.execute(stmt)
-        calculations = result.scalars().all()
-        return [ROICalculationResponse.from_attributes(calc) for calc in calculations]
+        calculations = result.mappings().all()
+        # Validated and serialized as one batch, straight from the row mappings
+        body = roi_list_adapter.dump_json(roi_list_adapter.validate_python(calculations))
+        return Response(content=body, media_type="application/json")
         
     except Exception as e:
         raise HTTPException(
@@ -219,6 +185,39 @@ async def get_roi_calculations(
             detail="Failed to retrieve ROI calculations"
         )
 
+@router.get("/export", dependencies=[Depends(require_admin_token)])
+async def export_roi_calculations(
+    export_format: str = Query("csv", alias="format", pattern="^(csv|ndjson)$"),
+    start_date: Optional[datetime] = Query(None),
+    end_date: Optional[datetime] = Query(None),
+    industry: Optional[str] = Query(None),
+    gzip: bool = Query(False)
+):
+    """Stream matching ROI calculations as CSV or NDJSON without loading ORM objects.
+
+    Covers the last EXPORT_DEFAULT_DAYS unless start_date is given, and at
+    most EXPORT_MAX_DAYS.
+    """
+    try:
+        start, end = export_range(start_date, end_date)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    
+    stmt = select(*ROICalculation.__table__.columns).where(
+        ROICalculation.created_at >= start,
+        ROICalculation.created_at < end
+    )
+    if industry:
+        stmt = stmt.where(ROICalculation.industry == industry)
+    
+    stmt = stmt.order_by(ROICalculation.id)
+    
+    return StreamingResponse(
+        stream_export(stmt, export_format, gzip),
+        media_type=export_media_type(export_format, gzip),
+        headers=export_headers("roi_calculations", export_format, gzip)
+    )
+
 @router.get("/{calculation_id}", response_model=ROICalculationResponse)
 async def get_roi_calculation(
     calculation_id: int,
@@ -236,7 +235,7 @@ async def get_roi_calculation(
             )
         
         calculation_obj = calculation[0]
-        return ROICalculationResponse.from_attributes(calculation_obj)
+        return ROICalculationResponse.model_validate(calculation_obj)
         
     except HTTPException:
         raise
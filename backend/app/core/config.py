@@ -7,6 +7,9 @@ class Settings(BaseSettings):
     API_V1_STR: str = "/api/v1"
     PROJECT_NAME: str = "Dark Knight Technologies API"
     DEBUG: bool = True
+    DEBUG_TOKEN: str = ""  # X-Debug-Token for /debug endpoints; empty disables them
+    ADMIN_TOKEN: str = ""  # X-Admin-Token for lead exports and the lead feed; empty disables them
+    VIEW_BEACON_TOKEN: str = ""  # X-View-Beacon nginx sends with snapshot detail views; empty disables the beacon
     
     # CORS settings
     CORS_ORIGINS: List[str] = ["http://localhost:3000", "http://localhost:3001"]
@@ -22,6 +25,57 @@ class Settings(BaseSettings):
     RATE_LIMIT_REQUESTS: int = 10
     RATE_LIMIT_WINDOW: int = 60  # seconds
     
+    # Known-email prefilter (Bloom filter) settings
+    EMAIL_FILTER_CAPACITY: int = 100000
+    EMAIL_FILTER_ERROR_RATE: float = 0.01
+    
+    # Bulk export settings
+    EXPORT_DEFAULT_DAYS: int = 30  # range exported when no start_date is given
+    EXPORT_MAX_DAYS: int = 366  # longest range one export may cover
+    
+    # Lead SSE feed settings
+    LEAD_STREAM_BUFFER_SIZE: int = 100  # events buffered per subscriber
+    LEAD_STREAM_HEARTBEAT_SECONDS: int = 15
+    LEAD_STREAM_REPLAY_LIMIT: int = 500
+    LEAD_STREAM_REPLAY_MARGIN: int = 100  # ids below the highest sent that may still commit late
+    
+    # Case study response cache settings
+    CASE_STUDY_CACHE_MAX_ENTRIES: int = 1000
+    CASE_STUDY_CACHE_TTL_SECONDS: int = 300  # bounds staleness from other workers' writes
+    CASE_STUDY_COUNTER_FLUSH_SECONDS: float = 5.0  # view/lead counter write-behind interval
+    CASE_STUDY_STATS_RECONCILE_SECONDS: int = 3600  # full recompute of the stats snapshot
+    
+    # Similar case study index settings
+    SIMILAR_CASE_STUDIES_K: int = 10  # neighbors stored per study
+    SIMILARITY_MAX_FEATURES: int = 5000  # TF-IDF vocabulary size
+    
+    # Static case study snapshot for nginx; empty disables the publish hook
+    STATIC_SNAPSHOT_DIR: str = ""
+    
+    # Performance monitoring settings
+    REQUEST_METRICS_BUFFER_SIZE: int = 65536  # most recent requests kept for analytics
+    SERVER_TIMING_ENABLED: bool = True  # per-phase Server-Timing header on responses
+    SYSTEM_METRICS_INTERVAL_SECONDS: float = 15.0  # background host/process sampling
+    SYSTEM_METRICS_HISTORY_SIZE: int = 240  # samples kept for trend alerts (1h at 15s)
+    LOOP_MONITOR_INTERVAL_SECONDS: float = 0.1  # event-loop lag probe
+    LOOP_BLOCK_THRESHOLD_MS: float = 100.0  # stalls longer than this capture a stack
+    LOOP_LAG_WINDOW_SECONDS: int = 300
+    LOOP_BLOCK_LOG_SIZE: int = 100
+    METRICS_SHARD_DIR: str = ""  # per-worker metric files for server-wide reports; empty keeps them per worker
+    METRICS_SHARD_ROUTES: int = 256  # route slots per worker file
+    
+    # Query instrumentation settings
+    SLOW_QUERY_THRESHOLD_MS: float = 100.0
+    SLOW_QUERY_LOG_SIZE: int = 200  # recent slow statements kept for /debug/queries
+    N_PLUS_ONE_THRESHOLD: int = 5  # repeats of one statement within a request
+    QUERY_FINGERPRINT_LIMIT: int = 1000  # distinct statements tracked before folding into <other>
+    
+    # Profiler settings (/debug/profile and X-Debug-Profile requests)
+    PROFILER_SAMPLE_HZ: int = 100
+    PROFILER_MAX_SECONDS: int = 60
+    REQUEST_PROFILE_STORE_SIZE: int = 20  # X-Debug-Profile results kept in memory
+    REQUEST_PROFILE_TOP_FUNCTIONS: int = 30
+    
     class Config:
         env_file = ".env"
 
@@ -1,26 +1,32 @@
 from sqlalchemy import create_engine, text
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
 from app.core.config import settings
+from app.core.serialization import json_dumps_str, json_loads
 import asyncio
 import logging
 
 logger = logging.getLogger(__name__)
 
+# JSON columns (calculation_inputs, technologies_used, ...) share the response encoder
+JSON_ENGINE_OPTIONS = {"json_serializer": json_dumps_str, "json_deserializer": json_loads}
+
 # Sync engine for migrations
 if "sqlite" in settings.DATABASE_URL:
-    engine = create_engine(settings.DATABASE_URL.replace("sqlite+aiosqlite://", "sqlite://"))
+    engine = create_engine(settings.DATABASE_URL.replace("sqlite+aiosqlite://", "sqlite://"), **JSON_ENGINE_OPTIONS)
 else:
-    engine = create_engine(settings.DATABASE_URL.replace("postgresql://", "postgresql://"))
+    engine = create_engine(settings.DATABASE_URL.replace("postgresql://", "postgresql://"), **JSON_ENGINE_OPTIONS)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 # Async engine for FastAPI
 if "sqlite" in settings.DATABASE_URL:
-    async_engine = create_async_engine(settings.DATABASE_URL)
+    async_engine = create_async_engine(settings.DATABASE_URL, **JSON_ENGINE_OPTIONS)
 else:
     async_engine = create_async_engine(
-        settings.DATABASE_URL.replace("postgresql://", "postgresql+asyncpg://")
+        settings.DATABASE_URL.replace("postgresql://", "postgresql+asyncpg://"),
+        **JSON_ENGINE_OPTIONS
     )
 AsyncSessionLocal = async_sessionmaker(
     async_engine, class_=AsyncSession, expire_on_commit=False
@@ -35,6 +41,21 @@ async def get_async_session():
         finally:
             await session.close()
 
+def dialect_insert(table):
+    """INSERT construct supporting ON CONFLICT for the configured backend"""
+    if "sqlite" in settings.DATABASE_URL:
+        return sqlite.insert(table)
+    return postgresql.insert(table)
+
+def schema_columns(model, schema):
+    """The model's columns named by a response schema's fields, in field order.
+
+    Selecting these instead of the entity skips unused (often large) columns
+    and ORM identity-map bookkeeping; rows validate straight into the schema.
+    """
+    columns = model.__table__.columns
+    return [columns[name] for name in schema.model_fields if name in columns]
+
 def get_sync_session():
     db = SessionLocal()
     try:
@@ -0,0 +1,34 @@
+"""Access control for operator-only endpoints."""
+import hmac
+from typing import Optional
+
+from fastapi import Header, HTTPException, Request, status
+
+from app.core.config import settings
+
+def _check_token(presented: Optional[str], expected: str, name: str):
+    # An unset token disables the endpoints: they answer 404, as if they did not exist
+    if not expected:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+    if presented is None or not hmac.compare_digest(presented, expected):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail=f"Invalid {name} token")
+
+def require_debug_token(x_debug_token: Optional[str] = Header(None)):
+    """Dependency for /debug endpoints: the X-Debug-Token header must match DEBUG_TOKEN"""
+    _check_token(x_debug_token, settings.DEBUG_TOKEN, "debug")
+
+def require_admin_token(x_admin_token: Optional[str] = Header(None)):
+    """Dependency for endpoints returning lead PII in bulk: X-Admin-Token must match ADMIN_TOKEN"""
+    _check_token(x_admin_token, settings.ADMIN_TOKEN, "admin")
+
+def require_view_beacon(x_view_beacon: Optional[str] = Header(None)):
+    """Dependency for the view beacon nginx mirrors detail reads to: X-View-Beacon must match VIEW_BEACON_TOKEN"""
+    _check_token(x_view_beacon, settings.VIEW_BEACON_TOKEN, "view beacon")
+
+def counted_by_view_beacon(request: Request) -> bool:
+    """Whether nginx vouches that this detail read was already counted by the view beacon"""
+    presented = request.headers.get("x-view-beacon")
+    return (
+        bool(settings.VIEW_BEACON_TOKEN) and presented is not None
+        and hmac.compare_digest(presented, settings.VIEW_BEACON_TOKEN)
+    )
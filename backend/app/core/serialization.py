@@ -0,0 +1,73 @@
+"""JSON encoding for HTTP responses and the engines' JSON columns.
+
+Uses orjson when it is installed and the standard library otherwise. Both
+produce the same document: compact separators, ISO 8601 dates and times,
+and null for NaN/Infinity (which are not valid JSON).
+"""
+import json
+import math
+from datetime import date, datetime, time
+from decimal import Decimal
+from typing import Any
+from uuid import UUID
+
+from starlette.responses import JSONResponse as StarletteJSONResponse
+
+try:
+    import orjson
+except ImportError:  # standard library fallback
+    orjson = None
+
+JSON_BACKEND = "orjson" if orjson is not None else "json"
+
+def _default(value: Any) -> Any:
+    """Types neither encoder handles natively"""
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, (set, frozenset)):
+        return list(value)
+    if orjson is None:
+        if isinstance(value, (datetime, date, time)):
+            return value.isoformat()
+        if isinstance(value, UUID):
+            return str(value)
+    if hasattr(value, "tolist"):  # numpy scalars and arrays
+        return value.tolist()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+def _finite(value: Any) -> Any:
+    if isinstance(value, float):
+        return value if math.isfinite(value) else None
+    if isinstance(value, dict):
+        return {key: _finite(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_finite(item) for item in value]
+    return value
+
+if orjson is not None:
+    _OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+    def json_dumps(value: Any) -> bytes:
+        return orjson.dumps(value, default=_default, option=_OPTIONS)
+
+    json_loads = orjson.loads
+else:
+    def json_dumps(value: Any) -> bytes:
+        try:
+            text = json.dumps(value, default=_default, separators=(",", ":"), ensure_ascii=False, allow_nan=False)
+        except ValueError:
+            # Rare path: only documents carrying NaN/Infinity pay for the walk
+            text = json.dumps(_finite(value), default=_default, separators=(",", ":"), ensure_ascii=False)
+        return text.encode("utf-8")
+
+    json_loads = json.loads
+
+def json_dumps_str(value: Any) -> str:
+    """Engine json_serializer; drivers bind JSON parameters as text"""
+    return json_dumps(value).decode("utf-8")
+
+class JSONResponse(StarletteJSONResponse):
+    """Default response class; renders with json_dumps"""
+
+    def render(self, content: Any) -> bytes:
+        return json_dumps(content)
@@ -1,4 +1,4 @@
-from fastapi import FastAPI
+from fastapi import Depends, FastAPI, HTTPException, Query, Response, status
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
 from slowapi import Limiter, _rate_limit_exceeded_handler
@@ -7,7 +7,29 @@ from slowapi.errors import RateLimitExceeded
 
 from app.core.config import settings
 from app.api.v1.api import api_router
-from app.core.database import test_database_connection, check_database_tables, get_database_stats
+from app.api.v1.endpoints.casestudy import case_study_cache
+from app.snapshot import snapshot_builder
+from app.core.security import require_debug_token
+from app.core.serialization import JSONResponse, JSON_BACKEND
+from app.core.database import async_engine, engine, test_database_connection, check_database_tables, get_database_stats
+from app.utils.case_study_stats import case_study_stats_store
+from app.utils.counter_buffer import case_study_counters
+from app.utils.email_filter import email_prefilter
+from app.utils.lead_events import lead_event_hub
+from app.utils.loop_monitor import event_loop_monitor
+from app.utils.metrics import PROMETHEUS_CONTENT_TYPE, MetricsWriter, register_collector, render_metrics
+from app.utils.performance_monitor import RequestTimingMiddleware, performance_monitor
+from app.utils.profiler import sampling_profiler
+from app.utils.query_stats import query_stats
+from app.utils.request_profiler import request_profiles
+from app.utils.search import ensure_search_index
+from app.utils.server_timing import TimedRoute
+from app.utils.similarity import similarity_index
+from app.utils.system_metrics import system_metrics_sampler
+from app.utils.tags import ensure_tags_built
+import logging
+
+logger = logging.getLogger(__name__)
 
 limiter = Limiter(key_func=get_remote_address)
 
@@ -16,8 +38,12 @@ app = FastAPI(
     version="1.0.0",
     description="Backend API for Dark Knight Technologies AI/MLOps consultancy website",
     openapi_url=f"{settings.API_V1_STR}/openapi.json" if settings.DEBUG else None,
+    default_response_class=JSONResponse,
 )
 
+# Health and debug routes mark Server-Timing phases like the API routers
+app.router.route_class = TimedRoute
+
 app.state.limiter = limiter
 app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
 
@@ -28,6 +54,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["GET", "POST", "PUT", "DELETE", "OPTIONS"],
     allow_headers=["*"],
+    expose_headers=["Server-Timing"],
 )
 
 # Security middleware
@@ -36,9 +63,186 @@ app.add_middleware(
     allowed_hosts=["localhost", "127.0.0.1", "*.darkknight.tech"] if not settings.DEBUG else ["*"]
 )
 
+# Request timing; added last so it wraps the other middleware too
+app.add_middleware(RequestTimingMiddleware, monitor=performance_monitor)
+
 # Include API router
 app.include_router(api_router, prefix=settings.API_V1_STR)
 
+@app.on_event("startup")
+async def start_event_loop_monitor():
+    """First, so blocking work in the other startup hooks is caught too"""
+    event_loop_monitor.start()
+
+@app.on_event("startup")
+async def build_email_prefilter():
+    """Load known contact emails so step 1 can skip lookups for new ones"""
+    try:
+        await email_prefilter.rebuild()
+    except Exception as e:
+        # Without a filter every email is treated as possibly known
+        logger.error(f"Email prefilter rebuild failed: {e}")
+
+@app.on_event("startup")
+async def build_search_index():
+    """Create the case study full-text index on first start"""
+    try:
+        async with async_engine.begin() as conn:
+            await ensure_search_index(conn)
+    except Exception as e:
+        logger.error(f"Case study search index setup failed: {e}")
+
+@app.on_event("startup")
+async def build_case_study_tags():
+    """Backfill the normalized tag table used for filtering and facets"""
+    try:
+        await ensure_tags_built()
+    except Exception as e:
+        logger.error(f"Case study tag backfill failed: {e}")
+
+@app.on_event("startup")
+async def build_similarity_index():
+    """Precompute similar case studies if none are stored yet"""
+    try:
+        await similarity_index.ensure_built()
+    except Exception as e:
+        logger.error(f"Similarity index build failed: {e}")
+
+@app.on_event("startup")
+async def reconcile_case_study_stats():
+    """Recompute the stats snapshot, then keep reconciling periodically"""
+    try:
+        await case_study_stats_store.reconcile()
+    except Exception as e:
+        logger.error(f"Case study stats reconciliation failed: {e}")
+    case_study_stats_store.start()
+
+@app.on_event("startup")
+async def start_counter_flush():
+    case_study_counters.start()
+
+@app.on_event("startup")
+async def start_system_metrics_sampler():
+    system_metrics_sampler.start()
+
+@app.on_event("startup")
+async def open_metrics_shard():
+    """Per worker, so each one writes its own file"""
+    if settings.METRICS_SHARD_DIR:
+        try:
+            performance_monitor.open_shard(settings.METRICS_SHARD_DIR, settings.METRICS_SHARD_ROUTES)
+        except OSError as e:
+            logger.error(f"Metrics shard setup failed, reporting this worker only: {e}")
+
+@app.on_event("shutdown")
+async def flush_counters():
+    """Write buffered view and lead counts before the worker exits"""
+    try:
+        await case_study_counters.stop()
+    except Exception as e:
+        logger.error(f"Final case study counter flush failed: {e}")
+    await case_study_stats_store.stop()
+    await system_metrics_sampler.stop()
+    await event_loop_monitor.stop()
+    performance_monitor.close_shard()
+
+def collect_service_metrics(writer: MetricsWriter):
+    """Connection pools, caches and in-process queues for /metrics"""
+    pools = [(name, e.pool) for name, e in (("async", async_engine), ("sync", engine)) if hasattr(e.pool, "checkedout")]
+    for metric, help_text, read in (
+        ("db_pool_size", "Configured connections kept in the pool", lambda pool: pool.size()),
+        ("db_pool_checked_out", "Connections currently in use", lambda pool: pool.checkedout()),
+        ("db_pool_checked_in", "Idle connections in the pool", lambda pool: pool.checkedin()),
+        ("db_pool_overflow", "Connections opened beyond the pool size", lambda pool: max(pool.overflow(), 0))
+    ):
+        writer.family(metric, "gauge", help_text)
+        for name, pool in pools:
+            writer.sample(metric, read(pool), {"engine": name})
+    
+    cache = {"cache": "case_study"}
+    writer.counter("response_cache_hits_total", "Reads served from the response cache", case_study_cache.hits, cache)
+    writer.counter("response_cache_misses_total", "Reads that built the response", case_study_cache.misses, cache)
+    writer.counter("response_cache_coalesced_total", "Reads that waited on an in-flight build",
+                   case_study_cache.coalesced, cache)
+    writer.gauge("response_cache_entries", "Responses held in the cache", len(case_study_cache.entries), cache)
+    writer.gauge("response_cache_hit_ratio", "Share of reads not building the response",
+                 case_study_cache.stats()['hit_ratio'], cache)
+    writer.counter("email_prefilter_lookups_total", "Known-email prefilter checks", email_prefilter.lookups)
+    writer.counter("email_prefilter_skipped_total", "Database lookups skipped by the prefilter",
+                   email_prefilter.negatives)
+    
+    lead_stream = lead_event_hub.stats()
+    writer.gauge("lead_stream_subscribers", "Connected lead feed subscribers", lead_stream["subscribers"])
+    writer.gauge("lead_stream_buffered_events", "Events queued for lead feed subscribers", lead_stream["buffered_events"])
+    writer.counter("lead_stream_published_total", "Lead events published", lead_stream["published"])
+    writer.counter("lead_stream_overflows_total", "Subscriber queues that overflowed", lead_stream["overflows"])
+    writer.gauge("case_study_counter_pending_rows", "Case studies with unflushed view/lead counts",
+                 len(case_study_counters.views.keys() | case_study_counters.leads.keys()))
+    writer.counter("case_study_counter_flushes_total", "Counter buffer flushes", case_study_counters.flushes)
+    writer.counter("case_study_counter_failed_flushes_total", "Counter buffer flushes that failed",
+                   case_study_counters.failed_flushes)
+    writer.gauge("similarity_rebuild_pending", "Similarity index rebuild queued", similarity_index.pending)
+    if snapshot_builder is not None:
+        writer.gauge("static_snapshot_build_pending", "Static snapshot build queued", snapshot_builder.pending)
+
+register_collector(performance_monitor.collect_metrics)
+register_collector(query_stats.collect_metrics)
+register_collector(collect_service_metrics)
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Prometheus scrape endpoint; rendered from in-memory state only"""
+    return Response(content=render_metrics(), media_type=PROMETHEUS_CONTENT_TYPE)
+
+@app.get("/debug/queries", include_in_schema=False, dependencies=[Depends(require_debug_token)])
+async def debug_queries(limit: int = Query(20, ge=1, le=200)):
+    """Statement fingerprints, per-route query counts, N+1s and slow queries"""
+    return query_stats.report(limit)
+
+@app.get("/debug/profile", include_in_schema=False, dependencies=[Depends(require_debug_token)])
+async def debug_profile(
+    seconds: float = Query(10, gt=0, le=settings.PROFILER_MAX_SECONDS),
+    hz: int = Query(settings.PROFILER_SAMPLE_HZ, ge=1, le=1000),
+    include_idle: bool = Query(False)
+):
+    """Sample every thread's stack; returns collapsed stacks for flamegraph.pl or speedscope"""
+    if sampling_profiler.running:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="A profile is already running")
+    result = await sampling_profiler.profile(seconds, hz, include_idle)
+    return Response(
+        content=sampling_profiler.collapsed(result['stacks']),
+        media_type="text/plain; charset=utf-8",
+        headers={
+            "X-Profile-Samples": str(result['samples']),
+            "X-Profile-Sampling-Ms": str(result['sampling_ms_per_tick'])
+        }
+    )
+
+@app.get("/debug/requests", include_in_schema=False, dependencies=[Depends(require_debug_token)])
+async def debug_request_profiles():
+    """Requests profiled with X-Debug-Profile, newest first"""
+    return request_profiles.list()
+
+@app.get("/debug/requests/{profile_id}", include_in_schema=False, dependencies=[Depends(require_debug_token)])
+async def debug_request_profile(profile_id: str):
+    """Top functions, allocation deltas and DB statements of one profiled request"""
+    profile = request_profiles.get(profile_id)
+    if profile is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Profile not found")
+    return profile
+
+@app.get("/debug/requests/{profile_id}/pstats", include_in_schema=False, dependencies=[Depends(require_debug_token)])
+async def debug_request_pstats(profile_id: str):
+    """Raw cProfile stats, loadable with pstats.Stats or snakeviz"""
+    data = request_profiles.pstats_data(profile_id)
+    if data is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Profile not found")
+    return Response(
+        content=data,
+        media_type="application/octet-stream",
+        headers={"Content-Disposition": f'attachment; filename="{profile_id}.prof"'}
+    )
+
 @app.get("/")
 async def root():
     return {"message": "Dark Knight Technologies API", "version": "1.0.0", "status": "active"}
@@ -47,6 +251,26 @@ async def root():
 async def health_check():
     return {"status": "healthy", "service": "dark-knight-api"}
 
+@app.get("/health/requests")
+async def request_health_check(minutes: int = Query(60, ge=1, le=1440)):
+    """Request volume, error rate and latency per route template"""
+    return performance_monitor.get_request_analytics(minutes)
+
+@app.get("/health/latency")
+async def latency_health_check():
+    """p50/p95/p99 per route over the last 1m, 5m and 1h"""
+    return performance_monitor.get_latency_report()
+
+@app.get("/health/phases")
+async def phase_health_check():
+    """Average validation, db, compute, serialize and side-effect time per route"""
+    return performance_monitor.get_phase_report()
+
+@app.get("/health/event-loop")
+async def event_loop_health_check(limit: int = Query(10, ge=1, le=100)):
+    """Event-loop lag percentiles and the call sites that blocked it"""
+    return performance_monitor.get_event_loop_report(limit)
+
 @app.get("/health/database")
 async def database_health_check():
     """Comprehensive database health check"""
@@ -83,10 +307,23 @@ async def detailed_health_check():
             "roi_calculator": "operational",
             "case_studies": "operational"
         },
+        "email_prefilter": email_prefilter.stats(),
+        "lead_stream": lead_event_hub.stats(),
+        "case_study_cache": case_study_cache.stats(),
+        "case_study_counters": case_study_counters.stats(),
+        "similarity_index": similarity_index.stats(),
+        "case_study_stats": case_study_stats_store.stats(),
+        "static_snapshot": snapshot_builder.stats() if snapshot_builder else {"status": "disabled"},
+        "system_metrics": system_metrics_sampler.latest,
+        "system_sampler": system_metrics_sampler.stats(),
+        "profiler": sampling_profiler.stats(),
+        "event_loop": event_loop_monitor.stats(),
+        "request_profiles": request_profiles.stats(),
         "features": {
             "rate_limiting": "enabled",
             "cors": "configured",
             "security": "enhanced",
-            "validation": "strict"
+            "validation": "strict",
+            "json_backend": JSON_BACKEND
         }
     }
\ No newline at end of file
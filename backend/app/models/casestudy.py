@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, Boolean, JSON, Float, ForeignKey
+from sqlalchemy import Column, Integer, String, Text, DateTime, Boolean, JSON, Float, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.core.database import Base
@@ -54,14 +54,20 @@ class CaseStudy(Base):
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     
     # Relationships
-    metrics = relationship("CaseStudyMetric", back_populates="case_study", cascade="all, delete-orphan")
-    timeline_items = relationship("CaseStudyTimeline", back_populates="case_study", cascade="all, delete-orphan")
+    metrics = relationship(
+        "CaseStudyMetric", back_populates="case_study", cascade="all, delete-orphan",
+        order_by="CaseStudyMetric.display_order"
+    )
+    timeline_items = relationship(
+        "CaseStudyTimeline", back_populates="case_study", cascade="all, delete-orphan",
+        order_by="CaseStudyTimeline.phase_order"
+    )
 
 class CaseStudyMetric(Base):
     __tablename__ = "case_study_metrics"
 
     id = Column(Integer, primary_key=True, index=True)
-    case_study_id = Column(Integer, ForeignKey("case_studies.id"), nullable=False)
+    case_study_id = Column(Integer, ForeignKey("case_studies.id"), nullable=False, index=True)
     
     metric_name = Column(String(255), nullable=False)  # "Cost Reduction", "Time Saved", etc.
     metric_value = Column(String(100), nullable=False)  # "85%", "$2.3M", "1,200 hours"
@@ -78,7 +84,7 @@ class CaseStudyTimeline(Base):
     __tablename__ = "case_study_timeline"
 
     id = Column(Integer, primary_key=True, index=True)
-    case_study_id = Column(Integer, ForeignKey("case_studies.id"), nullable=False)
+    case_study_id = Column(Integer, ForeignKey("case_studies.id"), nullable=False, index=True)
     
     phase_name = Column(String(255), nullable=False)  # "Discovery", "Development", "Deployment"
     phase_description = Column(Text, nullable=False)
@@ -142,4 +148,56 @@ class IndustryBenchmark(Base):
     data_sources = Column(JSON, nullable=True)
     
     created_at = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
\ No newline at end of file
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+
+class CaseStudyTag(Base):
+    __tablename__ = "case_study_tags"
+
+    # Normalized copy of technologies_used / process_types, synced on write
+    case_study_id = Column(Integer, ForeignKey("case_studies.id", ondelete="CASCADE"), primary_key=True)
+    tag_type = Column(String(20), primary_key=True)  # "technology" or "process_type"
+    tag = Column(String(100), primary_key=True)
+
+    __table_args__ = (
+        Index("ix_case_study_tags_lookup", "tag_type", "tag", "case_study_id"),
+    )
+
+class CaseStudyNeighbor(Base):
+    __tablename__ = "case_study_neighbors"
+
+    # Precomputed content similarity: the top-k published studies per study
+    case_study_id = Column(Integer, ForeignKey("case_studies.id", ondelete="CASCADE"), primary_key=True)
+    rank = Column(Integer, primary_key=True)  # 1 = most similar
+    neighbor_id = Column(Integer, ForeignKey("case_studies.id", ondelete="CASCADE"), nullable=False)
+    score = Column(Float, nullable=False)  # cosine similarity of TF-IDF vectors
+    
+    computed_at = Column(DateTime(timezone=True), server_default=func.now())
+
+
+class CaseStudyStatsSnapshot(Base):
+    __tablename__ = "case_study_stats_snapshot"
+
+    # Single row (id = 1) of running totals over published case studies.
+    # Averages are kept as sums and non-null counts so updates are O(1).
+    id = Column(Integer, primary_key=True)
+    published_count = Column(Integer, nullable=False, default=0)
+    featured_count = Column(Integer, nullable=False, default=0)
+    industries_served = Column(Integer, nullable=False, default=0)
+    
+    cost_savings_sum = Column(Float, nullable=False, default=0.0)
+    implementation_time_sum = Column(Float, nullable=False, default=0.0)
+    implementation_time_count = Column(Integer, nullable=False, default=0)
+    roi_percentage_sum = Column(Float, nullable=False, default=0.0)
+    roi_percentage_count = Column(Integer, nullable=False, default=0)
+    efficiency_gain_sum = Column(Float, nullable=False, default=0.0)
+    efficiency_gain_count = Column(Integer, nullable=False, default=0)
+    
+    reconciled_at = Column(DateTime(timezone=True), nullable=True)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+class CaseStudyIndustryCount(Base):
+    __tablename__ = "case_study_industry_counts"
+
+    # Published studies per industry, so industries_served stays incremental
+    industry = Column(String(100), primary_key=True)
+    published_count = Column(Integer, nullable=False, default=0)
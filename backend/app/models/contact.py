@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, Boolean, JSON, Float
+from sqlalchemy import Column, Integer, String, Text, DateTime, Boolean, JSON, Float, UniqueConstraint
 from sqlalchemy.sql import func
 from app.core.database import Base
 
@@ -8,7 +8,7 @@ class ContactSubmission(Base):
     id = Column(Integer, primary_key=True, index=True)
     first_name = Column(String(100), nullable=False)
     last_name = Column(String(100), nullable=False)
-    email = Column(String(255), nullable=False, index=True)
+    email = Column(String(255), nullable=False, unique=True, index=True)
     company = Column(String(255), nullable=True)
     job_title = Column(String(255), nullable=True)
     phone = Column(String(50), nullable=True)
@@ -67,4 +67,35 @@ class ROICalculation(Base):
     follow_up_requested = Column(Boolean, default=False)
     
     created_at = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
\ No newline at end of file
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+
+class ContactFunnelRollup(Base):
+    """Leads that reached each form step, bucketed by creation hour and UTM attribution"""
+    __tablename__ = "contact_funnel_rollups"
+    __table_args__ = (
+        UniqueConstraint(
+            "bucket_hour", "utm_source", "utm_medium", "utm_campaign", "form_step",
+            name="uq_contact_funnel_rollups_key"
+        ),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    bucket_hour = Column(DateTime, nullable=False)  # UTC, truncated to the hour
+    utm_source = Column(String(100), nullable=False, default="")
+    utm_medium = Column(String(100), nullable=False, default="")
+    utm_campaign = Column(String(100), nullable=False, default="")
+    form_step = Column(Integer, nullable=False)
+    submissions = Column(Integer, nullable=False, default=0)
+
+
+class LeadChangeEvent(Base):
+    """Append-only changelog of lead writes; the id doubles as the SSE event id"""
+    __tablename__ = "lead_change_events"
+
+    id = Column(Integer, primary_key=True, index=True)
+    submission_id = Column(Integer, nullable=False, index=True)
+    event_type = Column(String(20), nullable=False)  # created, updated
+    is_qualified = Column(Boolean, default=False)
+    lead_score = Column(Integer, default=0)
+    payload = Column(JSON, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
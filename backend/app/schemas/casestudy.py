@@ -145,6 +145,11 @@ class CaseStudyListResponse(BaseModel):
     class Config:
         from_attributes = True
 
+class CaseStudySearchResult(CaseStudyListResponse):
+    rank: float
+    highlighted_title: str
+    snippet: str
+
 class CaseStudyInquiryCreate(BaseModel):
     case_study_id: int
     first_name: str = Field(..., min_length=1, max_length=100)
@@ -202,4 +207,14 @@ class CaseStudyStats(BaseModel):
     avg_roi: float
     avg_efficiency_gain: float
     industries_served: int
-    featured_count: int
\ No newline at end of file
+    featured_count: int
+
+class FacetCount(BaseModel):
+    value: str
+    count: int
+
+class CaseStudyFacets(BaseModel):
+    industries: List[FacetCount]
+    company_sizes: List[FacetCount]
+    technologies: List[FacetCount]
+    process_types: List[FacetCount]
@@ -0,0 +1,39 @@
+from pydantic import AfterValidator, BeforeValidator, EmailStr, StringConstraints
+from typing import Annotated, Any, Optional
+import re
+
+# Characters stripped from free-text input to prevent XSS and similar attacks
+_UNSAFE_CHARS = str.maketrans('', '', '<>"\'\\/')
+
+_EMAIL_PATTERN = re.compile(r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$')
+
+# Prevent extremely large values in financial inputs
+MAX_FINANCIAL_VALUE = 1e12
+
+def _sanitizer(max_length: int):
+    def sanitize(value: str) -> str:
+        return value.translate(_UNSAFE_CHARS)[:max_length].strip()
+    return sanitize
+
+def _check_email_format(value: str) -> str:
+    if not _EMAIL_PATTERN.match(value):
+        raise ValueError('Invalid email format')
+    return value
+
+def _blank_to_none(value: Any) -> Any:
+    if isinstance(value, str) and not value.strip():
+        return None
+    return value
+
+def SanitizedStr(max_length: int):
+    """String stripped of unsafe characters and truncated to max_length"""
+    return Annotated[str, AfterValidator(_sanitizer(max_length))]
+
+ContactEmail = Annotated[EmailStr, AfterValidator(_check_email_format)]
+
+# Allow international formats: +1234567890, (123) 456-7890, 123-456-7890, etc.
+# Phone is optional, and forms post it blank when skipped: that reads as None.
+PhoneStr = Annotated[
+    Optional[Annotated[str, StringConstraints(max_length=50, pattern=r'^[\+]?[\d\s\(\)\-]{10,20}$')]],
+    BeforeValidator(_blank_to_none)
+]
@@ -2,6 +2,8 @@ from pydantic import BaseModel, EmailStr, Field, validator
 from typing import Optional, Dict, Any
 from datetime import datetime
 
+from app.schemas.common import SanitizedStr, ContactEmail, PhoneStr
+
 class ContactSubmissionBase(BaseModel):
     first_name: str = Field(..., min_length=1, max_length=100)
     last_name: str = Field(..., min_length=1, max_length=100)
@@ -26,7 +28,17 @@ class ContactSubmissionBase(BaseModel):
     additional_data: Optional[Dict[str, Any]] = None
 
 class ContactSubmissionCreate(ContactSubmissionBase):
-    pass
+    first_name: SanitizedStr(100) = Field(..., min_length=1, max_length=100)
+    last_name: SanitizedStr(100) = Field(..., min_length=1, max_length=100)
+    email: ContactEmail
+    company: Optional[SanitizedStr(255)] = Field(None, max_length=255)
+    job_title: Optional[SanitizedStr(255)] = Field(None, max_length=255)
+    phone: PhoneStr = None
+    industry: Optional[SanitizedStr(100)] = Field(None, max_length=100)
+    project_description: Optional[SanitizedStr(5000)] = None
+    specific_challenges: Optional[SanitizedStr(5000)] = None
+    current_ai_tools: Optional[SanitizedStr(5000)] = None
+    expected_outcomes: Optional[SanitizedStr(5000)] = None
 
 class ContactSubmissionUpdate(BaseModel):
     first_name: Optional[str] = Field(None, min_length=1, max_length=100)
@@ -60,26 +72,30 @@ class ContactSubmissionResponse(ContactSubmissionBase):
         from_attributes = True
 
 class ContactFormStep1(BaseModel):
-    first_name: str = Field(..., min_length=1, max_length=100)
-    last_name: str = Field(..., min_length=1, max_length=100)
-    email: EmailStr
+    first_name: SanitizedStr(100) = Field(..., min_length=1, max_length=100)
+    last_name: SanitizedStr(100) = Field(..., min_length=1, max_length=100)
+    email: ContactEmail
+    utm_source: Optional[str] = Field(None, max_length=100)
+    utm_medium: Optional[str] = Field(None, max_length=100)
+    utm_campaign: Optional[str] = Field(None, max_length=100)
+    referrer: Optional[str] = Field(None, max_length=500)
 
 class ContactFormStep2(BaseModel):
-    company: str = Field(..., min_length=1, max_length=255)
-    job_title: str = Field(..., min_length=1, max_length=255)
-    phone: Optional[str] = Field(None, max_length=50)
+    company: SanitizedStr(255) = Field(..., min_length=1, max_length=255)
+    job_title: SanitizedStr(255) = Field(..., min_length=1, max_length=255)
+    phone: PhoneStr = None
     company_size: str = Field(..., min_length=1)
 
 class ContactFormStep3(BaseModel):
-    industry: str = Field(..., min_length=1, max_length=100)
+    industry: SanitizedStr(100) = Field(..., min_length=1, max_length=100)
     budget_range: str = Field(..., min_length=1)
     project_timeline: str = Field(..., min_length=1)
 
 class ContactFormStep4(BaseModel):
-    project_description: str = Field(..., min_length=10)
+    project_description: SanitizedStr(5000) = Field(..., min_length=10)
     ai_experience: str = Field(..., min_length=1)
-    specific_challenges: str = Field(..., min_length=10)
+    specific_challenges: SanitizedStr(5000) = Field(..., min_length=10)
 
 class ContactFormStep5(BaseModel):
-    current_ai_tools: Optional[str] = None
-    expected_outcomes: str = Field(..., min_length=10)
\ No newline at end of file
+    current_ai_tools: Optional[SanitizedStr(5000)] = None
+    expected_outcomes: SanitizedStr(5000) = Field(..., min_length=10)
\ No newline at end of file
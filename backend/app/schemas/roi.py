@@ -1,25 +1,21 @@
-from pydantic import BaseModel, EmailStr, Field, validator
+from pydantic import BaseModel, EmailStr, Field
 from typing import Optional, Dict, Any
 from datetime import datetime
 
+from app.schemas.common import SanitizedStr, MAX_FINANCIAL_VALUE
+
 class ROICalculationInput(BaseModel):
     email: EmailStr
-    company: Optional[str] = Field(None, max_length=255)
-    industry: str = Field(..., min_length=1, max_length=100)
-    company_size: str = Field(..., min_length=1, max_length=50)
-    current_revenue: float = Field(..., gt=0, description="Annual revenue in USD")
-    current_costs: float = Field(..., gt=0, description="Annual operational costs in USD")
-    process_type: str = Field(..., min_length=1, max_length=100)
-    current_processing_time: float = Field(..., gt=0, description="Hours per process")
-    volume_processed: float = Field(..., gt=0, description="Number of processes per month")
+    company: Optional[SanitizedStr(255)] = Field(None, max_length=255)
+    industry: SanitizedStr(100) = Field(..., min_length=1, max_length=100)
+    company_size: SanitizedStr(50) = Field(..., min_length=1, max_length=50)
+    current_revenue: float = Field(..., gt=0, le=MAX_FINANCIAL_VALUE, description="Annual revenue in USD")
+    current_costs: float = Field(..., gt=0, le=MAX_FINANCIAL_VALUE, description="Annual operational costs in USD")
+    process_type: SanitizedStr(100) = Field(..., min_length=1, max_length=100)
+    current_processing_time: float = Field(..., gt=0, le=MAX_FINANCIAL_VALUE, description="Hours per process")
+    volume_processed: float = Field(..., gt=0, le=MAX_FINANCIAL_VALUE, description="Number of processes per month")
     error_rate: Optional[float] = Field(None, ge=0, le=100, description="Error rate percentage")
-    labor_costs: Optional[float] = Field(None, ge=0, description="Monthly labor costs in USD")
-
-    @validator('error_rate')
-    def validate_error_rate(cls, v):
-        if v is not None and (v < 0 or v > 100):
-            raise ValueError('Error rate must be between 0 and 100')
-        return v
+    labor_costs: Optional[float] = Field(None, ge=0, le=MAX_FINANCIAL_VALUE, description="Monthly labor costs in USD")
 
 class ROICalculationResult(BaseModel):
     potential_savings: float = Field(..., description="Annual potential savings in USD")
@@ -84,9 +80,9 @@ class ROIQuickCalculation(BaseModel):
     industry: str = Field(..., min_length=1)
     company_size: str = Field(..., min_length=1)
     process_type: str = Field(..., min_length=1)
-    monthly_volume: int = Field(..., gt=0)
-    hours_per_task: float = Field(..., gt=0)
-    hourly_rate: float = Field(default=50.0, gt=0)
+    monthly_volume: int = Field(..., ge=1, le=MAX_FINANCIAL_VALUE)
+    hours_per_task: float = Field(..., ge=0.01, le=MAX_FINANCIAL_VALUE)
+    hourly_rate: float = Field(default=50.0, ge=1, le=MAX_FINANCIAL_VALUE)
 
 class ROIQuickResult(BaseModel):
     monthly_hours_saved: float
@@ -0,0 +1,272 @@
+"""Static snapshot of the published case study API for nginx/CDN serving.
+
+Usage: python -m app.snapshot [--dir PATH] [--full]
+
+Files are laid out under <dir>/current/ mirroring the request paths, e.g.
+api/v1/case-studies/stats.json or api/v1/case-studies/<slug>.json, each
+with precompressed .gz (and .br when brotli is installed) siblings.
+Every build is written to a fresh release directory and published by
+atomically repointing the `current` symlink, so nginx never serves a
+half-written tree.
+"""
+import argparse
+import asyncio
+import fcntl
+import gzip
+import json
+import os
+import shutil
+import time
+from datetime import datetime
+from typing import Any, Dict, Iterable, Optional, Set
+
+from fastapi import HTTPException
+from sqlalchemy import select
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal, async_engine
+from app.models.casestudy import CaseStudy
+from app.api.v1.endpoints.casestudy import (
+    case_study_detail_builder,
+    get_case_studies,
+    get_case_study_stats,
+    get_featured_case_studies,
+    get_industry_benchmarks
+)
+from app.utils.content_events import ContentChanges, register_change_listener
+import logging
+
+try:
+    import brotli
+except ImportError:  # gzip-only snapshots
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+API_PREFIX = f"{settings.API_V1_STR.strip('/')}/case-studies"
+MANIFEST = "manifest.json"
+KEEP_RELEASES = 3
+
+# Matches the endpoint defaults, so the unparameterised URLs are covered
+LIST_PAGE_SIZE = 20
+FEATURED_LIMIT = 6
+
+def _compressed_variants(body: bytes) -> Dict[str, bytes]:
+    variants = {"": body, ".gz": gzip.compress(body, compresslevel=9, mtime=0)}
+    if brotli is not None:
+        variants[".br"] = brotli.compress(body, quality=11)
+    return variants
+
+def _write_file(release: str, relative_path: str, body: bytes):
+    path = os.path.join(release, relative_path)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    for suffix, data in _compressed_variants(body).items():
+        with open(path + suffix, "wb") as f:
+            f.write(data)
+
+def _link_file(previous: str, release: str, relative_path: str) -> bool:
+    """Carry an unchanged file (and its compressed siblings) forward by hard link"""
+    source = os.path.join(previous, relative_path)
+    if not os.path.exists(source):
+        return False
+    target = os.path.join(release, relative_path)
+    os.makedirs(os.path.dirname(target), exist_ok=True)
+    for suffix in ("", ".gz", ".br"):
+        if os.path.exists(source + suffix):
+            os.link(source + suffix, target + suffix)
+    return True
+
+def _detail_path(slug: str) -> str:
+    return f"{API_PREFIX}/{slug}.json"
+
+class SnapshotBuilder:
+    """Renders published case studies to a static tree, incrementally"""
+
+    def __init__(self, root: str):
+        self.root = os.path.abspath(root)
+        self.current = os.path.join(self.root, "current")
+        self.releases = os.path.join(self.root, "releases")
+
+        self.task: Optional[asyncio.Task] = None
+        self.pending_ids: Set[int] = set()
+        self.pending = False
+        self.builds = 0
+        self.last_build: Optional[datetime] = None
+        self.last_build_seconds = 0.0
+        self.last_rendered = 0
+        self.last_reused = 0
+
+    def _load_manifest(self) -> Dict[str, Any]:
+        try:
+            with open(os.path.join(self.current, MANIFEST)) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {"studies": {}}
+
+    async def _render_common(self, session) -> Dict[str, bytes]:
+        """List pages, featured, stats and benchmarks; always re-rendered"""
+        files = {}
+
+        published = (await session.execute(
+            select(CaseStudy.id).where(CaseStudy.is_published == True)
+        )).all()
+        pages = max(1, -(-len(published) // LIST_PAGE_SIZE))
+        for page in range(pages):
+            response = await get_case_studies(
+                skip=page * LIST_PAGE_SIZE, limit=LIST_PAGE_SIZE, industry=None, company_size=None,
+                technology=None, process_type=None, is_featured=None, published_only=True, db=session
+            )
+            suffix = "" if page == 0 else f".skip-{page * LIST_PAGE_SIZE}"
+            files[f"{API_PREFIX}/index{suffix}.json"] = response.body
+
+        response = await get_featured_case_studies(limit=FEATURED_LIMIT, db=session)
+        files[f"{API_PREFIX}/featured.json"] = response.body
+        response = await get_case_study_stats(db=session)
+        files[f"{API_PREFIX}/stats.json"] = response.body
+        response = await get_industry_benchmarks(industry=None, process_type=None, db=session)
+        files[f"{API_PREFIX}/industries/benchmarks.json"] = response.body
+        return files
+
+    async def build(self, changed_ids: Iterable[int] = (), full: bool = False):
+        """Build a new release, re-rendering only details that changed"""
+        started = time.perf_counter()
+        changed_ids = set(changed_ids)
+        manifest = self._load_manifest()
+        previous = os.path.realpath(self.current) if os.path.exists(self.current) else None
+        previous_studies = manifest.get("studies", {})
+
+        async with AsyncSessionLocal() as session:
+            result = await session.execute(
+                select(CaseStudy.id, CaseStudy.slug, CaseStudy.updated_at, CaseStudy.created_at)
+                .where(CaseStudy.is_published == True)
+            )
+            studies = {}
+            render, reuse = {}, []
+            for row in result.all():
+                # Metric and timeline writes bump updated_at too (content_events)
+                stamp = row.updated_at or row.created_at
+                version = stamp.isoformat() if stamp else ""
+                known = previous_studies.get(str(row.id))
+                path = _detail_path(row.slug)
+                unchanged = (
+                    not full and previous is not None and row.id not in changed_ids
+                    and known == {"slug": row.slug, "version": version}
+                    and os.path.exists(os.path.join(previous, path))
+                )
+                if not unchanged:
+                    try:
+                        body, _ = await case_study_detail_builder(session, row.id)()
+                    except HTTPException:
+                        # Unpublished since the listing query
+                        continue
+                    render[path] = body
+                else:
+                    reuse.append(path)
+                studies[str(row.id)] = {"slug": row.slug, "version": version}
+
+            render.update(await self._render_common(session))
+
+        new_manifest = {"built_at": datetime.utcnow().isoformat(), "studies": studies}
+        render[MANIFEST] = json.dumps(new_manifest, indent=2).encode()
+
+        reused = await asyncio.to_thread(self._publish, previous, render, reuse)
+
+        self.builds += 1
+        self.last_build = datetime.utcnow()
+        self.last_build_seconds = time.perf_counter() - started
+        self.last_rendered = len(render)
+        self.last_reused = reused
+        logger.info(
+            f"Case study snapshot built: {len(render)} files rendered, {reused} reused "
+            f"in {self.last_build_seconds * 1000:.1f}ms"
+        )
+
+    def _publish(self, previous: Optional[str], render: Dict[str, bytes], reuse: Iterable[str]) -> int:
+        """Write a release directory and atomically point `current` at it"""
+        os.makedirs(self.releases, exist_ok=True)
+        name = datetime.utcnow().strftime("%Y%m%d%H%M%S%f")
+        release = os.path.join(self.releases, name)
+        os.makedirs(release)
+
+        reused = 0
+        for relative_path in reuse:
+            if _link_file(previous, release, relative_path):
+                reused += 1
+        for relative_path, body in render.items():
+            _write_file(release, relative_path, body)
+
+        # Relative target so the link resolves in any container mounting root
+        temporary = os.path.join(self.root, f".current-{name}")
+        os.symlink(os.path.join("releases", name), temporary)
+        os.replace(temporary, self.current)
+
+        for old in sorted(os.listdir(self.releases))[:-KEEP_RELEASES]:
+            shutil.rmtree(os.path.join(self.releases, old), ignore_errors=True)
+        return reused
+
+    async def locked_build(self, changed_ids: Iterable[int] = (), full: bool = False):
+        """Build while holding a file lock, serializing builds across workers"""
+        os.makedirs(self.root, exist_ok=True)
+        lock = open(os.path.join(self.root, ".lock"), "w")
+        try:
+            await asyncio.to_thread(fcntl.flock, lock, fcntl.LOCK_EX)
+            await self.build(changed_ids, full)
+        finally:
+            lock.close()
+
+    async def _run(self):
+        # Let a burst of publishing commits settle into one build
+        await asyncio.sleep(1)
+        while self.pending:
+            self.pending = False
+            changed_ids, self.pending_ids = self.pending_ids, set()
+            try:
+                await self.locked_build(changed_ids)
+            except Exception as e:
+                logger.error(f"Case study snapshot build failed: {e}")
+
+    def schedule_build(self, changes: ContentChanges):
+        """Publish hook: rebuild after any committed case study or benchmark change"""
+        self.pending_ids |= changes.case_study_ids
+        self.pending = True
+        if self.task is not None and not self.task.done():
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # Committed from a synchronous script; run the CLI afterwards
+            return
+        self.task = loop.create_task(self._run())
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'directory': self.root,
+            'builds': self.builds,
+            'build_pending': self.pending,
+            'last_build': self.last_build.isoformat() if self.last_build else None,
+            'last_build_ms': round(self.last_build_seconds * 1000, 2),
+            'last_files_rendered': self.last_rendered,
+            'last_files_reused': self.last_reused
+        }
+
+# Publish hook, enabled when a snapshot directory is configured
+snapshot_builder = SnapshotBuilder(settings.STATIC_SNAPSHOT_DIR) if settings.STATIC_SNAPSHOT_DIR else None
+
+if snapshot_builder is not None:
+    register_change_listener(snapshot_builder.schedule_build)
+
+async def _main(directory: str, full: bool):
+    try:
+        await SnapshotBuilder(directory).locked_build(full=full)
+    finally:
+        await async_engine.dispose()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Render published case studies to static JSON for nginx")
+    parser.add_argument("--dir", default=settings.STATIC_SNAPSHOT_DIR or "static_snapshot",
+                        help="snapshot root directory (default: STATIC_SNAPSHOT_DIR)")
+    parser.add_argument("--full", action="store_true", help="re-render every case study")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(_main(args.dir, args.full))
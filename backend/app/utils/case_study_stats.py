@@ -0,0 +1,284 @@
+import asyncio
+import time
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+from sqlalchemy import Integer, delete, event, func, inspect, insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.database import async_engine, dialect_insert
+from app.models.casestudy import CaseStudy, CaseStudyIndustryCount, CaseStudyStatsSnapshot
+import logging
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_ID = 1
+
+_snapshot = CaseStudyStatsSnapshot.__table__
+_industries = CaseStudyIndustryCount.__table__
+
+# CaseStudy attributes the snapshot is derived from
+STATS_ATTRIBUTES = (
+    "is_published", "is_featured", "industry", "cost_savings",
+    "implementation_time", "roi_percentage", "efficiency_gain"
+)
+
+# Averaged attribute -> (sum column, non-null count column)
+_AVERAGED = {
+    "implementation_time": ("implementation_time_sum", "implementation_time_count"),
+    "roi_percentage": ("roi_percentage_sum", "roi_percentage_count"),
+    "efficiency_gain": ("efficiency_gain_sum", "efficiency_gain_count")
+}
+
+def _contribution(values: Dict[str, Any]) -> Dict[str, float]:
+    """What one study adds to the snapshot columns"""
+    if not values["is_published"]:
+        return {}
+    contribution = {
+        "published_count": 1,
+        "featured_count": 1 if values["is_featured"] else 0,
+        "cost_savings_sum": values["cost_savings"] or 0.0
+    }
+    for attr, (sum_column, count_column) in _AVERAGED.items():
+        if values[attr] is not None:
+            contribution[sum_column] = values[attr]
+            contribution[count_column] = 1
+    return contribution
+
+def _current_values(target: CaseStudy) -> Dict[str, Any]:
+    return {attr: getattr(target, attr) for attr in STATS_ATTRIBUTES}
+
+def _previous_values(target: CaseStudy) -> Dict[str, Any]:
+    state = inspect(target)
+    values = {}
+    for attr in STATS_ATTRIBUTES:
+        history = state.attrs[attr].history
+        values[attr] = history.deleted[0] if history.deleted else getattr(target, attr)
+    return values
+
+def _apply_change(connection, old: Optional[Dict[str, Any]], new: Optional[Dict[str, Any]]):
+    """Move the snapshot from a study's old contribution to its new one"""
+    old_contribution = _contribution(old) if old else {}
+    new_contribution = _contribution(new) if new else {}
+
+    deltas = {
+        column: new_contribution.get(column, 0) - old_contribution.get(column, 0)
+        for column in old_contribution.keys() | new_contribution.keys()
+    }
+    deltas = {column: delta for column, delta in deltas.items() if delta}
+
+    industry_deltas: Dict[str, int] = {}
+    if old_contribution:
+        industry_deltas[old["industry"]] = industry_deltas.get(old["industry"], 0) - 1
+    if new_contribution:
+        industry_deltas[new["industry"]] = industry_deltas.get(new["industry"], 0) + 1
+
+    industry_deltas = {industry: delta for industry, delta in industry_deltas.items() if delta}
+    if not deltas and not industry_deltas:
+        return
+
+    # Snapshot row first: reconcile locks it before rewriting industry
+    # counts, and taking the locks in the same order avoids a deadlock
+    connection.execute(
+        update(_snapshot)
+        .where(_snapshot.c.id == SNAPSHOT_ID)
+        .values({column: _snapshot.c[column] + delta for column, delta in deltas.items()} or {"id": _snapshot.c.id})
+    )
+
+    industries_served = 0
+    for industry, delta in industry_deltas.items():
+        stmt = dialect_insert(_industries).values(industry=industry, published_count=delta)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[_industries.c.industry],
+            set_={"published_count": _industries.c.published_count + stmt.excluded.published_count}
+        ).returning(_industries.c.published_count)
+        count = connection.execute(stmt).scalar()
+        if delta > 0 and count == delta:
+            industries_served += 1
+        elif delta < 0 and count == 0:
+            industries_served -= 1
+
+    if industries_served:
+        connection.execute(
+            update(_snapshot)
+            .where(_snapshot.c.id == SNAPSHOT_ID)
+            .values(industries_served=_snapshot.c.industries_served + industries_served)
+        )
+
+# Load old values before assignment so history always has them, even on
+# expired instances; otherwise an update could not subtract its old share.
+def _track_previous_value(target, value, oldvalue, initiator):
+    pass
+
+for _attr in STATS_ATTRIBUTES:
+    event.listen(getattr(CaseStudy, _attr), "set", _track_previous_value, active_history=True)
+
+# Mapper events run inside the flush, so the snapshot commits with the study
+
+@event.listens_for(CaseStudy, "after_insert")
+def _stats_after_insert(mapper, connection, target):
+    _apply_change(connection, None, _current_values(target))
+
+@event.listens_for(CaseStudy, "after_update")
+def _stats_after_update(mapper, connection, target):
+    state = inspect(target)
+    if any(state.attrs[attr].history.has_changes() for attr in STATS_ATTRIBUTES):
+        _apply_change(connection, _previous_values(target), _current_values(target))
+
+@event.listens_for(CaseStudy, "before_delete")
+def _stats_before_delete(mapper, connection, target):
+    # Before the DELETE, while unloaded attributes can still be fetched
+    _apply_change(connection, _previous_values(target), None)
+
+def snapshot_to_stats(snapshot: Optional[CaseStudyStatsSnapshot]) -> Dict[str, Any]:
+    """CaseStudyStats fields from the snapshot row"""
+    if snapshot is None:
+        return {
+            "total_case_studies": 0, "total_cost_savings": 0.0, "avg_implementation_time": 0.0,
+            "avg_roi": 0.0, "avg_efficiency_gain": 0.0, "industries_served": 0, "featured_count": 0
+        }
+
+    def average(sum_column: str, count_column: str) -> float:
+        count = getattr(snapshot, count_column)
+        return getattr(snapshot, sum_column) / count if count else 0.0
+
+    return {
+        "total_case_studies": snapshot.published_count,
+        "total_cost_savings": snapshot.cost_savings_sum,
+        "avg_implementation_time": average(*_AVERAGED["implementation_time"]),
+        "avg_roi": average(*_AVERAGED["roi_percentage"]),
+        "avg_efficiency_gain": average(*_AVERAGED["efficiency_gain"]),
+        "industries_served": snapshot.industries_served,
+        "featured_count": snapshot.featured_count
+    }
+
+class CaseStudyStatsStore:
+    """Keeps the stats snapshot honest with periodic full recomputes.
+
+    Incremental maintenance happens in the mapper events above; this
+    repairs drift from float accumulation and from writes that bypass
+    the ORM (bulk statements, raw SQL).
+    """
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self.task: Optional[asyncio.Task] = None
+        self.reconciliations = 0
+        self.drift_corrections = 0
+        self.last_reconcile: Optional[datetime] = None
+        self.last_reconcile_seconds = 0.0
+
+    async def read(self, db: AsyncSession) -> Dict[str, Any]:
+        """Stats from the single snapshot row, reconciling once if it does not exist yet"""
+        result = await db.execute(select(CaseStudyStatsSnapshot).where(CaseStudyStatsSnapshot.id == SNAPSHOT_ID))
+        snapshot = result.scalar_one_or_none()
+        if snapshot is None:
+            await self.reconcile()
+            result = await db.execute(select(CaseStudyStatsSnapshot).where(CaseStudyStatsSnapshot.id == SNAPSHOT_ID))
+            snapshot = result.scalar_one_or_none()
+        return snapshot_to_stats(snapshot)
+
+    async def reconcile(self):
+        """Recompute the snapshot and industry counts from case_studies"""
+        started = time.perf_counter()
+        published = CaseStudy.is_published == True
+
+        async with async_engine.begin() as conn:
+            # Write-lock the snapshot row before counting. ORM writers update
+            # it inside their own transactions, so each of their deltas has
+            # either committed before the recount or waits and lands on top
+            # of it. On SQLite this write is also what opens the transaction,
+            # as the driver defers BEGIN until the first DML statement.
+            lock = dialect_insert(_snapshot).values(id=SNAPSHOT_ID)
+            await conn.execute(lock.on_conflict_do_update(
+                index_elements=[_snapshot.c.id], set_={"id": lock.excluded.id}
+            ))
+
+            result = await conn.execute(
+                select(
+                    CaseStudy.industry,
+                    func.count().label("published_count"),
+                    func.sum(func.cast(CaseStudy.is_featured, Integer)).label("featured_count"),
+                    func.sum(CaseStudy.cost_savings).label("cost_savings_sum"),
+                    func.sum(CaseStudy.implementation_time).label("implementation_time_sum"),
+                    func.count(CaseStudy.implementation_time).label("implementation_time_count"),
+                    func.sum(CaseStudy.roi_percentage).label("roi_percentage_sum"),
+                    func.count(CaseStudy.roi_percentage).label("roi_percentage_count"),
+                    func.sum(CaseStudy.efficiency_gain).label("efficiency_gain_sum"),
+                    func.count(CaseStudy.efficiency_gain).label("efficiency_gain_count")
+                ).where(published).group_by(CaseStudy.industry)
+            )
+            groups = result.all()
+
+            totals = {
+                column: sum((getattr(row, column) or 0) for row in groups)
+                for column in (
+                    "published_count", "featured_count", "cost_savings_sum",
+                    "implementation_time_sum", "implementation_time_count",
+                    "roi_percentage_sum", "roi_percentage_count",
+                    "efficiency_gain_sum", "efficiency_gain_count"
+                )
+            }
+            totals["industries_served"] = len(groups)
+
+            previous = (await conn.execute(
+                select(
+                    _snapshot.c.published_count, _snapshot.c.featured_count,
+                    _snapshot.c.industries_served, _snapshot.c.reconciled_at
+                ).where(_snapshot.c.id == SNAPSHOT_ID)
+            )).first()
+            if previous.reconciled_at is not None and tuple(previous[:3]) != (
+                totals["published_count"], totals["featured_count"], totals["industries_served"]
+            ):
+                self.drift_corrections += 1
+                logger.warning(f"Case study stats snapshot drifted: {tuple(previous[:3])} -> reconciled")
+
+            await conn.execute(delete(_industries))
+            if groups:
+                await conn.execute(insert(_industries), [
+                    {"industry": row.industry, "published_count": row.published_count} for row in groups
+                ])
+
+            await conn.execute(
+                update(_snapshot)
+                .where(_snapshot.c.id == SNAPSHOT_ID)
+                .values(**totals, reconciled_at=datetime.utcnow())
+            )
+
+        self.reconciliations += 1
+        self.last_reconcile = datetime.utcnow()
+        self.last_reconcile_seconds = time.perf_counter() - started
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.reconcile()
+            except Exception as e:
+                logger.error(f"Case study stats reconciliation failed: {e}")
+
+    def start(self):
+        if self.task is None:
+            self.task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self.task is not None:
+            self.task.cancel()
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
+            self.task = None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'reconcile_interval_seconds': self.interval,
+            'reconciliations': self.reconciliations,
+            'drift_corrections': self.drift_corrections,
+            'last_reconcile': self.last_reconcile.isoformat() if self.last_reconcile else None,
+            'last_reconcile_ms': round(self.last_reconcile_seconds * 1000, 2)
+        }
+
+# Global stats store instance
+case_study_stats_store = CaseStudyStatsStore(settings.CASE_STUDY_STATS_RECONCILE_SECONDS)
@@ -0,0 +1,115 @@
+from datetime import datetime, timezone
+from typing import Callable, List, Optional, Set
+
+from sqlalchemy import event, inspect, update
+from sqlalchemy.orm import Session
+
+from app.models.casestudy import CaseStudy, CaseStudyMetric, CaseStudyTimeline, IndustryBenchmark
+from app.utils.server_timing import side_effect
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Engagement counters bumped on reads; changing them alone is not a content change
+COUNTER_ATTRIBUTES = frozenset({"view_count", "lead_generation_count"})
+
+# Case study fields the similarity index reads; edits to others leave neighbors as they are
+INDEXED_ATTRIBUTES = frozenset({"is_published", "challenge", "solution", "technologies_used", "process_types"})
+
+class ContentChanges:
+    """Case study and benchmark rows changed by one committed transaction"""
+
+    def __init__(self):
+        self.case_study_ids: Set[int] = set()
+        # Inserted, deleted or changed in an indexed field
+        self.indexed_case_study_ids: Set[int] = set()
+        self.benchmarks_changed = False
+
+    def __bool__(self) -> bool:
+        return bool(self.case_study_ids) or self.benchmarks_changed
+
+ChangeListener = Callable[[ContentChanges], None]
+
+_listeners: List[ChangeListener] = []
+
+def register_change_listener(listener: ChangeListener):
+    """Call `listener` after every commit that changed published content.
+
+    Listeners run synchronously inside the commit, so they must be quick
+    and must not touch the database; schedule any heavier work instead.
+    """
+    _listeners.append(listener)
+
+# Metric and timeline rows have no updated_at of their own. Bumping their
+# study's makes an edit visible to anything versioning a study by it (the
+# static snapshot's incremental builds), whichever process made the edit.
+# Statements that bypass the ORM are not covered; rebuild with --full.
+def _touch_case_studies(connection, *case_study_ids: Optional[int]):
+    ids = {case_study_id for case_study_id in case_study_ids if case_study_id is not None}
+    if ids:
+        case_studies = CaseStudy.__table__
+        connection.execute(
+            update(case_studies)
+            .where(case_studies.c.id.in_(ids))
+            .values(updated_at=datetime.now(timezone.utc))
+        )
+
+def _touch_after_write(mapper, connection, target):
+    history = inspect(target).attrs.case_study_id.history
+    _touch_case_studies(connection, target.case_study_id, *history.deleted)
+
+for _child in (CaseStudyMetric, CaseStudyTimeline):
+    for _event in ("after_insert", "after_update", "after_delete"):
+        event.listen(_child, _event, _touch_after_write)
+
+def _changed_attributes(obj) -> Set[str]:
+    return {attr.key for attr in inspect(obj).attrs if attr.history.has_changes()}
+
+@event.listens_for(Session, "after_flush")
+def _collect_changes(session, flush_context):
+    changes = session.info.get("content_changes")
+
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        indexed = False
+        if isinstance(obj, CaseStudy):
+            if obj in session.dirty:
+                changed = _changed_attributes(obj)
+                if not changed - COUNTER_ATTRIBUTES:
+                    continue
+                indexed = bool(changed & INDEXED_ATTRIBUTES)
+            else:
+                indexed = True
+            case_study_id = obj.id
+        elif isinstance(obj, (CaseStudyMetric, CaseStudyTimeline)):
+            case_study_id = obj.case_study_id
+        elif isinstance(obj, IndustryBenchmark):
+            if changes is None:
+                changes = session.info["content_changes"] = ContentChanges()
+            changes.benchmarks_changed = True
+            continue
+        else:
+            continue
+
+        if changes is None:
+            changes = session.info["content_changes"] = ContentChanges()
+        if case_study_id is not None:
+            changes.case_study_ids.add(case_study_id)
+            if indexed:
+                changes.indexed_case_study_ids.add(case_study_id)
+
+@event.listens_for(Session, "after_commit")
+def _dispatch_changes(session):
+    changes = session.info.pop("content_changes", None)
+    if not changes:
+        return
+
+    with side_effect():
+        for listener in _listeners:
+            try:
+                listener(changes)
+            except Exception as e:
+                logger.error(f"Content change listener {listener.__name__} failed: {e}")
+
+@event.listens_for(Session, "after_rollback")
+def _discard_changes(session):
+    session.info.pop("content_changes", None)
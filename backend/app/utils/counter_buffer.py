@@ -0,0 +1,127 @@
+import asyncio
+import time
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+from sqlalchemy import bindparam, func, update
+
+from app.core.config import settings
+from app.core.database import async_engine
+from app.models.casestudy import CaseStudy
+import logging
+
+logger = logging.getLogger(__name__)
+
+_case_studies = CaseStudy.__table__
+
+# Executed with one parameter set per case study (executemany). Goes
+# through the table rather than the ORM so counter flushes never count
+# as content changes.
+_apply_counters = (
+    update(_case_studies)
+    .where(_case_studies.c.id == bindparam("case_study_id"))
+    .values(
+        view_count=func.coalesce(_case_studies.c.view_count, 0) + bindparam("views"),
+        lead_generation_count=func.coalesce(_case_studies.c.lead_generation_count, 0) + bindparam("leads"),
+        # Counters are not edits; keep onupdate from bumping the content timestamp
+        updated_at=_case_studies.c.updated_at
+    )
+)
+
+class CaseStudyCounterBuffer:
+    """Aggregates view and lead counter increments in memory.
+
+    Request handlers only bump a dict entry; a background task writes the
+    accumulated deltas every few seconds in one transaction, so readers
+    never take the row lock (or SQLite's single writer lock).
+    """
+
+    def __init__(self, flush_interval: float):
+        self.flush_interval = flush_interval
+        self.views: Dict[int, int] = {}
+        self.leads: Dict[int, int] = {}
+        self.task: Optional[asyncio.Task] = None
+
+        self.flushes = 0
+        self.rows_flushed = 0
+        self.failed_flushes = 0
+        self.last_flush: Optional[datetime] = None
+        self.last_flush_seconds = 0.0
+
+    def add_view(self, case_study_id: int):
+        self.views[case_study_id] = self.views.get(case_study_id, 0) + 1
+
+    def add_lead(self, case_study_id: int):
+        self.leads[case_study_id] = self.leads.get(case_study_id, 0) + 1
+
+    async def flush(self):
+        """Write pending deltas; on failure they are merged back for the next flush"""
+        if not self.views and not self.leads:
+            return
+
+        views, self.views = self.views, {}
+        leads, self.leads = self.leads, {}
+        params = [
+            {
+                "case_study_id": case_study_id,
+                "views": views.get(case_study_id, 0),
+                "leads": leads.get(case_study_id, 0)
+            }
+            for case_study_id in sorted(views.keys() | leads.keys())
+        ]
+
+        started = time.perf_counter()
+        try:
+            async with async_engine.begin() as conn:
+                await conn.execute(_apply_counters, params)
+        except BaseException:
+            for case_study_id, delta in views.items():
+                self.views[case_study_id] = self.views.get(case_study_id, 0) + delta
+            for case_study_id, delta in leads.items():
+                self.leads[case_study_id] = self.leads.get(case_study_id, 0) + delta
+            self.failed_flushes += 1
+            raise
+
+        self.flushes += 1
+        self.rows_flushed += len(params)
+        self.last_flush = datetime.utcnow()
+        self.last_flush_seconds = time.perf_counter() - started
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.error(f"Case study counter flush failed: {e}")
+
+    def start(self):
+        if self.task is None:
+            self.task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stop the flush loop and write whatever is still pending"""
+        if self.task is not None:
+            self.task.cancel()
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
+            self.task = None
+        await self.flush()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'pending_views': sum(self.views.values()),
+            'pending_leads': sum(self.leads.values()),
+            'pending_rows': len(self.views.keys() | self.leads.keys()),
+            'flush_interval_seconds': self.flush_interval,
+            'flushes': self.flushes,
+            'rows_flushed': self.rows_flushed,
+            'failed_flushes': self.failed_flushes,
+            'last_flush': self.last_flush.isoformat() if self.last_flush else None,
+            'last_flush_ms': round(self.last_flush_seconds * 1000, 2)
+        }
+
+# Global counter buffer instance
+case_study_counters = CaseStudyCounterBuffer(settings.CASE_STUDY_COUNTER_FLUSH_SECONDS)
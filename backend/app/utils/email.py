@@ -3,7 +3,9 @@ from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 from typing import Dict, Any
 from app.core.config import settings
+from app.utils.server_timing import timed_side_effect
 
+@timed_side_effect
 async def send_notification_email(contact_submission, is_qualified: bool):
     if not settings.SMTP_USERNAME or not settings.SMTP_PASSWORD:
         print("Email settings not configured, skipping email notification")
@@ -61,6 +63,7 @@ async def send_notification_email(contact_submission, is_qualified: bool):
     except Exception as e:
         print(f"Failed to send notification email: {e}")
 
+@timed_side_effect
 async def send_roi_report_email(email: str, calculation_results: Dict[str, Any]):
     if not settings.SMTP_USERNAME or not settings.SMTP_PASSWORD:
         print("Email settings not configured, skipping ROI report email")
@@ -121,6 +124,7 @@ async def send_roi_report_email(email: str, calculation_results: Dict[str, Any])
     except Exception as e:
         print(f"Failed to send ROI report email: {e}")
 
+@timed_side_effect
 async def send_welcome_email(email: str, first_name: str):
     if not settings.SMTP_USERNAME or not settings.SMTP_PASSWORD:
         return
@@ -0,0 +1,165 @@
+import asyncio
+import hashlib
+import math
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import select, func
+
+from app.core.config import settings
+from app.core.database import async_engine
+from app.models.contact import ContactSubmission
+import logging
+
+logger = logging.getLogger(__name__)
+
+class BloomFilter:
+    """Fixed-size Bloom filter over strings using double hashing"""
+
+    def __init__(self, capacity: int, error_rate: float):
+        capacity = max(1, capacity)
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.num_bits = max(8, math.ceil(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.num_hashes = max(1, round(self.num_bits / capacity * math.log(2)))
+        self.bits = bytearray((self.num_bits + 7) // 8)
+        self.count = 0
+
+    def _positions(self, item: str):
+        digest = hashlib.blake2b(item.encode("utf-8"), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        for i in range(self.num_hashes):
+            yield (h1 + i * h2) % self.num_bits
+
+    def add(self, item: str) -> bool:
+        """Set the item's bits; True if any was unset, i.e. the item is new to the filter"""
+        bits = self.bits
+        added = False
+        for pos in self._positions(item):
+            mask = 1 << (pos & 7)
+            if not bits[pos >> 3] & mask:
+                bits[pos >> 3] |= mask
+                added = True
+        if added:
+            self.count += 1
+        return added
+
+    def __contains__(self, item: str) -> bool:
+        bits = self.bits
+        return all(bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(item))
+
+    @property
+    def saturated(self) -> bool:
+        """More items than it was sized for; the false-positive rate exceeds the target"""
+        return self.count > self.capacity
+
+    def estimated_error_rate(self) -> float:
+        """Expected false-positive rate at the current fill level"""
+        return (1 - math.exp(-self.num_hashes * self.count / self.num_bits)) ** self.num_hashes
+
+class EmailPrefilter:
+    """In-memory prefilter of emails already present in contact_submissions.
+
+    A negative answer is definite for rows this process has seen, so the
+    caller can skip the lookup. Rows inserted by other workers are not
+    reflected here, which is why inserts still go through ON CONFLICT.
+    """
+
+    def __init__(self):
+        self.filter: Optional[BloomFilter] = None
+        self.rebuild_seconds = 0.0
+        self.last_rebuild: Optional[datetime] = None
+        self.lookups = 0
+        self.negatives = 0
+        self.rebuild_task: Optional[asyncio.Task] = None
+        # Emails added while a rebuild scans the table, replayed into its filter
+        self._added_during_rebuild: Optional[List[str]] = None
+
+    def might_contain(self, email: str) -> bool:
+        """False means the email is definitely not stored; True means check the database"""
+        self.lookups += 1
+        if self.filter is None:
+            return True
+        if email in self.filter:
+            return True
+        self.negatives += 1
+        return False
+
+    def add(self, email: str):
+        if self._added_during_rebuild is not None:
+            self._added_during_rebuild.append(email)
+        if self.filter is None:
+            return
+        if self.filter.add(email) and self.filter.saturated and self.rebuild_task is None:
+            # Resize from the current row count rather than keep degrading
+            self.rebuild_task = asyncio.create_task(self._rebuild_saturated())
+
+    async def _rebuild_saturated(self):
+        logger.warning(f"Email prefilter exceeded its capacity of {self.filter.capacity}; rebuilding")
+        try:
+            await self.rebuild()
+        except Exception as e:
+            logger.error(f"Email prefilter rebuild failed: {e}")
+        finally:
+            self.rebuild_task = None
+
+    async def rebuild(self, batch_size: int = 1000):
+        """Rebuild the filter from a streaming scan of stored emails"""
+        started = time.perf_counter()
+        self._added_during_rebuild = []
+        try:
+            new_filter = await self._build(batch_size)
+            for email in self._added_during_rebuild:
+                new_filter.add(email)
+        finally:
+            self._added_during_rebuild = None
+
+        self.filter = new_filter
+        self.rebuild_seconds = time.perf_counter() - started
+        self.last_rebuild = datetime.utcnow()
+        logger.info(
+            f"Email prefilter rebuilt with {new_filter.count} emails in "
+            f"{self.rebuild_seconds * 1000:.1f}ms ({len(new_filter.bits) / 1024:.1f} KiB)"
+        )
+
+    async def _build(self, batch_size: int) -> BloomFilter:
+        """A filter sized for twice the stored rows, filled from a streaming scan"""
+        async with async_engine.connect() as conn:
+            total = (await conn.execute(
+                select(func.count()).select_from(ContactSubmission)
+            )).scalar() or 0
+
+            capacity = max(settings.EMAIL_FILTER_CAPACITY, total * 2)
+            new_filter = BloomFilter(capacity, settings.EMAIL_FILTER_ERROR_RATE)
+
+            result = await conn.stream(
+                select(ContactSubmission.email).execution_options(yield_per=batch_size)
+            )
+            async for partition in result.partitions(batch_size):
+                for (email,) in partition:
+                    new_filter.add(email)
+        return new_filter
+
+    def stats(self) -> Dict[str, Any]:
+        if self.filter is None:
+            return {'status': 'not_ready'}
+
+        return {
+            'status': 'ready',
+            'emails': self.filter.count,
+            'capacity': self.filter.capacity,
+            'saturated': self.filter.saturated,
+            'size_bytes': len(self.filter.bits),
+            'hash_functions': self.filter.num_hashes,
+            'target_false_positive_rate': self.filter.error_rate,
+            'estimated_false_positive_rate': round(self.filter.estimated_error_rate(), 6),
+            'rebuild_ms': round(self.rebuild_seconds * 1000, 2),
+            'last_rebuild': self.last_rebuild.isoformat() if self.last_rebuild else None,
+            'lookups': self.lookups,
+            'lookups_skipped': self.negatives
+        }
+
+# Global prefilter instance
+email_prefilter = EmailPrefilter()
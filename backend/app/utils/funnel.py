@@ -0,0 +1,191 @@
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import select, func, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.database import dialect_insert
+from app.models.contact import ContactSubmission, ContactFunnelRollup
+
+FORM_STEPS = 5
+
+# Columns a lead's funnel attribution is derived from
+LEAD_ATTRIBUTION_COLUMNS = (
+    ContactSubmission.id,
+    ContactSubmission.form_step,
+    ContactSubmission.created_at,
+    ContactSubmission.utm_source,
+    ContactSubmission.utm_medium,
+    ContactSubmission.utm_campaign
+)
+
+def to_utc_naive(dt: datetime) -> datetime:
+    """Normalize a datetime to naive UTC, the representation stored in rollups"""
+    if dt.tzinfo is not None:
+        dt = dt.astimezone(timezone.utc).replace(tzinfo=None)
+    return dt
+
+def hour_bucket(dt: Optional[datetime]) -> datetime:
+    return to_utc_naive(dt or datetime.utcnow()).replace(minute=0, second=0, microsecond=0)
+
+def hour_bucket_ceil(dt: datetime) -> datetime:
+    """The first bucket starting at or after dt"""
+    bucket = hour_bucket(dt)
+    return bucket if bucket == to_utc_naive(dt) else bucket + timedelta(hours=1)
+
+async def record_funnel_progress(db: AsyncSession, lead: Any, from_step: int, to_step: int):
+    """Count a lead as having reached every step in (from_step, to_step].
+
+    `lead` is anything exposing created_at and the utm_* attributes: a
+    ContactSubmission or a row selected with LEAD_ATTRIBUTION_COLUMNS.
+
+    Leads are bucketed by the hour they were created (their cohort), so
+    conversion over a date range compares like with like. Runs in the
+    caller's transaction and commits together with the step write.
+    """
+    steps = range(max(from_step, 0) + 1, min(to_step, FORM_STEPS) + 1)
+    if not steps:
+        return
+
+    bucket = hour_bucket(lead.created_at)
+    rows = [
+        {
+            "bucket_hour": bucket,
+            "utm_source": lead.utm_source or "",
+            "utm_medium": lead.utm_medium or "",
+            "utm_campaign": lead.utm_campaign or "",
+            "form_step": step,
+            "submissions": 1
+        }
+        for step in steps
+    ]
+
+    stmt = dialect_insert(ContactFunnelRollup).values(rows)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[
+            ContactFunnelRollup.bucket_hour,
+            ContactFunnelRollup.utm_source,
+            ContactFunnelRollup.utm_medium,
+            ContactFunnelRollup.utm_campaign,
+            ContactFunnelRollup.form_step
+        ],
+        set_={"submissions": ContactFunnelRollup.submissions + stmt.excluded.submissions}
+    )
+    await db.execute(stmt)
+
+async def advance_funnel(db: AsyncSession, lead: Any, to_step: int) -> bool:
+    """Raise the lead's form_step to `to_step` and count the steps newly reached.
+
+    form_step never goes down, so a lead that revisits an earlier step and
+    moves forward again is not counted twice. The raise is a compare-and-set
+    on the step just read, retried if another request moved it first, so
+    concurrent step posts cannot both count the same range. Returns whether
+    the step advanced.
+    """
+    stored_step = func.coalesce(ContactSubmission.form_step, 0)
+    while True:
+        current = (await db.execute(
+            select(stored_step).where(ContactSubmission.id == lead.id)
+        )).scalar()
+        if current is None or current >= to_step:
+            return False
+        result = await db.execute(
+            update(ContactSubmission)
+            .where(ContactSubmission.id == lead.id, stored_step == current)
+            .values(form_step=to_step)
+        )
+        if result.rowcount:
+            await record_funnel_progress(db, lead, current, to_step)
+            return True
+
+def _step_breakdown(counts: Dict[int, int]) -> List[Dict[str, Any]]:
+    started = counts.get(1, 0)
+    breakdown = []
+    previous = None
+    for step in range(1, FORM_STEPS + 1):
+        reached = counts.get(step, 0)
+        breakdown.append({
+            "step": step,
+            "submissions": reached,
+            "conversion_from_previous_percent": round(reached / previous * 100, 2) if previous else None,
+            "conversion_from_start_percent": round(reached / started * 100, 2) if started else 0.0
+        })
+        previous = reached
+    return breakdown
+
+async def get_funnel_report(db: AsyncSession, start: Optional[datetime] = None,
+                            end: Optional[datetime] = None, utm_source: Optional[str] = None,
+                            utm_medium: Optional[str] = None, utm_campaign: Optional[str] = None,
+                            group_by_utm: bool = False) -> Dict[str, Any]:
+    """Answer funnel conversion questions from rollup rows only.
+
+    Rollups are hourly, so the range is widened to whole hours: start is
+    rounded down and end up, and a bucket counts if it overlaps the range.
+    The widened bounds are reported as bucket_start and bucket_end.
+    """
+    group_columns = [
+        ContactFunnelRollup.utm_source,
+        ContactFunnelRollup.utm_medium,
+        ContactFunnelRollup.utm_campaign
+    ] if group_by_utm else []
+
+    stmt = select(
+        *group_columns,
+        ContactFunnelRollup.form_step,
+        func.sum(ContactFunnelRollup.submissions).label("submissions")
+    )
+
+    bucket_start = hour_bucket(start) if start else None
+    bucket_end = hour_bucket_ceil(end) if end else None
+    if bucket_start:
+        stmt = stmt.where(ContactFunnelRollup.bucket_hour >= bucket_start)
+    if bucket_end:
+        stmt = stmt.where(ContactFunnelRollup.bucket_hour < bucket_end)
+    if utm_source is not None:
+        stmt = stmt.where(ContactFunnelRollup.utm_source == utm_source)
+    if utm_medium is not None:
+        stmt = stmt.where(ContactFunnelRollup.utm_medium == utm_medium)
+    if utm_campaign is not None:
+        stmt = stmt.where(ContactFunnelRollup.utm_campaign == utm_campaign)
+
+    stmt = stmt.group_by(*group_columns, ContactFunnelRollup.form_step)
+    result = await db.execute(stmt)
+
+    totals: Dict[int, int] = {}
+    segments: Dict[tuple, Dict[int, int]] = {}
+    for row in result:
+        totals[row.form_step] = totals.get(row.form_step, 0) + row.submissions
+        if group_by_utm:
+            key = (row.utm_source, row.utm_medium, row.utm_campaign)
+            segments.setdefault(key, {})[row.form_step] = row.submissions
+
+    started = totals.get(1, 0)
+    report = {
+        "start": start.isoformat() if start else None,
+        "end": end.isoformat() if end else None,
+        "bucket_start": bucket_start.isoformat() if bucket_start else None,
+        "bucket_end": bucket_end.isoformat() if bucket_end else None,
+        "started": started,
+        "completed": totals.get(FORM_STEPS, 0),
+        "overall_conversion_percent": round(totals.get(FORM_STEPS, 0) / started * 100, 2) if started else 0.0,
+        "steps": _step_breakdown(totals)
+    }
+
+    if group_by_utm:
+        report["segments"] = sorted(
+            (
+                {
+                    "utm_source": source or None,
+                    "utm_medium": medium or None,
+                    "utm_campaign": campaign or None,
+                    "started": counts.get(1, 0),
+                    "completed": counts.get(FORM_STEPS, 0),
+                    "steps": _step_breakdown(counts)
+                }
+                for (source, medium, campaign), counts in segments.items()
+            ),
+            key=lambda segment: segment["started"],
+            reverse=True
+        )
+
+    return report
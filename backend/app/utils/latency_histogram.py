@@ -0,0 +1,197 @@
+import math
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+# HDR-style log-linear buckets over integer microseconds: values below
+# SUB_BUCKETS are exact, above that each power of two is split into
+# SUB_BUCKETS / 2 linear steps, bounding the relative error at 1/64.
+SUB_BITS = 7
+SUB_BUCKETS = 1 << SUB_BITS
+HALF_BUCKETS = SUB_BUCKETS >> 1
+MAX_BITS = 27  # ~134s; slower requests land in the last bucket
+BUCKET_COUNT = HALF_BUCKETS * (MAX_BITS - SUB_BITS) + SUB_BUCKETS
+
+# Rotating windows: name -> (slice seconds, slices kept)
+WINDOWS = {
+    "1m": (10, 6),
+    "5m": (60, 5),
+    "1h": (300, 12)
+}
+
+def bucket_index(latency_ms: float) -> int:
+    value = int(latency_ms * 1000)
+    if value < SUB_BUCKETS:
+        return value if value > 0 else 0
+    bits = value.bit_length()
+    if bits > MAX_BITS:
+        return BUCKET_COUNT - 1
+    shift = bits - SUB_BITS
+    return (shift << (SUB_BITS - 1)) + (value >> shift)
+
+def _bucket_values_ms() -> np.ndarray:
+    """Midpoint of each bucket's value range, in milliseconds"""
+    index = np.arange(BUCKET_COUNT, dtype=np.int64)
+    shift = np.maximum(index // HALF_BUCKETS - 1, 0)
+    mantissa = np.where(index < SUB_BUCKETS, index, index - HALF_BUCKETS * shift)
+    lower = mantissa << shift
+    upper = ((mantissa + 1) << shift) - 1
+    return (lower + upper) / 2 / 1000
+
+BUCKET_VALUES_MS = _bucket_values_ms()
+
+class LatencyHistogram:
+    """Fixed-bucket latency histogram; merging is element-wise addition.
+
+    Any percentile is a cumulative sum and a binary search over
+    BUCKET_COUNT buckets, independent of how many requests were recorded.
+    """
+
+    __slots__ = ("counts", "total_ms", "errors")
+
+    def __init__(self, counts: Optional[np.ndarray] = None, total_ms: float = 0.0, errors: int = 0):
+        self.counts = counts if counts is not None else np.zeros(BUCKET_COUNT, dtype=np.int64)
+        self.total_ms = total_ms
+        self.errors = errors
+
+    @property
+    def count(self) -> int:
+        return int(self.counts.sum())
+
+    def merge(self, other: "LatencyHistogram") -> "LatencyHistogram":
+        self.counts += other.counts
+        self.total_ms += other.total_ms
+        self.errors += other.errors
+        return self
+
+    def percentiles(self, quantiles: Iterable[float]) -> List[float]:
+        """Latency in ms at each percentile (0-100); zeros when empty"""
+        quantiles = list(quantiles)
+        cumulative = np.cumsum(self.counts)
+        total = int(cumulative[-1])
+        if not total:
+            return [0.0] * len(quantiles)
+        ranks = [max(1, math.ceil(q / 100 * total)) for q in quantiles]
+        return [float(value) for value in BUCKET_VALUES_MS[np.searchsorted(cumulative, ranks)]]
+
+    def percentile(self, quantile: float) -> float:
+        return self.percentiles([quantile])[0]
+
+    def summary(self) -> Dict[str, Any]:
+        count = self.count
+        p50, p95, p99 = self.percentiles([50, 95, 99])
+        return {
+            'count': count,
+            'errors': self.errors,
+            'error_rate': round(self.errors / count * 100, 2) if count else 0,
+            'avg_ms': round(self.total_ms / count, 2) if count else 0,
+            'p50_ms': round(p50, 2),
+            'p95_ms': round(p95, 2),
+            'p99_ms': round(p99, 2)
+        }
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Sparse form for shipping to another worker or process"""
+        nonzero = np.flatnonzero(self.counts)
+        return {
+            'buckets': dict(zip(nonzero.tolist(), self.counts[nonzero].tolist())),
+            'total_ms': self.total_ms,
+            'errors': self.errors
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "LatencyHistogram":
+        histogram = cls(total_ms=data['total_ms'], errors=data['errors'])
+        for index, count in data['buckets'].items():
+            histogram.counts[int(index)] = count
+        return histogram
+
+class _SliceRing:
+    """Histogram slices of one window, reused in place as time advances"""
+
+    def __init__(self, slice_seconds: int, slices: int):
+        self.slice_seconds = slice_seconds
+        self.slices = slices
+        self.counts = np.zeros((slices, BUCKET_COUNT), dtype=np.uint32)
+        self.total_ms = [0.0] * slices
+        self.errors = [0] * slices
+        self.epochs = [-1] * slices
+        self.epoch = -1
+        self.slot = 0
+
+    def record(self, index: int, latency_ms: float, is_error: bool, now: float):
+        epoch = int(now // self.slice_seconds)
+        if epoch > self.epoch:
+            slot = epoch % self.slices
+            if self.epochs[slot] != epoch:
+                self.counts[slot] = 0
+                self.total_ms[slot] = 0.0
+                self.errors[slot] = 0
+                self.epochs[slot] = epoch
+            self.epoch, self.slot = epoch, slot
+        slot = self.slot
+        self.counts[slot, index] += 1
+        self.total_ms[slot] += latency_ms
+        if is_error:
+            self.errors[slot] += 1
+
+    def histogram(self, now: float) -> LatencyHistogram:
+        epoch = int(now // self.slice_seconds)
+        live = [slot for slot, slot_epoch in enumerate(self.epochs) if epoch - self.slices < slot_epoch <= epoch]
+        if not live:
+            return LatencyHistogram()
+        return LatencyHistogram(
+            self.counts[live].sum(axis=0, dtype=np.int64),
+            sum(self.total_ms[slot] for slot in live),
+            sum(self.errors[slot] for slot in live)
+        )
+
+class RouteLatencyHistograms:
+    """Per-route latency histograms over the rotating WINDOWS.
+
+    Rings are allocated on a route's first request; a window's histogram
+    is the sum of its live slices, so it covers the last slice_seconds *
+    (slices - 1) seconds plus the current partial slice.
+    """
+
+    def __init__(self):
+        self.routes: Dict[int, List[_SliceRing]] = {}
+        # Since process start, for cumulative exports such as Prometheus
+        self.totals: Dict[int, LatencyHistogram] = {}
+        self.status_counts: Dict[Tuple[int, int], int] = {}
+
+    def record(self, route_id: int, latency_ms: float, status_code: int, now: float):
+        rings = self.routes.get(route_id)
+        if rings is None:
+            rings = self.routes[route_id] = [_SliceRing(*spec) for spec in WINDOWS.values()]
+            self.totals[route_id] = LatencyHistogram()
+        index = bucket_index(latency_ms)
+        is_error = status_code >= 400
+        for ring in rings:
+            ring.record(index, latency_ms, is_error, now)
+
+        total = self.totals[route_id]
+        total.counts[index] += 1
+        total.total_ms += latency_ms
+        if is_error:
+            total.errors += 1
+        key = (route_id, status_code)
+        self.status_counts[key] = self.status_counts.get(key, 0) + 1
+
+    def window(self, name: str, now: float) -> Dict[int, LatencyHistogram]:
+        """Histogram per route id over one of WINDOWS"""
+        position = list(WINDOWS).index(name)
+        return {route_id: rings[position].histogram(now) for route_id, rings in self.routes.items()}
+
+def merge_histograms(histograms: Iterable[LatencyHistogram]) -> LatencyHistogram:
+    merged = LatencyHistogram()
+    for histogram in histograms:
+        merged.merge(histogram)
+    return merged
+
+def covering_window(minutes: float) -> str:
+    """Smallest window spanning `minutes`, or the longest one"""
+    for name, (slice_seconds, slices) in WINDOWS.items():
+        if minutes * 60 <= slice_seconds * slices:
+            return name
+    return list(WINDOWS)[-1]
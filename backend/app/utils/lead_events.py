@@ -0,0 +1,260 @@
+import asyncio
+import json
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, Iterable, List, Optional, Set
+
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.models.contact import LeadChangeEvent
+
+# Lead fields pushed to the sales dashboard
+LEAD_EVENT_FIELDS = (
+    "first_name", "last_name", "email", "company", "job_title", "company_size",
+    "industry", "budget_range", "project_timeline", "form_step", "lead_score",
+    "is_qualified", "utm_source", "utm_medium", "utm_campaign"
+)
+
+def lead_snapshot(lead: Any) -> Dict[str, Any]:
+    """Pick the dashboard fields from a ContactSubmission or a dict of column values"""
+    if isinstance(lead, dict):
+        return {field: lead.get(field) for field in LEAD_EVENT_FIELDS}
+    return {field: getattr(lead, field) for field in LEAD_EVENT_FIELDS}
+
+async def record_lead_change(db: AsyncSession, submission_id: int, lead: Any,
+                             event_type: str) -> Dict[str, Any]:
+    """Append a lead change to the changelog in the caller's transaction.
+
+    Returns the event to hand to lead_event_hub.publish once the
+    transaction has committed.
+    """
+    payload = {"id": submission_id, **lead_snapshot(lead)}
+    is_qualified = bool(payload["is_qualified"])
+    lead_score = payload["lead_score"] or 0
+
+    result = await db.execute(
+        insert(LeadChangeEvent).values(
+            submission_id=submission_id,
+            event_type=event_type,
+            is_qualified=is_qualified,
+            lead_score=lead_score,
+            payload=payload
+        ).returning(LeadChangeEvent.id)
+    )
+    return {
+        "id": result.scalar(),
+        "type": event_type,
+        "is_qualified": is_qualified,
+        "lead_score": lead_score,
+        "lead": payload,
+        "timestamp": datetime.utcnow().isoformat()
+    }
+
+class LeadSubscriber:
+    """One SSE connection with its filter and bounded event buffer"""
+
+    def __init__(self, qualified_only: bool, min_score: int, buffer_size: int):
+        self.qualified_only = qualified_only
+        self.min_score = min_score
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=buffer_size)
+        self.overflowed = False
+
+    def matches(self, event: Dict[str, Any]) -> bool:
+        if self.qualified_only and not event["is_qualified"]:
+            return False
+        return event["lead_score"] >= self.min_score
+
+    def reset(self):
+        """Drop buffered events after an overflow; the changelog replay covers them"""
+        while not self.queue.empty():
+            self.queue.get_nowait()
+        self.overflowed = False
+
+class LeadEventHub:
+    """In-process broadcast of committed lead changes to SSE subscribers"""
+
+    def __init__(self):
+        self.subscribers: Set[LeadSubscriber] = set()
+        self.published = 0
+        self.overflows = 0
+
+    def subscribe(self, qualified_only: bool = False, min_score: int = 0) -> LeadSubscriber:
+        subscriber = LeadSubscriber(qualified_only, min_score, settings.LEAD_STREAM_BUFFER_SIZE)
+        self.subscribers.add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber: LeadSubscriber):
+        self.subscribers.discard(subscriber)
+
+    def publish(self, event: Dict[str, Any]):
+        """Fan an event out without ever blocking the writer.
+
+        A subscriber whose buffer is full is flagged instead; its stream
+        resynchronises from the changelog, so slow readers cannot hold
+        memory or delay request handlers.
+        """
+        self.published += 1
+        for subscriber in self.subscribers:
+            if subscriber.overflowed or not subscriber.matches(event):
+                continue
+            try:
+                subscriber.queue.put_nowait(event)
+            except asyncio.QueueFull:
+                subscriber.overflowed = True
+                self.overflows += 1
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "subscribers": len(self.subscribers),
+            "buffered_events": sum(s.queue.qsize() for s in self.subscribers),
+            "published": self.published,
+            "overflows": self.overflows
+        }
+
+class SentEvents:
+    """Ids of changelog events a stream has sent, within `margin` ids of the highest.
+
+    Ids come from a sequence when the row is inserted, but become visible
+    at commit, so a lower id can commit after a higher one was sent.
+    Replays therefore restart `margin` ids back and skip what was already
+    sent, instead of resuming after the highest id.
+    """
+
+    def __init__(self, high: int, margin: int, ids: Iterable[int] = ()):
+        self.high = high
+        self.margin = margin
+        self.ids: Set[int] = set(ids)
+
+    @property
+    def replay_from(self) -> int:
+        return max(0, self.high - self.margin)
+
+    def is_new(self, event_id: int) -> bool:
+        return event_id > self.replay_from and event_id not in self.ids
+
+    def add(self, event_id: int):
+        self.ids.add(event_id)
+        if event_id > self.high:
+            self.high = event_id
+        if len(self.ids) > 2 * self.margin:
+            floor = self.replay_from
+            self.ids = {sent for sent in self.ids if sent > floor}
+
+async def load_lead_changes(after_id: int, qualified_only: bool, min_score: int,
+                            limit: int, exclude: Iterable[int] = ()) -> List[Dict[str, Any]]:
+    """Read changelog entries after an event id, oldest first, skipping `exclude`"""
+    exclude = list(exclude)
+    stmt = select(
+        LeadChangeEvent.id,
+        LeadChangeEvent.event_type,
+        LeadChangeEvent.is_qualified,
+        LeadChangeEvent.lead_score,
+        LeadChangeEvent.payload,
+        LeadChangeEvent.created_at
+    ).where(LeadChangeEvent.id > after_id)
+
+    if exclude:
+        stmt = stmt.where(LeadChangeEvent.id.not_in(exclude))
+    if qualified_only:
+        stmt = stmt.where(LeadChangeEvent.is_qualified == True)
+    if min_score:
+        stmt = stmt.where(LeadChangeEvent.lead_score >= min_score)
+
+    stmt = stmt.order_by(LeadChangeEvent.id).limit(limit)
+
+    async with AsyncSessionLocal() as session:
+        result = await session.execute(stmt)
+        return [
+            {
+                "id": row.id,
+                "type": row.event_type,
+                "is_qualified": row.is_qualified,
+                "lead_score": row.lead_score,
+                "lead": row.payload,
+                "timestamp": row.created_at.isoformat() if row.created_at else None
+            }
+            for row in result
+        ]
+
+async def latest_lead_change_id() -> int:
+    async with AsyncSessionLocal() as session:
+        result = await session.execute(select(LeadChangeEvent.id).order_by(LeadChangeEvent.id.desc()).limit(1))
+        return result.scalar() or 0
+
+async def lead_change_ids(after_id: int, up_to_id: int) -> List[int]:
+    async with AsyncSessionLocal() as session:
+        result = await session.execute(
+            select(LeadChangeEvent.id).where(LeadChangeEvent.id > after_id, LeadChangeEvent.id <= up_to_id)
+        )
+        return list(result.scalars())
+
+def format_sse(event: Dict[str, Any]) -> str:
+    data = json.dumps({key: event[key] for key in ("type", "lead", "timestamp")}, default=str)
+    return f"id: {event['id']}\nevent: lead.{event['type']}\ndata: {data}\n\n"
+
+async def replay_lead_changes(sent: SentEvents, qualified_only: bool,
+                              min_score: int) -> AsyncIterator[Dict[str, Any]]:
+    """Page through changelog events from the lookback window on that were not sent yet"""
+    limit = settings.LEAD_STREAM_REPLAY_LIMIT
+    after_id = sent.replay_from
+    while True:
+        events = await load_lead_changes(after_id, qualified_only, min_score, limit, sent.ids)
+        for event in events:
+            yield event
+        if len(events) < limit:
+            return
+        after_id = events[-1]["id"]
+
+async def stream_lead_events(last_event_id: Optional[int], qualified_only: bool,
+                             min_score: int) -> AsyncIterator[str]:
+    """Server-Sent Events stream: changelog replay, then live pushes.
+
+    Subscribing happens before the replay so nothing committed in between
+    is lost; events are de-duplicated by id (see SentEvents). Each
+    heartbeat also catches up from the changelog, which picks up writes
+    made by other workers and ones that committed out of id order.
+
+    Events up to Last-Event-ID, or up to the latest one for a new stream,
+    count as already sent; one committing late below that id on reconnect
+    is missed.
+    """
+    subscriber = lead_event_hub.subscribe(qualified_only, min_score)
+
+    try:
+        yield "retry: 3000\n\n"
+
+        margin = settings.LEAD_STREAM_REPLAY_MARGIN
+        high = last_event_id if last_event_id is not None else await latest_lead_change_id()
+        sent = SentEvents(high, margin, await lead_change_ids(max(0, high - margin), high))
+        resync = last_event_id is not None
+
+        while True:
+            if resync or subscriber.overflowed:
+                subscriber.reset()
+                async for event in replay_lead_changes(sent, qualified_only, min_score):
+                    if sent.is_new(event["id"]):
+                        yield format_sse(event)
+                        sent.add(event["id"])
+                resync = False
+
+            try:
+                event = await asyncio.wait_for(
+                    subscriber.queue.get(), timeout=settings.LEAD_STREAM_HEARTBEAT_SECONDS
+                )
+            except asyncio.TimeoutError:
+                yield ": keepalive\n\n"
+                resync = True
+                continue
+
+            if not sent.is_new(event["id"]):
+                continue
+            yield format_sse(event)
+            sent.add(event["id"])
+
+    finally:
+        lead_event_hub.unsubscribe(subscriber)
+
+# Global lead event hub instance
+lead_event_hub = LeadEventHub()
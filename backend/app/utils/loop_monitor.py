@@ -0,0 +1,177 @@
+import asyncio
+import os
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from datetime import datetime
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from app.core.config import settings
+from app.utils.latency_histogram import LatencyHistogram, bucket_index
+from app.utils.metrics import MetricsWriter
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Frames under this directory name a blocking call site; library frames below them do not
+APP_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+STACK_LIMIT = 30
+
+# Middleware that wraps every request and would otherwise be blamed for it
+_INSTRUMENTATION_FILES = ("loop_monitor.py", "performance_monitor.py")
+
+def _call_site(stack: List[traceback.FrameSummary]) -> str:
+    """Innermost application frame, or the leaf when the stack has none"""
+    for frame in reversed(stack):
+        if frame.filename.startswith(APP_ROOT) and not frame.filename.endswith(_INSTRUMENTATION_FILES):
+            path = os.path.relpath(frame.filename, os.path.dirname(APP_ROOT))
+            return f"{path}:{frame.lineno} {frame.name}"
+    leaf = stack[-1] if stack else None
+    return f"{os.path.basename(leaf.filename)}:{leaf.lineno} {leaf.name}" if leaf else "<unknown>"
+
+class EventLoopMonitor:
+    """Event-loop scheduling lag and a watchdog for callbacks that block it.
+
+    A task sleeps `interval` seconds and records how late it wakes up; that
+    lag is how long any coroutine would have waited for the loop. A daemon
+    thread watches the task's heartbeat and, when the loop has not come
+    back for `block_threshold_ms`, captures the loop thread's stack from
+    sys._current_frames() while the blocking call is still running. The
+    stall's duration is attributed to that call site once the loop resumes.
+    """
+
+    def __init__(self, interval: float, block_threshold_ms: float, window_seconds: int, block_log_size: int):
+        self.interval = interval
+        self.block_threshold_ms = block_threshold_ms
+        self.window_seconds = window_seconds
+        self.lag = LatencyHistogram()
+        self.recent: Deque[Tuple[float, float]] = deque(maxlen=max(1, int(window_seconds / interval)))
+        self.blocks: Deque[Dict[str, Any]] = deque(maxlen=block_log_size)
+        self.blocks_total = 0
+        self.sites: Dict[str, Dict[str, Any]] = {}
+        self.task: Optional[asyncio.Task] = None
+        self._watchdog: Optional[threading.Thread] = None
+        self._stopped = threading.Event()
+        self._loop_thread_id: Optional[int] = None
+        self._heartbeat = 0.0
+        self._pending: Optional[Tuple[str, List[str]]] = None
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            expected = loop.time() + self.interval
+            self._heartbeat = time.monotonic()
+            await asyncio.sleep(self.interval)
+            lag_ms = max(0.0, (loop.time() - expected) * 1000)
+            self._heartbeat = time.monotonic()
+            self._record(lag_ms)
+
+    def _record(self, lag_ms: float):
+        self.lag.counts[bucket_index(lag_ms)] += 1
+        self.lag.total_ms += lag_ms
+        self.recent.append((time.time(), lag_ms))
+
+        pending, self._pending = self._pending, None
+        if lag_ms < self.block_threshold_ms:
+            return
+        site, stack = pending if pending is not None else ("<not captured>", [])
+        self.blocks_total += 1
+        self.blocks.append({
+            'timestamp': datetime.utcnow().isoformat(),
+            'duration_ms': round(lag_ms, 2),
+            'site': site,
+            'stack': stack
+        })
+        entry = self.sites.get(site)
+        if entry is None:
+            entry = self.sites[site] = {'site': site, 'count': 0, 'total_ms': 0.0, 'max_ms': 0.0}
+        entry['count'] += 1
+        entry['total_ms'] += lag_ms
+        entry['max_ms'] = max(entry['max_ms'], lag_ms)
+        entry['stack'] = stack
+        logger.warning(f"Event loop blocked for {lag_ms:.0f} ms at {site}")
+
+    def _watch(self):
+        # Stall budget: one scheduled sleep plus the threshold
+        budget = self.interval + self.block_threshold_ms / 1000
+        check_every = max(self.block_threshold_ms / 2000, 0.01)
+        captured_for = None
+        while not self._stopped.wait(check_every):
+            heartbeat = self._heartbeat
+            if time.monotonic() - heartbeat < budget or heartbeat == captured_for:
+                continue
+            frame = sys._current_frames().get(self._loop_thread_id)
+            if frame is None:
+                continue
+            stack = traceback.extract_stack(frame, limit=STACK_LIMIT)
+            self._pending = (_call_site(stack), [f"{f.filename}:{f.lineno} {f.name}" for f in stack])
+            captured_for = heartbeat
+
+    def start(self):
+        if self.task is None:
+            self._loop_thread_id = threading.get_ident()
+            self._stopped.clear()
+            self.task = asyncio.create_task(self._run())
+            self._watchdog = threading.Thread(target=self._watch, name="event-loop-watchdog", daemon=True)
+            self._watchdog.start()
+
+    async def stop(self):
+        if self.task is not None:
+            self._stopped.set()
+            self.task.cancel()
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
+            self.task = None
+
+    def lag_summary(self) -> Dict[str, Any]:
+        """Lag percentiles over the recent window, and since start"""
+        since = time.time() - self.window_seconds
+        recent = np.array([lag for timestamp, lag in self.recent if timestamp >= since])
+        p50, p95, p99 = np.percentile(recent, [50, 95, 99]) if len(recent) else (0.0, 0.0, 0.0)
+        return {
+            'window_seconds': self.window_seconds,
+            'samples': len(recent),
+            'p50_ms': round(float(p50), 2),
+            'p95_ms': round(float(p95), 2),
+            'p99_ms': round(float(p99), 2),
+            'max_ms': round(float(recent.max()), 2) if len(recent) else 0.0,
+            'since_start': self.lag.summary()
+        }
+
+    def top_sites(self, limit: int = 10) -> List[Dict[str, Any]]:
+        """Blocking call sites by total time the loop spent stalled in them"""
+        top = sorted(self.sites.values(), key=lambda entry: entry['total_ms'], reverse=True)[:limit]
+        return [{**entry, 'total_ms': round(entry['total_ms'], 2), 'max_ms': round(entry['max_ms'], 2)}
+                for entry in top]
+
+    def recent_blocks(self, seconds: float) -> int:
+        since = datetime.utcfromtimestamp(time.time() - seconds).isoformat()
+        return sum(1 for block in self.blocks if block['timestamp'] >= since)
+
+    def collect_metrics(self, writer: MetricsWriter):
+        writer.family("event_loop_lag_seconds", "histogram", "Event loop scheduling lag")
+        writer.histogram("event_loop_lag_seconds", self.lag)
+        writer.counter("event_loop_blocks_total", "Loop stalls longer than the blocking threshold", self.blocks_total)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'running': self.task is not None,
+            'interval_seconds': self.interval,
+            'block_threshold_ms': self.block_threshold_ms,
+            'blocks': self.blocks_total,
+            'call_sites': len(self.sites)
+        }
+
+# Global event loop monitor instance
+event_loop_monitor = EventLoopMonitor(
+    settings.LOOP_MONITOR_INTERVAL_SECONDS,
+    settings.LOOP_BLOCK_THRESHOLD_MS,
+    settings.LOOP_LAG_WINDOW_SECONDS,
+    settings.LOOP_BLOCK_LOG_SIZE
+)
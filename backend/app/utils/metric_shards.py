@@ -0,0 +1,259 @@
+import mmap
+import os
+import zlib
+from typing import Any, Dict, Iterable, List, Tuple
+
+import numpy as np
+
+from app.utils.latency_histogram import BUCKET_COUNT, WINDOWS, LatencyHistogram, bucket_index
+from app.utils.server_timing import PHASES
+import logging
+
+logger = logging.getLogger(__name__)
+
+SHARD_SUFFIX = ".shard"
+SHARD_MAGIC = 0x314D4B44  # "DKM1"
+SHARD_VERSION = 1
+NAME_BYTES = 128
+STATUS_BASE = 100
+STATUS_CODES = 500  # 100-599
+
+_WINDOW_SPECS = list(WINDOWS.values())
+
+def _layout(routes: int) -> Tuple[Dict[str, Tuple[int, Any, Tuple[int, ...]]], int]:
+    """Offset, dtype and shape of every array in a shard with `routes` slots"""
+    fields = [
+        ("header", np.int64, (4,)),  # magic, version, routes, pid
+        ("route_state", np.int64, (routes,)),  # 1 once the slot's name is written
+        ("names", np.uint8, (routes, NAME_BYTES)),
+        ("counts", np.int64, (routes, BUCKET_COUNT)),
+        ("total_ms", np.float64, (routes,)),
+        ("errors", np.int64, (routes,)),
+        ("status", np.int64, (routes, STATUS_CODES)),
+        ("phases", np.float64, (routes, len(PHASES))),
+    ]
+    for position, (slice_seconds, slices) in enumerate(_WINDOW_SPECS):
+        fields += [
+            (f"w{position}_epochs", np.int64, (routes, slices)),
+            (f"w{position}_counts", np.uint32, (routes, slices, BUCKET_COUNT)),
+            (f"w{position}_total_ms", np.float64, (routes, slices)),
+            (f"w{position}_errors", np.uint32, (routes, slices)),
+        ]
+    layout = {}
+    offset = 0
+    for name, dtype, shape in fields:
+        offset = (offset + 63) // 64 * 64
+        layout[name] = (offset, dtype, shape)
+        offset += int(np.prod(shape)) * np.dtype(dtype).itemsize
+    return layout, offset
+
+def _views(buffer, routes: int) -> Dict[str, np.ndarray]:
+    layout, _ = _layout(routes)
+    return {
+        name: np.ndarray(shape, dtype=dtype, buffer=buffer, offset=offset)
+        for name, (offset, dtype, shape) in layout.items()
+    }
+
+def route_slot(name: str, routes: int) -> int:
+    """Home slot of a route; the same in every worker"""
+    return zlib.crc32(name.encode()) % routes
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+class MetricsShard:
+    """One worker's request metrics in a memory-mapped file.
+
+    The owning worker is the only writer, so recording needs no lock;
+    other workers map the file read-only and merge it with their own. A
+    route's slot is its name's CRC32 modulo the slot count, probing
+    linearly on collision, and readers match slots by the stored name.
+    Files are sparse, so only slots in use take memory (about 150 KB each,
+    mostly the windowed histograms).
+    """
+
+    def __init__(self, directory: str, routes: int):
+        self.path = os.path.join(directory, f"worker-{os.getpid()}{SHARD_SUFFIX}")
+        self.routes = routes
+        _, size = _layout(routes)
+        with open(self.path, "w+b") as f:
+            f.truncate(size)
+            self.buffer = mmap.mmap(f.fileno(), size)
+        arrays = _views(self.buffer, routes)
+        arrays["header"][:] = (SHARD_MAGIC, SHARD_VERSION, routes, os.getpid())
+        self.state, self.names = arrays["route_state"], arrays["names"]
+        self.counts, self.total_ms, self.errors = arrays["counts"], arrays["total_ms"], arrays["errors"]
+        self.status, self.phases = arrays["status"], arrays["phases"]
+        self.window_arrays = [
+            (*spec, *(arrays[f"w{position}_{field}"] for field in ("epochs", "counts", "total_ms", "errors")))
+            for position, spec in enumerate(_WINDOW_SPECS)
+        ]
+        # Local route id -> shard slot, or -1 when the table is full
+        self.slots: Dict[int, int] = {}
+
+    def _slot(self, route_id: int, name: str) -> int:
+        slot = self.slots.get(route_id)
+        if slot is not None:
+            return slot
+        encoded = name.encode()[:NAME_BYTES]
+        state, names = self.state, self.names
+        slot = -1
+        home = route_slot(name, self.routes)
+        for probe in range(self.routes):
+            candidate = (home + probe) % self.routes
+            if not state[candidate]:
+                names[candidate, :len(encoded)] = np.frombuffer(encoded, dtype=np.uint8)
+                state[candidate] = 1  # published after the name, for readers
+                slot = candidate
+                break
+        if slot < 0:
+            logger.warning(f"Metrics shard full ({self.routes} routes); not sharing {name}")
+        self.slots[route_id] = slot
+        return slot
+
+    def record(self, route_id: int, name: str, latency_ms: float, status_code: int,
+               phases: Tuple[float, ...], now: float):
+        slot = self._slot(route_id, name)
+        if slot < 0:
+            return
+        index = bucket_index(latency_ms)
+        is_error = status_code >= 400
+        self.counts[slot, index] += 1
+        self.total_ms[slot] += latency_ms
+        if is_error:
+            self.errors[slot] += 1
+        if STATUS_BASE <= status_code < STATUS_BASE + STATUS_CODES:
+            self.status[slot, status_code - STATUS_BASE] += 1
+        self.phases[slot] += phases
+
+        for slice_seconds, slices, epochs, counts, total_ms, errors in self.window_arrays:
+            epoch = int(now // slice_seconds)
+            position = epoch % slices
+            if epochs[slot, position] != epoch:
+                # Readers skip the slice while it is being cleared
+                epochs[slot, position] = -1
+                counts[slot, position] = 0
+                total_ms[slot, position] = 0.0
+                errors[slot, position] = 0
+                epochs[slot, position] = epoch
+            counts[slot, position, index] += 1
+            total_ms[slot, position] += latency_ms
+            if is_error:
+                errors[slot, position] += 1
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'path': self.path,
+            'routes': self.routes,
+            'routes_used': sum(1 for slot in self.slots.values() if slot >= 0)
+        }
+
+    def close(self, unlink: bool = True):
+        # Views must go before the map can be closed
+        self.state = self.names = self.counts = self.total_ms = self.errors = self.status = self.phases = None
+        self.window_arrays = []
+        self.buffer.close()
+        if unlink:
+            try:
+                os.unlink(self.path)
+            except FileNotFoundError:
+                pass
+
+class RouteMetricsView:
+    """Per-route metrics keyed by "METHOD /template", from one or more workers"""
+
+    def __init__(self, workers: int = 1):
+        self.workers = workers
+        # Since each worker started
+        self.totals: Dict[str, LatencyHistogram] = {}
+        self.status_counts: Dict[Tuple[str, int], int] = {}
+        self.phase_totals: Dict[str, np.ndarray] = {}
+        # Window name -> route -> histogram, for the windows asked for
+        self.windows: Dict[str, Dict[str, LatencyHistogram]] = {}
+
+def _shard_paths(directory: str) -> List[str]:
+    try:
+        return [os.path.join(directory, f) for f in os.listdir(directory) if f.endswith(SHARD_SUFFIX)]
+    except FileNotFoundError:
+        return []
+
+def _read_shard(path: str):
+    """Arrays of a live worker's shard mapped read-only, or None"""
+    try:
+        with open(path, "rb") as f:
+            size = os.fstat(f.fileno()).st_size
+            if size < 32:
+                return None
+            buffer = mmap.mmap(f.fileno(), size, access=mmap.ACCESS_READ)
+    except (FileNotFoundError, ValueError):
+        return None
+    magic, version, routes, pid = np.ndarray((4,), dtype=np.int64, buffer=buffer)
+    if magic != SHARD_MAGIC or version != SHARD_VERSION or size < _layout(int(routes))[1] or not _pid_alive(int(pid)):
+        buffer.close()
+        return None
+    return _views(buffer, int(routes))
+
+def merge_shards(directory: str, now: float, windows: Iterable[str] = ()) -> RouteMetricsView:
+    """Sum every live worker's shard.
+
+    Nothing is locked: a reader may miss an increment being written, and a
+    slice being reset reads as empty, which is within what a scrape can
+    tolerate.
+    """
+    shards = [arrays for arrays in map(_read_shard, _shard_paths(directory)) if arrays is not None]
+    merged = RouteMetricsView(len(shards))
+    windows = list(windows)
+    positions = {name: list(WINDOWS).index(name) for name in windows}
+
+    for arrays in shards:
+        used = np.flatnonzero(arrays["route_state"] == 1)
+        names = [bytes(arrays["names"][slot]).rstrip(b"\0").decode(errors="replace") for slot in used]
+        for slot, name in zip(used, names):
+            histogram = merged.totals.get(name)
+            if histogram is None:
+                histogram = merged.totals[name] = LatencyHistogram()
+                merged.phase_totals[name] = np.zeros(len(PHASES))
+            histogram.merge(LatencyHistogram(
+                arrays["counts"][slot].copy(), float(arrays["total_ms"][slot]), int(arrays["errors"][slot])
+            ))
+            merged.phase_totals[name] += arrays["phases"][slot]
+            status = arrays["status"][slot]
+            for offset in np.flatnonzero(status):
+                key = (name, STATUS_BASE + int(offset))
+                merged.status_counts[key] = merged.status_counts.get(key, 0) + int(status[offset])
+
+        for window, position in positions.items():
+            slice_seconds, slices = _WINDOW_SPECS[position]
+            epoch = int(now // slice_seconds)
+            epochs = arrays[f"w{position}_epochs"][used]
+            live = (epochs > epoch - slices) & (epochs <= epoch)
+            counts = (arrays[f"w{position}_counts"][used] * live[:, :, None]).sum(axis=1, dtype=np.int64)
+            total_ms = (arrays[f"w{position}_total_ms"][used] * live).sum(axis=1)
+            errors = (arrays[f"w{position}_errors"][used] * live).sum(axis=1)
+            histograms = merged.windows.setdefault(window, {})
+            for row, name in enumerate(names):
+                histogram = histograms.get(name)
+                if histogram is None:
+                    histogram = histograms[name] = LatencyHistogram()
+                histogram.merge(LatencyHistogram(counts[row], float(total_ms[row]), int(errors[row])))
+    return merged
+
+def remove_stale_shards(directory: str):
+    """Delete shards left behind by workers that are no longer running"""
+    for path in _shard_paths(directory):
+        try:
+            with open(path, "rb") as f:
+                pid = int(np.frombuffer(f.read(32), dtype=np.int64)[3])
+        except (OSError, IndexError, ValueError):
+            continue
+        if not _pid_alive(pid):
+            try:
+                os.unlink(path)
+            except FileNotFoundError:
+                pass
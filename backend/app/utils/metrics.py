@@ -0,0 +1,101 @@
+import math
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from app.utils.latency_histogram import BUCKET_VALUES_MS, LatencyHistogram
+import logging
+
+logger = logging.getLogger(__name__)
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Prometheus `le` bounds in seconds for latency histograms
+DEFAULT_LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+def _escape(value: Any) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _format_labels(labels: Optional[Dict[str, Any]]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in labels.items()) + "}"
+
+def _format_value(value: float) -> str:
+    if isinstance(value, bool):
+        return "1" if value else "0"
+    if isinstance(value, int):
+        return str(value)
+    if math.isnan(value):
+        return "NaN"
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value))
+
+def _bucket_cutoffs(bounds: Sequence[float]) -> np.ndarray:
+    """Fine-bucket count at or below each `le` bound (bounds in seconds)"""
+    return np.searchsorted(BUCKET_VALUES_MS, np.asarray(bounds) * 1000, side="right")
+
+_DEFAULT_CUTOFFS = _bucket_cutoffs(DEFAULT_LATENCY_BUCKETS)
+_BOUND_LABELS = [repr(bound) for bound in DEFAULT_LATENCY_BUCKETS]
+
+class MetricsWriter:
+    """Accumulates Prometheus text exposition lines, one family at a time"""
+
+    def __init__(self):
+        self.lines: List[str] = []
+
+    def family(self, name: str, metric_type: str, help_text: str):
+        self.lines.append(f"# HELP {name} {help_text}")
+        self.lines.append(f"# TYPE {name} {metric_type}")
+
+    def sample(self, name: str, value: float, labels: Optional[Dict[str, Any]] = None):
+        self.lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+
+    def gauge(self, name: str, help_text: str, value: float, labels: Optional[Dict[str, Any]] = None):
+        self.family(name, "gauge", help_text)
+        self.sample(name, value, labels)
+
+    def counter(self, name: str, help_text: str, value: float, labels: Optional[Dict[str, Any]] = None):
+        self.family(name, "counter", help_text)
+        self.sample(name, value, labels)
+
+    def histogram(self, name: str, histogram: LatencyHistogram, labels: Optional[Dict[str, Any]] = None):
+        """Samples of one latency histogram in seconds; call family() first.
+
+        Fine buckets are assigned to `le` bounds by their midpoint, so a
+        bound can be off by the histogram's 1/64 relative precision.
+        """
+        label_text = _format_labels(labels)
+        bucket_prefix = f"{name}_bucket{{{label_text[1:-1]}," if label_text else f"{name}_bucket{{"
+        cumulative = np.cumsum(histogram.counts)
+        count = int(cumulative[-1])
+        counts = np.where(_DEFAULT_CUTOFFS > 0, cumulative[_DEFAULT_CUTOFFS - 1], 0).tolist()
+        for bound, bucket_count in zip(_BOUND_LABELS, counts):
+            self.lines.append(f'{bucket_prefix}le="{bound}"}} {bucket_count}')
+        self.lines.append(f'{bucket_prefix}le="+Inf"}} {count}')
+        self.lines.append(f"{name}_sum{label_text} {_format_value(histogram.total_ms / 1000)}")
+        self.lines.append(f"{name}_count{label_text} {count}")
+
+_collectors: List[Callable[[MetricsWriter], None]] = []
+
+def register_collector(collector: Callable[[MetricsWriter], None]):
+    """Add a function that writes metric families from in-memory state.
+
+    Collectors run on every scrape, so they must only read counters and
+    snapshots already held in memory, never query the database.
+    """
+    _collectors.append(collector)
+
+def render_metrics() -> bytes:
+    lines = []
+    for collector in _collectors:
+        # Separate writer per collector so a failure never leaves half a family
+        writer = MetricsWriter()
+        try:
+            collector(writer)
+        except Exception as e:
+            logger.error(f"Metrics collector {collector.__qualname__} failed: {e}")
+            continue
+        lines.extend(writer.lines)
+    return ("\n".join(lines) + "\n").encode()
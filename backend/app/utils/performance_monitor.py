@@ -1,66 +1,213 @@
+import os
 import time
-import psutil
 import asyncio
-from typing import Dict, Any, List
+import numpy as np
+from typing import Dict, Any, List, Optional, Tuple
 from datetime import datetime, timedelta
 from sqlalchemy import text
+from app.core.config import settings
 from app.core.database import AsyncSessionLocal
+from app.utils.loop_monitor import event_loop_monitor
+from app.utils.latency_histogram import (
+    BUCKET_VALUES_MS, WINDOWS, RouteLatencyHistograms, covering_window, merge_histograms
+)
+from app.utils.metric_shards import MetricsShard, RouteMetricsView, merge_shards, remove_stale_shards
+from app.utils.metrics import MetricsWriter
+from app.utils.request_profiler import request_profiles
+from app.utils.server_timing import PHASES, RequestTimings, RoutePhaseTotals, current_request_timings, server_timing_header
+from app.utils.query_stats import UNMATCHED_ROUTE, RequestQueries, current_request_queries, query_stats
+from app.utils.system_metrics import system_metrics_sampler
 import logging
 
 logger = logging.getLogger(__name__)
 
+class RequestRingBuffer:
+    """Fixed-size, array-backed log of the most recent requests.
+
+    Slots are preallocated numpy arrays overwritten in place, so recording
+    is O(1) with no per-request allocation, and window queries are
+    vectorized over the filled slots instead of looping over dicts.
+    """
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.timestamps = np.zeros(capacity, dtype=np.float64)  # unix seconds
+        self.latencies = np.zeros(capacity, dtype=np.float32)  # ms
+        self.status_codes = np.zeros(capacity, dtype=np.uint16)
+        self.route_ids = np.zeros(capacity, dtype=np.uint16)
+        self.total = 0
+
+        # (method, route template) <-> dense id stored in route_ids
+        self.routes: Dict[Tuple[str, str], int] = {}
+        self.route_names: List[str] = []
+
+    def route_id(self, method: str, template: str) -> int:
+        key = (method, template)
+        route_id = self.routes.get(key)
+        if route_id is None:
+            route_id = self.routes[key] = len(self.route_names)
+            self.route_names.append(f"{method} {template}")
+        return route_id
+
+    def record(self, route_id: int, latency_ms: float, status_code: int, timestamp: float):
+        slot = self.total % self.capacity
+        self.timestamps[slot] = timestamp
+        self.latencies[slot] = latency_ms
+        self.status_codes[slot] = status_code
+        self.route_ids[slot] = route_id
+        self.total += 1
+
+    def window(self, since: float) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Latencies, status codes and route ids of requests recorded at or after `since`"""
+        filled = min(self.total, self.capacity)
+        mask = self.timestamps[:filled] >= since
+        return self.latencies[:filled][mask], self.status_codes[:filled][mask], self.route_ids[:filled][mask]
+
+class RequestTimingMiddleware:
+    """Pure ASGI middleware recording every HTTP request into a PerformanceMonitor.
+
+    Requests are keyed by method and route template (scope["route"].path,
+    set by the router), so /case-studies/{slug} is one series rather than
+    one per slug. Responses get a Server-Timing header with the phases
+    TimedRoute marked, as of when the response started. When the monitor
+    has a metrics shard open, each request is also written there for the
+    other workers to read.
+    """
+
+    def __init__(self, app, monitor: "PerformanceMonitor"):
+        self.app = app
+        # The shard is opened by a startup hook, after this is built
+        self.monitor = monitor
+        self.requests = monitor.requests
+        self.latency = monitor.latency
+        self.queries = monitor.queries
+        self.profiles = monitor.profiles
+        self.phases = monitor.phases
+        self.server_timing = settings.SERVER_TIMING_ENABLED
+        # Lets the frontend's origins read the header through the Resource Timing API
+        self.timing_allow_origin = (b"timing-allow-origin", ", ".join(settings.CORS_ORIGINS).encode())
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+        phases = None
+
+        async def send_with_status(message):
+            nonlocal status_code, phases
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                if self.server_timing:
+                    phases = timings.phases(queries.total_ms)
+                    header = server_timing_header(phases, queries.count, (time.perf_counter() - started) * 1000)
+                    message = {**message, "headers": [
+                        *message.get("headers", []), (b"server-timing", header), self.timing_allow_origin
+                    ]}
+            await send(message)
+
+        # Statements run while serving the request are attributed to it
+        queries = RequestQueries(scope)
+        token = current_request_queries.set(queries)
+        timings = RequestTimings()
+        timings_token = current_request_timings.set(timings)
+        profiles = self.profiles
+        started = time.perf_counter()
+        try:
+            if profiles.enabled and profiles.requested(scope["headers"]):
+                await profiles.run(self.app, scope, receive, send_with_status, queries)
+            else:
+                await self.app(scope, receive, send_with_status)
+        finally:
+            latency_ms = (time.perf_counter() - started) * 1000
+            current_request_queries.reset(token)
+            current_request_timings.reset(timings_token)
+            now = time.time()
+            route = scope.get("route")
+            requests = self.requests
+            route_id = requests.route_id(scope["method"], route.path if route is not None else UNMATCHED_ROUTE)
+            requests.record(route_id, latency_ms, status_code, now)
+            self.latency.record(route_id, latency_ms, status_code, now)
+            route_name = requests.route_names[route_id]
+            self.queries.finish_request(queries, route_name)
+            if phases is None:
+                phases = timings.phases(queries.total_ms)
+            self.phases.record(route_id, phases)
+            shard = self.monitor.shard
+            if shard is not None:
+                shard.record(route_id, route_name, latency_ms, status_code, phases, now)
+
 class PerformanceMonitor:
     """Advanced performance monitoring and metrics collection"""
     
-    def __init__(self):
+    def __init__(self, request_buffer_size: int = 65536):
         self.metrics_cache = {}
-        self.request_history = []
+        self.requests = RequestRingBuffer(request_buffer_size)
+        self.latency = RouteLatencyHistograms()
+        self.queries = query_stats
+        self.profiles = request_profiles
+        self.phases = RoutePhaseTotals()
+        self.loop = event_loop_monitor
+        self.sampler = system_metrics_sampler
+        # This worker's slice of the server-wide metrics; see open_shard()
+        self.shard: Optional[MetricsShard] = None
+        self.shard_directory: Optional[str] = None
         self.alert_thresholds = {
             'response_time_p95': 500,  # ms
             'error_rate': 5,  # percentage
             'cpu_usage': 80,  # percentage
             'memory_usage': 85,  # percentage
-            'database_connections': 50  # count
+            'database_connections': 50,  # count
+            'memory_growth_mb_per_hour': 200,  # process RSS trend
+            'event_loop_lag_p99': 50  # ms
         }
+        self.trend_window_seconds = 300  # sustained-usage alerts
+        self.growth_window_seconds = 3600
+        self.alert_window = "5m"
+        self.alert_min_requests = 20  # per-endpoint latency alerts need this many samples
     
-    async def collect_system_metrics(self) -> Dict[str, Any]:
-        """Collect comprehensive system performance metrics"""
-        
-        # CPU and Memory metrics
-        cpu_percent = psutil.cpu_percent(interval=1)
-        memory = psutil.virtual_memory()
-        disk = psutil.disk_usage('/')
-        
-        # Network metrics
-        network = psutil.net_io_counters()
-        
-        # Process-specific metrics
-        process = psutil.Process()
-        process_memory = process.memory_info()
-        process_cpu = process.cpu_percent()
-        
-        return {
-            'timestamp': datetime.utcnow().isoformat(),
-            'system': {
-                'cpu_percent': cpu_percent,
-                'memory_percent': memory.percent,
-                'memory_available_gb': memory.available / (1024**3),
-                'disk_percent': (disk.used / disk.total) * 100,
-                'disk_free_gb': disk.free / (1024**3)
-            },
-            'network': {
-                'bytes_sent': network.bytes_sent,
-                'bytes_recv': network.bytes_recv,
-                'packets_sent': network.packets_sent,
-                'packets_recv': network.packets_recv
-            },
-            'process': {
-                'memory_mb': process_memory.rss / (1024**2),
-                'cpu_percent': process_cpu,
-                'threads': process.num_threads(),
-                'open_files': len(process.open_files())
-            }
+    def open_shard(self, directory: str, routes: int):
+        """Share this worker's request metrics through a file in `directory`.
+
+        Called once per worker after it has started, so workers forked from
+        a preloading master each get their own file. From then on the
+        route-level reports and /metrics cover every worker whose shard is
+        in the directory.
+        """
+        os.makedirs(directory, exist_ok=True)
+        remove_stale_shards(directory)
+        self.shard = MetricsShard(directory, routes)
+        self.shard_directory = directory
+        logger.info(f"Sharing request metrics through {self.shard.path}")
+    
+    def close_shard(self):
+        if self.shard is not None:
+            shard, self.shard = self.shard, None
+            shard.close()
+    
+    def route_metrics(self, windows: Tuple[str, ...] = ()) -> RouteMetricsView:
+        """Per-route metrics of the whole server when sharing, else of this worker"""
+        now = time.time()
+        if self.shard is not None:
+            return merge_shards(self.shard_directory, now, windows)
+        names = self.requests.route_names
+        view = RouteMetricsView()
+        view.totals = {names[route_id]: histogram for route_id, histogram in self.latency.totals.items()}
+        view.status_counts = {
+            (names[route_id], status_code): count
+            for (route_id, status_code), count in self.latency.status_counts.items()
         }
+        view.phase_totals = {names[route_id]: totals for route_id, totals in self.phases.totals.items()}
+        for window in windows:
+            view.windows[window] = {
+                names[route_id]: histogram for route_id, histogram in self.latency.window(window, now).items()
+            }
+        return view
+    
+    async def collect_system_metrics(self) -> Dict[str, Any]:
+        """Latest snapshot from the background sampler; never blocks the loop"""
+        return await self.sampler.current()
     
     async def collect_database_metrics(self) -> Dict[str, Any]:
         """Collect database performance metrics"""
@@ -79,12 +226,6 @@ class PerformanceMonitor:
                 
                 # Performance metrics (PostgreSQL specific)
                 if "postgresql" in str(session.bind.url):
-                    slow_queries = await session.execute(text("""
-                        SELECT count(*) as slow_query_count
-                        FROM pg_stat_statements 
-                        WHERE mean_time > 1000
-                    """))
-                    
                     cache_hit_ratio = await session.execute(text("""
                         SELECT round(
                             sum(blks_hit) * 100.0 / (sum(blks_hit) + sum(blks_read)), 2
@@ -92,7 +233,6 @@ class PerformanceMonitor:
                         FROM pg_stat_database
                     """))
                 else:
-                    slow_queries = None
                     cache_hit_ratio = None
                 
                 return {
@@ -105,7 +245,10 @@ class PerformanceMonitor:
                         'roi_calculations': roi_count.scalar()
                     },
                     'performance': {
-                        'slow_queries': slow_queries.scalar() if slow_queries else 0,
+                        # Counted by the engine hooks; pg_stat_statements is not installed
+                        'slow_queries': self.queries.slow_total,
+                        'slow_query_threshold_ms': self.queries.slow_threshold_ms,
+                        'n_plus_one': self.queries.n_plus_one_total,
                         'cache_hit_ratio': cache_hit_ratio.scalar() if cache_hit_ratio else 100.0
                     }
                 }
@@ -121,88 +264,181 @@ class PerformanceMonitor:
     def record_request_metrics(self, endpoint: str, method: str, 
                              response_time: float, status_code: int):
         """Record individual request metrics"""
-        
-        metric = {
-            'timestamp': datetime.utcnow(),
-            'endpoint': endpoint,
-            'method': method,
-            'response_time_ms': response_time * 1000,
-            'status_code': status_code,
-            'is_error': status_code >= 400
-        }
-        
-        self.request_history.append(metric)
-        
-        # Keep only last 1000 requests
-        if len(self.request_history) > 1000:
-            self.request_history = self.request_history[-1000:]
+        now = time.time()
+        route_id = self.requests.route_id(method, endpoint)
+        self.requests.record(route_id, response_time * 1000, status_code, now)
+        self.latency.record(route_id, response_time * 1000, status_code, now)
+        if self.shard is not None:
+            self.shard.record(route_id, self.requests.route_names[route_id], response_time * 1000, status_code,
+                              (0.0,) * len(PHASES), now)
     
     def get_request_analytics(self, minutes: int = 60) -> Dict[str, Any]:
         """Analyze request patterns over specified time window"""
         
-        cutoff_time = datetime.utcnow() - timedelta(minutes=minutes)
-        recent_requests = [
-            req for req in self.request_history 
-            if req['timestamp'] > cutoff_time
-        ]
+        if self.shard is not None:
+            return self._shared_request_analytics(minutes)
+        
+        now = time.time()
+        latencies, status_codes, route_ids = self.requests.window(now - minutes * 60)
+        total_requests = len(latencies)
+        
+        # Percentiles come from the streaming histograms, which see every
+        # request rather than only those still in the ring buffer
+        percentile_window = covering_window(minutes)
+        histograms = self.latency.window(percentile_window, now)
         
-        if not recent_requests:
+        if not total_requests:
             return {
                 'period_minutes': minutes,
+                'percentile_window': percentile_window,
+                'workers': 1,
                 'total_requests': 0,
-                'error_rate': 0,
-                'avg_response_time': 0
+                'requests_per_minute': 0,
+                'error_rate_percent': 0,
+                'response_times': {
+                    'average_ms': 0,
+                    'p95_ms': 0,
+                    'p99_ms': 0,
+                    'min_ms': 0,
+                    'max_ms': 0
+                },
+                'endpoints': {}
             }
         
         # Calculate metrics
-        total_requests = len(recent_requests)
-        error_count = sum(1 for req in recent_requests if req['is_error'])
-        error_rate = (error_count / total_requests) * 100
+        is_error = status_codes >= 400
+        error_rate = is_error.mean() * 100
+        p95, p99 = merge_histograms(histograms.values()).percentiles([95, 99])
+        # Bucket midpoints can overshoot the largest sample by up to 1/64
+        max_ms = float(latencies.max())
+        p95, p99 = min(p95, max_ms), min(p99, max_ms)
         
-        response_times = [req['response_time_ms'] for req in recent_requests]
-        avg_response_time = sum(response_times) / len(response_times)
+        # Endpoint breakdown, one pass per statistic over all routes
+        route_count = len(self.requests.route_names)
+        counts = np.bincount(route_ids, minlength=route_count)
+        errors = np.bincount(route_ids, weights=is_error, minlength=route_count)
+        total_times = np.bincount(route_ids, weights=latencies, minlength=route_count)
         
-        # Percentiles
-        sorted_times = sorted(response_times)
-        p95_index = int(0.95 * len(sorted_times))
-        p99_index = int(0.99 * len(sorted_times))
-        
-        # Endpoint breakdown
         endpoint_stats = {}
-        for req in recent_requests:
-            endpoint = req['endpoint']
-            if endpoint not in endpoint_stats:
-                endpoint_stats[endpoint] = {
-                    'count': 0,
-                    'errors': 0,
-                    'total_time': 0
-                }
-            
-            endpoint_stats[endpoint]['count'] += 1
-            endpoint_stats[endpoint]['total_time'] += req['response_time_ms']
-            if req['is_error']:
-                endpoint_stats[endpoint]['errors'] += 1
+        for route_id in np.flatnonzero(counts):
+            count = int(counts[route_id])
+            route_p50, route_p95, route_p99 = (
+                histograms[route_id].percentiles([50, 95, 99]) if route_id in histograms else (0.0, 0.0, 0.0)
+            )
+            endpoint_stats[self.requests.route_names[route_id]] = {
+                'count': count,
+                'errors': int(errors[route_id]),
+                'total_time': round(float(total_times[route_id]), 2),
+                'avg_response_time': round(float(total_times[route_id]) / count, 2),
+                'error_rate': round(float(errors[route_id]) / count * 100, 2),
+                'p50_ms': round(route_p50, 2),
+                'p95_ms': round(route_p95, 2),
+                'p99_ms': round(route_p99, 2)
+            }
+        
+        return {
+            'period_minutes': minutes,
+            'percentile_window': percentile_window,
+            'workers': 1,
+            'total_requests': total_requests,
+            'requests_per_minute': total_requests / minutes,
+            'error_rate_percent': round(float(error_rate), 2),
+            'response_times': {
+                'average_ms': round(float(latencies.mean()), 2),
+                'p95_ms': round(float(p95), 2),
+                'p99_ms': round(float(p99), 2),
+                'min_ms': round(float(latencies.min()), 2),
+                'max_ms': round(max_ms, 2)
+            },
+            'endpoints': endpoint_stats
+        }
+    
+    def _shared_request_analytics(self, minutes: int) -> Dict[str, Any]:
+        """get_request_analytics over every worker's shard.
+
+        Shards hold histograms rather than individual requests, so counts
+        cover the whole percentile window and averages, minimums and
+        maximums are bucket values, accurate to 1/64.
+        """
+        percentile_window = covering_window(minutes)
+        view = self.route_metrics((percentile_window,))
+        histograms = {
+            name: histogram for name, histogram in view.windows.get(percentile_window, {}).items() if histogram.count
+        }
+        overall = merge_histograms(histograms.values())
+        total_requests = overall.count
+        buckets = np.flatnonzero(overall.counts)
         
-        # Calculate averages for endpoints
-        for endpoint, stats in endpoint_stats.items():
-            stats['avg_response_time'] = stats['total_time'] / stats['count']
-            stats['error_rate'] = (stats['errors'] / stats['count']) * 100
+        endpoint_stats = {}
+        for name, histogram in histograms.items():
+            count = histogram.count
+            route_p50, route_p95, route_p99 = histogram.percentiles([50, 95, 99])
+            endpoint_stats[name] = {
+                'count': count,
+                'errors': histogram.errors,
+                'total_time': round(histogram.total_ms, 2),
+                'avg_response_time': round(histogram.total_ms / count, 2),
+                'error_rate': round(histogram.errors / count * 100, 2),
+                'p50_ms': round(route_p50, 2),
+                'p95_ms': round(route_p95, 2),
+                'p99_ms': round(route_p99, 2)
+            }
         
+        p95, p99 = overall.percentiles([95, 99])
         return {
             'period_minutes': minutes,
+            'percentile_window': percentile_window,
+            'workers': view.workers,
             'total_requests': total_requests,
             'requests_per_minute': total_requests / minutes,
-            'error_rate_percent': round(error_rate, 2),
+            'error_rate_percent': round(overall.errors / total_requests * 100, 2) if total_requests else 0,
             'response_times': {
-                'average_ms': round(avg_response_time, 2),
-                'p95_ms': round(sorted_times[p95_index], 2) if sorted_times else 0,
-                'p99_ms': round(sorted_times[p99_index], 2) if sorted_times else 0,
-                'min_ms': min(response_times),
-                'max_ms': max(response_times)
+                'average_ms': round(overall.total_ms / total_requests, 2) if total_requests else 0,
+                'p95_ms': round(p95, 2),
+                'p99_ms': round(p99, 2),
+                'min_ms': round(float(BUCKET_VALUES_MS[buckets[0]]), 2) if total_requests else 0,
+                'max_ms': round(float(BUCKET_VALUES_MS[buckets[-1]]), 2) if total_requests else 0
             },
             'endpoints': endpoint_stats
         }
     
+    def get_latency_report(self) -> Dict[str, Any]:
+        """Latency percentiles and error rate per route over every rotating window"""
+        view = self.route_metrics(tuple(WINDOWS))
+        report = {}
+        for window in WINDOWS:
+            histograms = view.windows[window]
+            report[window] = {
+                'overall': merge_histograms(histograms.values()).summary(),
+                'endpoints': {
+                    name: histogram.summary() for name, histogram in histograms.items() if histogram.count
+                }
+            }
+        return report
+    
+    def get_phase_report(self) -> Dict[str, Any]:
+        """Average Server-Timing phases per route since start"""
+        view = self.route_metrics()
+        endpoints = {}
+        for name, totals in view.phase_totals.items():
+            requests = view.totals[name].count
+            if requests:
+                endpoints[name] = {
+                    'requests': requests,
+                    **{f"{phase}_ms": round(float(total) / requests, 3) for phase, total in zip(PHASES, totals)}
+                }
+        return {'phases': list(PHASES), 'workers': view.workers, 'endpoints': endpoints}
+    
+    def get_event_loop_report(self, limit: int = 10) -> Dict[str, Any]:
+        """Event-loop lag percentiles and the call sites that blocked it longest"""
+        return {
+            'lag': self.loop.lag_summary(),
+            'block_threshold_ms': self.loop.block_threshold_ms,
+            'blocks': self.loop.blocks_total,
+            'top_blocking_sites': self.loop.top_sites(limit),
+            'recent_blocks': list(self.loop.blocks)[-limit:][::-1]
+        }
+    
     def check_health_alerts(self, system_metrics: Dict, db_metrics: Dict, 
                           request_analytics: Dict) -> List[Dict[str, Any]]:
         """Check if any metrics exceed alert thresholds"""
@@ -230,17 +466,83 @@ class PerformanceMonitor:
                 'message': f"High memory usage: {system_metrics['system']['memory_percent']}%"
             })
         
-        # Request performance alerts
-        if request_analytics['response_times']['p95_ms'] > self.alert_thresholds['response_time_p95']:
+        # Trend alerts from the sampler's history
+        sustained = self.sampler.trends(self.trend_window_seconds)
+        if sustained['samples'] >= 3 and sustained['cpu_percent_avg'] > self.alert_thresholds['cpu_usage']:
+            alerts.append({
+                'type': 'system',
+                'severity': 'critical',
+                'metric': 'sustained_cpu_usage',
+                'current_value': sustained['cpu_percent_avg'],
+                'threshold': self.alert_thresholds['cpu_usage'],
+                'message': f"CPU above {self.alert_thresholds['cpu_usage']}% on average "
+                           f"for {self.trend_window_seconds // 60} minutes: {sustained['cpu_percent_avg']}%"
+            })
+        
+        growth = self.sampler.trends(self.growth_window_seconds)['process_memory_growth_mb_per_hour']
+        if growth > self.alert_thresholds['memory_growth_mb_per_hour']:
+            alerts.append({
+                'type': 'system',
+                'severity': 'warning',
+                'metric': 'memory_growth',
+                'current_value': growth,
+                'threshold': self.alert_thresholds['memory_growth_mb_per_hour'],
+                'message': f"Process memory growing {growth} MB/hour"
+            })
+        
+        # Event loop alerts: lag delays every in-flight request, not just one route
+        lag = self.loop.lag_summary()
+        if lag['p99_ms'] > self.alert_thresholds['event_loop_lag_p99']:
+            alerts.append({
+                'type': 'performance',
+                'severity': 'warning',
+                'metric': 'event_loop_lag_p99',
+                'current_value': lag['p99_ms'],
+                'threshold': self.alert_thresholds['event_loop_lag_p99'],
+                'message': f"Event loop lag P99 over {lag['window_seconds'] // 60} minutes: {lag['p99_ms']}ms"
+            })
+        
+        blocks = self.loop.recent_blocks(self.loop.window_seconds)
+        if blocks:
+            top_site = self.loop.top_sites(1)[0]['site']
+            alerts.append({
+                'type': 'performance',
+                'severity': 'warning',
+                'metric': 'event_loop_blocked',
+                'current_value': blocks,
+                'threshold': 0,
+                'message': f"Event loop blocked {blocks} times in {self.loop.window_seconds // 60} minutes; "
+                           f"top call site {top_site}"
+            })
+        
+        # Request performance alerts, on recent latency rather than the report period
+        histograms = self.route_metrics((self.alert_window,)).windows[self.alert_window]
+        p95 = round(merge_histograms(histograms.values()).percentile(95), 2)
+        if p95 > self.alert_thresholds['response_time_p95']:
             alerts.append({
                 'type': 'performance',
                 'severity': 'warning',
                 'metric': 'response_time_p95',
-                'current_value': request_analytics['response_times']['p95_ms'],
+                'current_value': p95,
                 'threshold': self.alert_thresholds['response_time_p95'],
-                'message': f"High response time P95: {request_analytics['response_times']['p95_ms']}ms"
+                'message': f"High response time P95 over {self.alert_window}: {p95}ms"
             })
         
+        for endpoint, histogram in histograms.items():
+            if histogram.count < self.alert_min_requests:
+                continue
+            route_p95 = round(histogram.percentile(95), 2)
+            if route_p95 > self.alert_thresholds['response_time_p95']:
+                alerts.append({
+                    'type': 'performance',
+                    'severity': 'warning',
+                    'metric': 'endpoint_response_time_p95',
+                    'endpoint': endpoint,
+                    'current_value': route_p95,
+                    'threshold': self.alert_thresholds['response_time_p95'],
+                    'message': f"High response time P95 on {endpoint} over {self.alert_window}: {route_p95}ms"
+                })
+        
         if request_analytics['error_rate_percent'] > self.alert_thresholds['error_rate']:
             alerts.append({
                 'type': 'application',
@@ -280,6 +582,48 @@ class PerformanceMonitor:
             'recommendations': self.generate_recommendations(alerts, system_metrics, request_analytics)
         }
     
+    def collect_metrics(self, writer: MetricsWriter):
+        """Prometheus families for HTTP requests (every worker when sharing) and this process"""
+        view = self.route_metrics()
+        
+        writer.family("http_requests_total", "counter", "HTTP requests by route template and status")
+        for (name, status_code), count in view.status_counts.items():
+            method, route = name.split(" ", 1)
+            writer.sample("http_requests_total", count, {"method": method, "route": route, "status": status_code})
+        
+        writer.family("http_request_duration_seconds", "histogram", "HTTP request latency by route template")
+        for name, histogram in view.totals.items():
+            method, route = name.split(" ", 1)
+            writer.histogram("http_request_duration_seconds", histogram, {"method": method, "route": route})
+        
+        writer.family("http_request_phase_seconds_total", "counter", "Time spent per request phase by route template")
+        for name, totals in view.phase_totals.items():
+            method, route = name.split(" ", 1)
+            for phase, total_ms in zip(PHASES, totals):
+                writer.sample("http_request_phase_seconds_total", float(total_ms) / 1000,
+                              {"method": method, "route": route, "phase": phase})
+        
+        if self.shard is not None:
+            writer.gauge("metrics_shard_workers", "Workers whose metric shards the HTTP families sum", view.workers)
+        
+        self.loop.collect_metrics(writer)
+        
+        # Host and process values come from the sampler's latest snapshot
+        snapshot = self.sampler.latest
+        if snapshot is None:
+            return
+        process = snapshot['process']
+        writer.counter("process_cpu_seconds_total", "User and system CPU time", process['cpu_seconds'])
+        writer.gauge("process_resident_memory_bytes", "Resident memory size", process['rss_bytes'])
+        writer.gauge("process_threads", "OS threads in this process", process['threads'])
+        if process['open_fds'] is not None:
+            writer.gauge("process_open_fds", "Open file descriptors", process['open_fds'])
+        writer.gauge("process_start_time_seconds", "Process start time since the epoch", process['start_time'])
+        writer.gauge("system_cpu_percent", "Host CPU utilisation between samples", snapshot['system']['cpu_percent'])
+        writer.gauge("system_memory_percent", "Host memory in use", snapshot['system']['memory_percent'])
+        writer.gauge("system_metrics_sampled_at_seconds", "When the host/process snapshot was taken",
+                     snapshot['sampled_at'])
+    
     def generate_recommendations(self, alerts: List, system_metrics: Dict, 
                                request_analytics: Dict) -> List[str]:
         """Generate performance optimization recommendations"""
@@ -306,4 +650,4 @@ class PerformanceMonitor:
         return recommendations
 
 # Global performance monitor instance
-performance_monitor = PerformanceMonitor()
\ No newline at end of file
+performance_monitor = PerformanceMonitor(settings.REQUEST_METRICS_BUFFER_SIZE)
\ No newline at end of file
@@ -0,0 +1,279 @@
+import re
+import time
+from collections import deque
+from contextvars import ContextVar
+from datetime import datetime
+from functools import lru_cache
+from typing import Any, Deque, Dict, List, Optional
+
+from sqlalchemy import event
+
+from app.core.config import settings
+from app.core.database import async_engine, engine
+from app.utils.latency_histogram import LatencyHistogram, bucket_index
+from app.utils.metrics import MetricsWriter
+import logging
+
+logger = logging.getLogger(__name__)
+
+OPERATIONS = ("select", "insert", "update", "delete")
+
+# Route template recorded for requests that matched no route (404s, probes)
+UNMATCHED_ROUTE = "<unmatched>"
+
+# Route recorded for statements issued outside any request (startup, flush tasks)
+BACKGROUND_ROUTE = "<background>"
+
+# Fingerprint that absorbs new statements once the table is full
+OTHER_FINGERPRINT = "<other>"
+
+_PLACEHOLDER = re.compile(r"%\(\w+\)s|%s|\$\d+|(?<![:\w]):\w+")
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r"(?<![\w.])-?\d+(?:\.\d+)?\b")
+_PLACEHOLDER_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)")
+_REPEATED_LIST = re.compile(r"\(\?\)(?:\s*,\s*\(\?\))+")
+_WHITESPACE = re.compile(r"\s+")
+
+def statement_operation(statement: str) -> str:
+    keyword = statement.lstrip()[:6].lower()
+    return keyword if keyword in OPERATIONS else "other"
+
+@lru_cache(maxsize=4096)
+def fingerprint(statement: str) -> str:
+    """Statement with literals and placeholders replaced by `?`.
+
+    IN lists and multi-row VALUES collapse to a single `(?)`, so the same
+    query with different arguments or batch sizes shares one fingerprint.
+    Cached on the statement string, which SQLAlchemy's compiled cache reuses.
+    """
+    normalized = _WHITESPACE.sub(" ", statement).strip()
+    normalized = _STRING.sub("?", normalized)
+    normalized = _PLACEHOLDER.sub("?", normalized)
+    normalized = _NUMBER.sub("?", normalized)
+    normalized = _PLACEHOLDER_LIST.sub("(?)", normalized)
+    return _REPEATED_LIST.sub("(?)", normalized)
+
+class RequestQueries:
+    """Statements issued while serving one request, keyed by fingerprint.
+
+    `statements` is only a list for requests being deep-profiled, which
+    keep every statement in order rather than just the counts.
+    """
+
+    __slots__ = ("scope", "count", "total_ms", "fingerprints", "statements")
+
+    def __init__(self, scope):
+        self.scope = scope
+        self.count = 0
+        self.total_ms = 0.0
+        self.fingerprints: Dict[str, int] = {}
+        self.statements: Optional[List[Dict[str, Any]]] = None
+
+    @property
+    def route(self) -> str:
+        # The router sets scope["route"] after middleware starts the request
+        route = self.scope.get("route")
+        return f"{self.scope['method']} {route.path if route is not None else UNMATCHED_ROUTE}"
+
+# Request the current statement belongs to; set by RequestTimingMiddleware
+current_request_queries: ContextVar[Optional[RequestQueries]] = ContextVar("current_request_queries", default=None)
+
+class FingerprintStats:
+    __slots__ = ("count", "total_ms", "max_ms", "rows", "slow", "routes")
+
+    def __init__(self):
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.rows = 0
+        self.slow = 0
+        self.routes: Dict[str, int] = {}
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            'count': self.count,
+            'total_ms': round(self.total_ms, 2),
+            'avg_ms': round(self.total_ms / self.count, 3) if self.count else 0,
+            'max_ms': round(self.max_ms, 2),
+            'rows': self.rows,
+            'slow': self.slow,
+            'routes': dict(sorted(self.routes.items(), key=lambda item: item[1], reverse=True)[:5])
+        }
+
+class RouteQueryStats:
+    __slots__ = ("requests", "queries", "max_queries", "total_ms", "n_plus_one")
+
+    def __init__(self):
+        self.requests = 0
+        self.queries = 0
+        self.max_queries = 0
+        self.total_ms = 0.0
+        self.n_plus_one = 0
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            'requests': self.requests,
+            'queries': self.queries,
+            'avg_queries': round(self.queries / self.requests, 2) if self.requests else 0,
+            'max_queries': self.max_queries,
+            'avg_db_ms': round(self.total_ms / self.requests, 2) if self.requests else 0,
+            'n_plus_one': self.n_plus_one
+        }
+
+class QueryStats:
+    """Statement instrumentation fed by engine cursor events.
+
+    Keeps latency histograms by statement type, totals per normalized SQL
+    fingerprint, per-route query counts, a log of recent slow statements
+    and N+1 detections (one fingerprint repeated within a request). Rows
+    come from cursor.rowcount, which most drivers only report for writes.
+    """
+
+    def __init__(self, slow_threshold_ms: float, slow_log_size: int,
+                 n_plus_one_threshold: int, max_fingerprints: int):
+        self.histograms: Dict[str, LatencyHistogram] = {
+            operation: LatencyHistogram() for operation in OPERATIONS + ("other",)
+        }
+        self.errors = 0
+        self.slow_threshold_ms = slow_threshold_ms
+        self.n_plus_one_threshold = n_plus_one_threshold
+        self.max_fingerprints = max_fingerprints
+        self.fingerprints: Dict[str, FingerprintStats] = {}
+        self.routes: Dict[str, RouteQueryStats] = {}
+        self.slow_queries: Deque[Dict[str, Any]] = deque(maxlen=slow_log_size)
+        self.slow_total = 0
+        self.n_plus_one: Dict[tuple, Dict[str, Any]] = {}
+        self.n_plus_one_total = 0
+
+    def _before_execute(self, conn, cursor, statement, parameters, context, executemany):
+        context._query_started = time.perf_counter()
+
+    def _after_execute(self, conn, cursor, statement, parameters, context, executemany):
+        started = getattr(context, "_query_started", None)
+        if started is None:
+            return
+        latency_ms = (time.perf_counter() - started) * 1000
+        histogram = self.histograms[statement_operation(statement)]
+        histogram.counts[bucket_index(latency_ms)] += 1
+        histogram.total_ms += latency_ms
+
+        key = fingerprint(statement)
+        stats = self.fingerprints.get(key)
+        if stats is None:
+            if len(self.fingerprints) >= self.max_fingerprints:
+                key = OTHER_FINGERPRINT
+                stats = self.fingerprints.get(key)
+            if stats is None:
+                stats = self.fingerprints[key] = FingerprintStats()
+        rows = cursor.rowcount if cursor.rowcount > 0 else 0
+
+        request = current_request_queries.get()
+        if request is not None:
+            request.count += 1
+            request.total_ms += latency_ms
+            request.fingerprints[key] = request.fingerprints.get(key, 0) + 1
+            if request.statements is not None:
+                request.statements.append({'fingerprint': key, 'duration_ms': round(latency_ms, 3), 'rows': rows})
+            route = request.route
+        else:
+            route = BACKGROUND_ROUTE
+
+        stats.count += 1
+        stats.total_ms += latency_ms
+        stats.rows += rows
+        if latency_ms > stats.max_ms:
+            stats.max_ms = latency_ms
+        stats.routes[route] = stats.routes.get(route, 0) + 1
+
+        if latency_ms >= self.slow_threshold_ms:
+            stats.slow += 1
+            self.slow_total += 1
+            self.slow_queries.append({
+                'timestamp': datetime.utcnow().isoformat(),
+                'route': route,
+                'fingerprint': key,
+                'duration_ms': round(latency_ms, 2),
+                'rows': rows
+            })
+            logger.warning(f"Slow query ({latency_ms:.1f} ms, {rows} rows) on {route}: {key}")
+
+    def _handle_error(self, exception_context):
+        self.errors += 1
+
+    def install(self, target_engine):
+        """Listen on a sync Engine (use AsyncEngine.sync_engine for async ones)"""
+        event.listen(target_engine, "before_cursor_execute", self._before_execute)
+        event.listen(target_engine, "after_cursor_execute", self._after_execute)
+        event.listen(target_engine, "handle_error", self._handle_error)
+
+    def finish_request(self, request: RequestQueries, route: str):
+        """Fold one finished request's statements into the per-route counts"""
+        stats = self.routes.get(route)
+        if stats is None:
+            stats = self.routes[route] = RouteQueryStats()
+        stats.requests += 1
+        if not request.count:
+            return
+        stats.queries += request.count
+        stats.total_ms += request.total_ms
+        if request.count > stats.max_queries:
+            stats.max_queries = request.count
+
+        for key, repeats in request.fingerprints.items():
+            if repeats < self.n_plus_one_threshold:
+                continue
+            stats.n_plus_one += 1
+            self.n_plus_one_total += 1
+            detection = self.n_plus_one.get((route, key))
+            if detection is None:
+                detection = self.n_plus_one[(route, key)] = {
+                    'route': route, 'fingerprint': key, 'requests': 0, 'max_repeats': 0
+                }
+                logger.warning(f"Possible N+1: {route} ran {repeats}x {key}")
+            detection['requests'] += 1
+            detection['max_repeats'] = max(detection['max_repeats'], repeats)
+            detection['last_seen'] = datetime.utcnow().isoformat()
+
+    def report(self, limit: int = 20) -> Dict[str, Any]:
+        """Top fingerprints by total time, per-route counts, N+1s and slow queries"""
+        top = sorted(self.fingerprints.items(), key=lambda item: item[1].total_ms, reverse=True)[:limit]
+        routes = sorted(self.routes.items(), key=lambda item: item[1].queries, reverse=True)
+        return {
+            'slow_threshold_ms': self.slow_threshold_ms,
+            'n_plus_one_threshold': self.n_plus_one_threshold,
+            'statements': sum(stats.count for stats in self.fingerprints.values()),
+            'errors': self.errors,
+            'fingerprints': len(self.fingerprints),
+            'top_fingerprints': [{'fingerprint': key, **stats.summary()} for key, stats in top],
+            'routes': {route: stats.summary() for route, stats in routes},
+            'n_plus_one': sorted(self.n_plus_one.values(), key=lambda d: d['requests'], reverse=True)[:limit],
+            'slow_queries': list(self.slow_queries)[-limit:][::-1]
+        }
+
+    def collect_metrics(self, writer: MetricsWriter):
+        writer.family("db_query_duration_seconds", "histogram", "Database statement latency by statement type")
+        for operation, histogram in self.histograms.items():
+            writer.histogram("db_query_duration_seconds", histogram, {"operation": operation})
+        writer.counter("db_query_errors_total", "Database statements that raised", self.errors)
+        writer.counter("db_slow_queries_total", "Statements slower than the slow-query threshold", self.slow_total)
+        writer.counter("db_n_plus_one_total", "Requests repeating one statement past the N+1 threshold",
+                       self.n_plus_one_total)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'errors': self.errors,
+            'fingerprints': len(self.fingerprints),
+            'slow_queries': self.slow_total,
+            'n_plus_one': self.n_plus_one_total,
+            **{operation: histogram.summary() for operation, histogram in self.histograms.items()}
+        }
+
+# Global query stats instance, listening on both engines
+query_stats = QueryStats(
+    settings.SLOW_QUERY_THRESHOLD_MS,
+    settings.SLOW_QUERY_LOG_SIZE,
+    settings.N_PLUS_ONE_THRESHOLD,
+    settings.QUERY_FINGERPRINT_LIMIT
+)
+query_stats.install(engine)
+query_stats.install(async_engine.sync_engine)
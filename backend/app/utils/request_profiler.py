@@ -0,0 +1,178 @@
+import cProfile
+import hmac
+import marshal
+import pstats
+import time
+import tracemalloc
+import uuid
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from app.core.config import settings
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Request header carrying DEBUG_TOKEN that opts one request into deep profiling
+PROFILE_HEADER = b"x-debug-profile"
+PROFILE_ID_HEADER = b"x-profile-id"
+
+def _function_label(function) -> str:
+    filename, line, name = function
+    return f"{filename}:{line}({name})" if line else name
+
+class RequestProfileStore:
+    """Deterministic profiles of individual requests, kept by profile id.
+
+    A request carrying X-Debug-Profile: <DEBUG_TOKEN> runs under cProfile
+    and tracemalloc; the response gets an X-Profile-Id header naming the
+    stored result. Both tools are process-wide, so anything else the event
+    loop runs meanwhile is included, and only one request is profiled at a
+    time. Requests without the header only pay the header scan in
+    requested(), and nothing at all while DEBUG_TOKEN is unset.
+    """
+
+    def __init__(self, max_profiles: int, top_functions: int):
+        self.max_profiles = max_profiles
+        self.top_functions = top_functions
+        self.profiles: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self.running = False
+        self.profiled = 0
+        self.skipped_busy = 0
+
+    @property
+    def enabled(self) -> bool:
+        return bool(settings.DEBUG_TOKEN)
+
+    def requested(self, headers: List) -> bool:
+        for name, value in headers:
+            if name == PROFILE_HEADER:
+                return hmac.compare_digest(value, settings.DEBUG_TOKEN.encode())
+        return False
+
+    async def run(self, app, scope, receive, send, queries):
+        """Serve one request under cProfile and tracemalloc, then store the result"""
+        if self.running:
+            self.skipped_busy += 1
+            await app(scope, receive, send)
+            return
+
+        profile_id = uuid.uuid4().hex[:16]
+        status_code = 500
+
+        async def send_with_profile_id(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                message = {**message, "headers": [*message.get("headers", []), (PROFILE_ID_HEADER, profile_id.encode())]}
+            await send(message)
+
+        self.running = True
+        queries.statements = []
+        started_tracing = not tracemalloc.is_tracing()
+        if started_tracing:
+            tracemalloc.start()
+        tracemalloc.reset_peak()
+        before = tracemalloc.take_snapshot()
+        profiler = cProfile.Profile()
+        started = time.perf_counter()
+        try:
+            profiler.enable()
+            try:
+                await app(scope, receive, send_with_profile_id)
+            finally:
+                profiler.disable()
+                duration_ms = (time.perf_counter() - started) * 1000
+                after = tracemalloc.take_snapshot()
+                peak = tracemalloc.get_traced_memory()[1]
+                if started_tracing:
+                    tracemalloc.stop()
+                try:
+                    self._store(profile_id, scope, status_code, duration_ms, profiler, before, after, peak, queries)
+                except Exception as e:
+                    logger.error(f"Storing request profile {profile_id} failed: {e}")
+        finally:
+            self.running = False
+
+    def _store(self, profile_id, scope, status_code, duration_ms, profiler, before, after, peak, queries):
+        stats = pstats.Stats(profiler)
+        rows = [
+            {
+                'function': _function_label(function),
+                'calls': calls,
+                'primitive_calls': primitive_calls,
+                'tottime_ms': round(tottime * 1000, 3),
+                'cumtime_ms': round(cumtime * 1000, 3)
+            }
+            for function, (primitive_calls, calls, tottime, cumtime, callers) in stats.stats.items()
+        ]
+
+        ignore = (tracemalloc.Filter(False, tracemalloc.__file__), tracemalloc.Filter(False, __file__))
+        differences = after.filter_traces(ignore).compare_to(before.filter_traces(ignore), "lineno")
+        route = scope.get("route")
+
+        self.profiles[profile_id] = {
+            'id': profile_id,
+            'timestamp': datetime.utcnow().isoformat(),
+            'method': scope["method"],
+            'path': scope["path"],
+            'route': route.path if route is not None else None,
+            'status_code': status_code,
+            'duration_ms': round(duration_ms, 2),
+            'cpu': {
+                'function_calls': stats.total_calls,
+                'top_cumulative': sorted(rows, key=lambda row: row['cumtime_ms'], reverse=True)[:self.top_functions],
+                'top_own_time': sorted(rows, key=lambda row: row['tottime_ms'], reverse=True)[:self.top_functions]
+            },
+            'memory': {
+                'allocated_kb': round(sum(diff.size_diff for diff in differences) / 1024, 2),
+                'peak_kb': round(peak / 1024, 2),
+                'top_allocations': [
+                    {
+                        'location': str(diff.traceback),
+                        'size_diff_kb': round(diff.size_diff / 1024, 2),
+                        'count_diff': diff.count_diff
+                    }
+                    for diff in differences[:self.top_functions] if diff.size_diff
+                ]
+            },
+            'queries': {
+                'count': queries.count,
+                'total_ms': round(queries.total_ms, 2),
+                'statements': queries.statements
+            },
+            # marshal of pstats data, the format cProfile's dump_stats writes
+            'pstats': marshal.dumps(stats.stats)
+        }
+        while len(self.profiles) > self.max_profiles:
+            self.profiles.popitem(last=False)
+        self.profiled += 1
+        logger.info(f"Profiled {scope['method']} {scope['path']} as {profile_id} ({duration_ms:.1f} ms)")
+
+    def get(self, profile_id: str) -> Optional[Dict[str, Any]]:
+        profile = self.profiles.get(profile_id)
+        if profile is None:
+            return None
+        return {key: value for key, value in profile.items() if key != 'pstats'}
+
+    def pstats_data(self, profile_id: str) -> Optional[bytes]:
+        profile = self.profiles.get(profile_id)
+        return profile['pstats'] if profile is not None else None
+
+    def list(self) -> List[Dict[str, Any]]:
+        """Stored profiles, newest first, without their details"""
+        keys = ('id', 'timestamp', 'method', 'path', 'route', 'status_code', 'duration_ms')
+        return [{key: profile[key] for key in keys} for profile in reversed(self.profiles.values())]
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'enabled': self.enabled,
+            'stored': len(self.profiles),
+            'max_profiles': self.max_profiles,
+            'profiled': self.profiled,
+            'skipped_busy': self.skipped_busy
+        }
+
+# Global per-request profile store
+request_profiles = RequestProfileStore(settings.REQUEST_PROFILE_STORE_SIZE, settings.REQUEST_PROFILE_TOP_FUNCTIONS)
@@ -0,0 +1,122 @@
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Iterable, Set, Tuple
+
+# A builder returns the serialized body and the tags it depends on
+Builder = Callable[[], Awaitable[Tuple[bytes, Iterable[str]]]]
+
+class ResponseCache:
+    """In-process cache of serialized response bodies with tag invalidation.
+
+    Concurrent misses for the same key share one build (stampede
+    protection); if the building request is cancelled, a waiter takes the
+    build over instead of failing with it. A build that overlaps an invalidation is returned to its
+    callers but not stored, so a stale read can never outlive the write
+    that invalidated it. The TTL bounds staleness from writes made by
+    other worker processes.
+    """
+
+    def __init__(self, max_entries: int = 1000, ttl_seconds: float = 300):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.entries: "OrderedDict[Hashable, Tuple[bytes, float, Set[str]]]" = OrderedDict()
+        self.tag_index: Dict[str, Set[Hashable]] = {}
+        self.in_flight: Dict[Hashable, asyncio.Future] = {}
+        self.generation = 0
+
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.invalidations = 0
+
+    async def get_or_build(self, key: Hashable, builder: Builder) -> bytes:
+        while True:
+            entry = self.entries.get(key)
+            if entry is not None:
+                body, expires_at, _ = entry
+                if expires_at > time.monotonic():
+                    self.hits += 1
+                    self.entries.move_to_end(key)
+                    return body
+                self._evict(key)
+
+            pending = self.in_flight.get(key)
+            if pending is None:
+                return await self._build(key, builder)
+            self.coalesced += 1
+            body = await asyncio.shield(pending)
+            if body is not None:
+                return body
+            # The builder's request was cancelled; the first waiter back rebuilds
+
+    async def _build(self, key: Hashable, builder: Builder) -> bytes:
+        self.misses += 1
+        future = asyncio.get_running_loop().create_future()
+        self.in_flight[key] = future
+        generation = self.generation
+
+        try:
+            body, tags = await builder()
+        except asyncio.CancelledError:
+            # Cancellation (e.g. a client disconnect) belongs to the builder's
+            # caller alone; None tells coalesced waiters to retry
+            future.set_result(None)
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            # Mark retrieved so unobserved failures are not logged as warnings
+            future.exception()
+            raise
+        finally:
+            self.in_flight.pop(key, None)
+
+        if generation == self.generation:
+            self._store(key, body, set(tags))
+        future.set_result(body)
+        return body
+
+    def _store(self, key: Hashable, body: bytes, tags: Set[str]):
+        self._evict(key)
+        self.entries[key] = (body, time.monotonic() + self.ttl_seconds, tags)
+        for tag in tags:
+            self.tag_index.setdefault(tag, set()).add(key)
+
+        while len(self.entries) > self.max_entries:
+            self._evict(next(iter(self.entries)))
+
+    def _evict(self, key: Hashable):
+        entry = self.entries.pop(key, None)
+        if entry is None:
+            return
+        for tag in entry[2]:
+            keys = self.tag_index.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self.tag_index[tag]
+
+    def invalidate_tags(self, tags: Iterable[str]):
+        """Drop every entry depending on any of the tags"""
+        self.generation += 1
+        self.invalidations += 1
+        for tag in list(tags):
+            for key in list(self.tag_index.get(tag, ())):
+                self._evict(key)
+
+    def clear(self):
+        self.generation += 1
+        self.invalidations += 1
+        self.entries.clear()
+        self.tag_index.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses + self.coalesced
+        return {
+            'entries': len(self.entries),
+            'hits': self.hits,
+            'misses': self.misses,
+            'coalesced': self.coalesced,
+            'invalidations': self.invalidations,
+            'hit_ratio': round((self.hits + self.coalesced) / lookups, 4) if lookups else 0.0
+        }
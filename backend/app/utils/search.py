@@ -0,0 +1,146 @@
+import re
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import Float, String, column, text
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncSession
+
+from app.core.config import settings
+from app.models.casestudy import CaseStudy
+from app.schemas.casestudy import CaseStudyListResponse
+import logging
+
+logger = logging.getLogger(__name__)
+
+HIGHLIGHT_START = "<mark>"
+HIGHLIGHT_END = "</mark>"
+
+# Columns returned with each hit, matching CaseStudyListResponse
+_RESULT_COLUMNS = [CaseStudy.__table__.c[name] for name in CaseStudyListResponse.model_fields]
+_SELECT_LIST = ", ".join(f"cs.{c.name}" for c in _RESULT_COLUMNS)
+_TYPED_COLUMNS = (
+    *_RESULT_COLUMNS,
+    column("rank", Float),
+    column("highlighted_title", String),
+    column("snippet", String)
+)
+
+_TOKEN_PATTERN = re.compile(r"\w+", re.UNICODE)
+
+def _is_sqlite() -> bool:
+    return "sqlite" in settings.DATABASE_URL
+
+# SQLite: an external-content FTS5 index over case_studies, kept in sync
+# by triggers so every writer (ORM, scripts, raw SQL) maintains it. The
+# update trigger only fires for indexed columns, not counter flushes.
+_INDEXED_COLUMNS = ("title", "industry", "company_size", "challenge", "solution", "results", "keywords")
+_new_values = ", ".join(f"new.{name}" for name in _INDEXED_COLUMNS)
+_old_values = ", ".join(f"old.{name}" for name in _INDEXED_COLUMNS)
+_column_list = ", ".join(_INDEXED_COLUMNS)
+
+_SQLITE_DDL = [
+    f"""CREATE VIRTUAL TABLE IF NOT EXISTS case_study_search USING fts5(
+        {_column_list}, content='case_studies', content_rowid='id', tokenize='porter unicode61'
+    )""",
+    # Column weights follow _INDEXED_COLUMNS; ORDER BY rank then sorts inside FTS5
+    "INSERT INTO case_study_search(case_study_search, rank) VALUES ('rank', 'bm25(10.0, 4.0, 2.0, 1.0, 1.0, 1.0, 4.0)')",
+    f"""CREATE TRIGGER IF NOT EXISTS case_study_search_ai AFTER INSERT ON case_studies BEGIN
+        INSERT INTO case_study_search(rowid, {_column_list}) VALUES (new.id, {_new_values});
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS case_study_search_ad AFTER DELETE ON case_studies BEGIN
+        INSERT INTO case_study_search(case_study_search, rowid, {_column_list}) VALUES ('delete', old.id, {_old_values});
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS case_study_search_au AFTER UPDATE OF {_column_list} ON case_studies BEGIN
+        INSERT INTO case_study_search(case_study_search, rowid, {_column_list}) VALUES ('delete', old.id, {_old_values});
+        INSERT INTO case_study_search(rowid, {_column_list}) VALUES (new.id, {_new_values});
+    END"""
+]
+
+# Postgres: a weighted, generated tsvector column with a GIN index, so the
+# database maintains it on every write.
+_POSTGRES_DDL = [
+    """ALTER TABLE case_studies ADD COLUMN IF NOT EXISTS search_vector tsvector
+        GENERATED ALWAYS AS (
+            setweight(to_tsvector('english', coalesce(title, '')), 'A') ||
+            setweight(to_tsvector('english', coalesce(industry, '') || ' ' || coalesce(company_size, '')), 'B') ||
+            setweight(to_tsvector('english', coalesce(keywords::text, '')), 'B') ||
+            setweight(to_tsvector('english',
+                coalesce(challenge, '') || ' ' || coalesce(solution, '') || ' ' || coalesce(results, '')), 'C')
+        ) STORED""",
+    "CREATE INDEX IF NOT EXISTS ix_case_studies_search_vector ON case_studies USING GIN (search_vector)"
+]
+
+async def ensure_search_index(conn: AsyncConnection):
+    """Create the full-text index if missing, backfilling existing rows"""
+    if _is_sqlite():
+        exists = (await conn.execute(
+            text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'case_study_search'")
+        )).first() is not None
+        for statement in _SQLITE_DDL:
+            await conn.execute(text(statement))
+        if not exists:
+            await conn.execute(text("INSERT INTO case_study_search(case_study_search) VALUES ('rebuild')"))
+            logger.info("Built case study full-text index")
+    else:
+        for statement in _POSTGRES_DDL:
+            await conn.execute(text(statement))
+
+def _fts5_query(query: str) -> Optional[str]:
+    """Turn free text into a safe FTS5 query: every term must match, the last as a prefix"""
+    tokens = _TOKEN_PATTERN.findall(query)
+    if not tokens:
+        return None
+    terms = [f'"{token}"' for token in tokens]
+    terms[-1] += "*"
+    return " ".join(terms)
+
+# FTS5 ranks lower-is-better; negated so both backends sort higher-is-better
+_SQLITE_SEARCH = text(f"""
+    SELECT {_SELECT_LIST},
+           -case_study_search.rank AS rank,
+           highlight(case_study_search, 0, '{HIGHLIGHT_START}', '{HIGHLIGHT_END}') AS highlighted_title,
+           snippet(case_study_search, -1, '{HIGHLIGHT_START}', '{HIGHLIGHT_END}', '…', 24) AS snippet
+    FROM case_study_search
+    JOIN case_studies cs ON cs.id = case_study_search.rowid
+    WHERE case_study_search MATCH :query AND cs.is_published = 1
+    ORDER BY case_study_search.rank
+    LIMIT :limit OFFSET :skip
+""").columns(*_TYPED_COLUMNS)
+
+# Rank through the GIN index first; headlines are only built for the page
+_POSTGRES_SEARCH = text(f"""
+    WITH q AS (SELECT websearch_to_tsquery('english', :query) AS query),
+    hits AS (
+        SELECT cs.id, ts_rank_cd(cs.search_vector, q.query) AS rank
+        FROM case_studies cs, q
+        WHERE cs.search_vector @@ q.query AND cs.is_published = true
+        ORDER BY rank DESC
+        LIMIT :limit OFFSET :skip
+    )
+    SELECT {_SELECT_LIST},
+           hits.rank AS rank,
+           ts_headline('english', cs.title, q.query,
+               'HighlightAll=true, StartSel={HIGHLIGHT_START}, StopSel={HIGHLIGHT_END}') AS highlighted_title,
+           ts_headline('english', cs.challenge || ' ' || cs.solution || ' ' || cs.results, q.query,
+               'MaxWords=35, MinWords=15, StartSel={HIGHLIGHT_START}, StopSel={HIGHLIGHT_END}') AS snippet
+    FROM hits
+    JOIN case_studies cs ON cs.id = hits.id, q
+    ORDER BY hits.rank DESC
+""").columns(*_TYPED_COLUMNS)
+
+async def search_case_studies(db: AsyncSession, query: str, skip: int = 0,
+                              limit: int = 20) -> List[Dict[str, Any]]:
+    """Ranked full-text search over published case studies"""
+    if _is_sqlite():
+        statement = _SQLITE_SEARCH
+        query = _fts5_query(query)
+        if query is None:
+            return []
+    else:
+        statement = _POSTGRES_SEARCH
+
+    result = await db.execute(statement, {
+        "query": query,
+        "skip": skip,
+        "limit": limit
+    })
+    return [dict(row._mapping) for row in result]
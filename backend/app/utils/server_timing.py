@@ -0,0 +1,135 @@
+import functools
+import inspect
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Dict, List, Optional, Tuple
+
+from fastapi.routing import APIRoute
+
+# Server-Timing phases, in header order
+PHASES = ("validation", "db", "compute", "serialize", "side_effects")
+
+class RequestTimings:
+    """Phase boundaries of one request, marked by TimedRoute.
+
+    validation is request parsing and dependency resolution up to the
+    endpoint call, compute is the endpoint minus the DB statements and
+    side effects it ran, and serialize is response model validation and
+    rendering after it returns.
+    """
+
+    __slots__ = ("handler_started", "endpoint_started", "endpoint_ended", "handler_ended", "side_effects_ms")
+
+    def __init__(self):
+        self.handler_started = None
+        self.endpoint_started = None
+        self.endpoint_ended = None
+        self.handler_ended = None
+        self.side_effects_ms = 0.0
+
+    def phases(self, db_ms: float) -> Tuple[float, float, float, float, float]:
+        """Milliseconds per PHASES entry; zeros for phases the request never reached"""
+        validation = compute = serialize = 0.0
+        if self.handler_started is not None:
+            validation_ended = self.endpoint_started or self.handler_ended or self.handler_started
+            validation = (validation_ended - self.handler_started) * 1000
+        if self.endpoint_started is not None and self.endpoint_ended is not None:
+            compute = max((self.endpoint_ended - self.endpoint_started) * 1000 - db_ms - self.side_effects_ms, 0.0)
+            if self.handler_ended is not None:
+                serialize = (self.handler_ended - self.endpoint_ended) * 1000
+        return validation, db_ms, compute, serialize, self.side_effects_ms
+
+# Timings of the request being served; set by RequestTimingMiddleware
+current_request_timings: ContextVar[Optional[RequestTimings]] = ContextVar("current_request_timings", default=None)
+
+# One format string for the whole header; it is built on every response
+_HEADER_FORMAT = ", ".join(
+    f'{name};dur=%.2f;desc="%d queries"' if name == "db" else f"{name};dur=%.2f" for name in PHASES
+) + ", total;dur=%.2f"
+
+def server_timing_header(phases: Tuple[float, ...], query_count: int, total_ms: float) -> bytes:
+    validation, db, compute, serialize, side_effects = phases
+    return (_HEADER_FORMAT % (validation, db, query_count, compute, serialize, side_effects, total_ms)).encode()
+
+@contextmanager
+def side_effect():
+    """Count the enclosed block (emails, cache invalidation) as side effects"""
+    timings = current_request_timings.get()
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        if timings is not None:
+            timings.side_effects_ms += (time.perf_counter() - started) * 1000
+
+def timed_side_effect(func: Callable) -> Callable:
+    """Decorator form of side_effect() for coroutine functions"""
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        with side_effect():
+            return await func(*args, **kwargs)
+    return wrapper
+
+def _timed_endpoint(endpoint: Callable) -> Callable:
+    # functools.wraps keeps the signature FastAPI reads parameters from
+    if inspect.iscoroutinefunction(endpoint):
+        @functools.wraps(endpoint)
+        async def wrapper(*args, **kwargs):
+            timings = current_request_timings.get()
+            if timings is None:
+                return await endpoint(*args, **kwargs)
+            timings.endpoint_started = time.perf_counter()
+            try:
+                return await endpoint(*args, **kwargs)
+            finally:
+                timings.endpoint_ended = time.perf_counter()
+    else:
+        # Sync endpoints run in the threadpool, which copies the context
+        @functools.wraps(endpoint)
+        def wrapper(*args, **kwargs):
+            timings = current_request_timings.get()
+            if timings is None:
+                return endpoint(*args, **kwargs)
+            timings.endpoint_started = time.perf_counter()
+            try:
+                return endpoint(*args, **kwargs)
+            finally:
+                timings.endpoint_ended = time.perf_counter()
+    return wrapper
+
+class TimedRoute(APIRoute):
+    """APIRoute marking where validation, the endpoint and serialization start and end"""
+
+    def __init__(self, path: str, endpoint: Callable, **kwargs):
+        super().__init__(path, _timed_endpoint(endpoint), **kwargs)
+
+    def get_route_handler(self) -> Callable:
+        handler = super().get_route_handler()
+
+        async def timed_handler(request):
+            timings = current_request_timings.get()
+            if timings is None:
+                return await handler(request)
+            timings.handler_started = time.perf_counter()
+            try:
+                return await handler(request)
+            finally:
+                timings.handler_ended = time.perf_counter()
+        return timed_handler
+
+class RoutePhaseTotals:
+    """Summed phase milliseconds per route id, for /health/phases and /metrics"""
+
+    def __init__(self):
+        self.totals: Dict[int, List[float]] = {}
+        self.requests: Dict[int, int] = {}
+
+    def record(self, route_id: int, phases: Tuple[float, ...]):
+        totals = self.totals.get(route_id)
+        if totals is None:
+            totals = self.totals[route_id] = [0.0] * len(PHASES)
+            self.requests[route_id] = 0
+        for index, duration in enumerate(phases):
+            totals[index] += duration
+        self.requests[route_id] += 1
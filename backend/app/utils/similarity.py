@@ -0,0 +1,221 @@
+import asyncio
+import math
+import re
+import time
+from collections import Counter
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+from scipy import sparse
+from sqlalchemy import delete, func, insert, select
+
+from app.core.config import settings
+from app.core.database import async_engine
+from app.models.casestudy import CaseStudy, CaseStudyNeighbor
+from app.utils.content_events import ContentChanges, register_change_listener
+import logging
+
+logger = logging.getLogger(__name__)
+
+_WORD_PATTERN = re.compile(r"[a-z][a-z0-9]+")
+
+_STOP_WORDS = frozenset("""
+    a an and are as at be been but by can for from had has have how in into is it its more
+    our of on or that the their them they this to was were which while will with within
+    we who would you your also than then there these those not all any each other over
+""".split())
+
+# Tag tokens count as this many occurrences of a text term
+TAG_WEIGHT = 3.0
+
+# Row block size for the similarity product; only one block x n slice is ever dense
+SIMILARITY_BLOCK = 512
+
+def document_terms(challenge: Optional[str], solution: Optional[str],
+                   technologies: Optional[List[str]], process_types: Optional[List[str]]) -> Dict[str, float]:
+    """Term frequencies for one study: words from the narrative plus weighted tag tokens"""
+    terms: Dict[str, float] = Counter(
+        word for word in _WORD_PATTERN.findall(f"{challenge or ''} {solution or ''}".lower())
+        if word not in _STOP_WORDS
+    )
+    for prefix, tags in (("tech", technologies), ("process", process_types)):
+        for tag in tags or ():
+            term = f"{prefix}:{str(tag).strip().lower()}"
+            terms[term] = terms.get(term, 0) + TAG_WEIGHT
+    return terms
+
+def tfidf_matrix(documents: List[Dict[str, float]], max_features: int) -> sparse.csr_matrix:
+    """L2-normalised TF-IDF rows (sublinear tf, smoothed idf) over the most common terms.
+
+    Kept sparse: a study uses a few hundred of the vocabulary's terms, so a
+    dense n x max_features matrix would be almost entirely zeros.
+    """
+    df = Counter(term for doc in documents for term in doc)
+    vocabulary = {term: col for col, (term, _) in enumerate(df.most_common(max_features))}
+
+    rows, cols, values = [], [], []
+    for row, doc in enumerate(documents):
+        for term, count in doc.items():
+            col = vocabulary.get(term)
+            if col is not None:
+                rows.append(row)
+                cols.append(col)
+                values.append(1.0 + math.log(count))
+
+    n = len(documents)
+    doc_freq = np.fromiter((df[term] for term in vocabulary), dtype=np.float32, count=len(vocabulary))
+    idf = (np.log((1 + n) / (1 + doc_freq)) + 1).astype(np.float32)
+
+    cols = np.asarray(cols, dtype=np.int64)
+    values = np.asarray(values, dtype=np.float32) * idf[cols]
+    matrix = sparse.csr_matrix((values, (rows, cols)), shape=(n, len(vocabulary)), dtype=np.float32)
+
+    norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel())
+    norms[norms == 0] = 1
+    return sparse.csr_matrix(sparse.diags(1 / norms).astype(np.float32) @ matrix)
+
+def top_neighbors(matrix: sparse.csr_matrix, k: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Indices and cosine scores of each row's k most similar other rows, best first"""
+    n = matrix.shape[0]
+    k = min(k, n - 1)
+    indices = np.empty((n, max(k, 0)), dtype=np.int64)
+    scores = np.empty((n, max(k, 0)), dtype=np.float32)
+    if k <= 0:
+        return indices, scores
+
+    transposed = matrix.T.tocsr()
+    for start in range(0, n, SIMILARITY_BLOCK):
+        sims = (matrix[start:start + SIMILARITY_BLOCK] @ transposed).toarray()
+        block_rows = np.arange(sims.shape[0])
+        sims[block_rows, start + block_rows] = -np.inf
+
+        top = np.argpartition(-sims, k - 1, axis=1)[:, :k]
+        top_scores = np.take_along_axis(sims, top, axis=1)
+        order = np.argsort(-top_scores, axis=1)
+
+        indices[start:start + sims.shape[0]] = np.take_along_axis(top, order, axis=1)
+        scores[start:start + sims.shape[0]] = np.take_along_axis(top_scores, order, axis=1)
+
+    return indices, scores
+
+def compute_neighbor_rows(studies: List[Any], k: int, max_features: int) -> List[Dict[str, Any]]:
+    """case_study_neighbors rows for the given studies; pure CPU work"""
+    if len(studies) < 2:
+        return []
+
+    matrix = tfidf_matrix(
+        [document_terms(s.challenge, s.solution, s.technologies_used, s.process_types) for s in studies],
+        max_features
+    )
+    indices, scores = top_neighbors(matrix, k)
+    ids = [s.id for s in studies]
+
+    rows = []
+    for row, case_study_id in enumerate(ids):
+        rank = 0
+        for col, score in zip(indices[row], scores[row]):
+            # Studies sharing no terms are not similar, however few there are
+            if score <= 0:
+                break
+            rank += 1
+            rows.append({
+                "case_study_id": case_study_id,
+                "rank": rank,
+                "neighbor_id": ids[col],
+                "score": float(score)
+            })
+    return rows
+
+class SimilarityIndex:
+    """Maintains case_study_neighbors for all published studies.
+
+    IDF weights shift whenever the published set changes, so the whole
+    table is recomputed (off the event loop) and swapped in one
+    transaction. Only commits touching publication or an indexed field
+    trigger it; changes arriving mid-rebuild trigger one more pass.
+    """
+
+    def __init__(self):
+        self.task: Optional[asyncio.Task] = None
+        self.pending = False
+        self.rebuilds = 0
+        self.last_rebuild: Optional[datetime] = None
+        self.last_rebuild_seconds = 0.0
+        self.studies_indexed = 0
+
+    async def rebuild(self):
+        started = time.perf_counter()
+
+        async with async_engine.connect() as conn:
+            result = await conn.execute(
+                select(
+                    CaseStudy.id,
+                    CaseStudy.challenge,
+                    CaseStudy.solution,
+                    CaseStudy.technologies_used,
+                    CaseStudy.process_types
+                ).where(CaseStudy.is_published == True).order_by(CaseStudy.id)
+            )
+            studies = result.all()
+
+        rows = await asyncio.to_thread(
+            compute_neighbor_rows, studies,
+            settings.SIMILAR_CASE_STUDIES_K, settings.SIMILARITY_MAX_FEATURES
+        )
+
+        async with async_engine.begin() as conn:
+            await conn.execute(delete(CaseStudyNeighbor))
+            if rows:
+                await conn.execute(insert(CaseStudyNeighbor), rows)
+
+        self.rebuilds += 1
+        self.studies_indexed = len(studies)
+        self.last_rebuild = datetime.utcnow()
+        self.last_rebuild_seconds = time.perf_counter() - started
+        logger.info(
+            f"Similarity index rebuilt for {len(studies)} case studies "
+            f"in {self.last_rebuild_seconds * 1000:.1f}ms"
+        )
+
+    async def ensure_built(self):
+        """Build on first start, when published studies exist but no neighbors do"""
+        async with async_engine.connect() as conn:
+            stored = (await conn.execute(select(func.count()).select_from(CaseStudyNeighbor))).scalar()
+        if not stored:
+            await self.rebuild()
+
+    async def _run(self):
+        while self.pending:
+            self.pending = False
+            try:
+                await self.rebuild()
+            except Exception as e:
+                logger.error(f"Similarity index rebuild failed: {e}")
+
+    def schedule_rebuild(self, changes: ContentChanges):
+        if not changes.indexed_case_study_ids:
+            return
+        self.pending = True
+        if self.task is not None and not self.task.done():
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # Committed from a synchronous script; picked up by the next rebuild
+            return
+        self.task = loop.create_task(self._run())
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'studies_indexed': self.studies_indexed,
+            'rebuilds': self.rebuilds,
+            'rebuild_pending': self.pending,
+            'last_rebuild': self.last_rebuild.isoformat() if self.last_rebuild else None,
+            'last_rebuild_ms': round(self.last_rebuild_seconds * 1000, 2)
+        }
+
+# Global similarity index instance
+similarity_index = SimilarityIndex()
+
+register_change_listener(similarity_index.schedule_rebuild)
@@ -0,0 +1,156 @@
+import asyncio
+import time
+from collections import deque
+from datetime import datetime
+from typing import Any, Deque, Dict, List, Optional
+
+import numpy as np
+import psutil
+
+from app.core.config import settings
+import logging
+
+logger = logging.getLogger(__name__)
+
+class SystemMetricsSampler:
+    """Samples host and process metrics in the background.
+
+    Collection runs in a worker thread every `interval` seconds (psutil
+    calls read /proc and open_files() walks every descriptor), so readers
+    get the latest snapshot without blocking the event loop. CPU
+    percentages are measured between consecutive samples instead of
+    sleeping for a measurement interval.
+    """
+
+    def __init__(self, interval: float, history_size: int):
+        self.interval = interval
+        self.process = psutil.Process()
+        self.latest: Optional[Dict[str, Any]] = None
+        self.history: Deque[Dict[str, Any]] = deque(maxlen=history_size)
+        self.task: Optional[asyncio.Task] = None
+        self.samples = 0
+        self.failed_samples = 0
+        self.last_sample_seconds = 0.0
+
+    def _sample(self) -> Dict[str, Any]:
+        started = time.perf_counter()
+        memory = psutil.virtual_memory()
+        disk = psutil.disk_usage('/')
+        network = psutil.net_io_counters()
+
+        process = self.process
+        with process.oneshot():
+            process_memory = process.memory_info()
+            cpu_times = process.cpu_times()
+            snapshot_process = {
+                'memory_mb': process_memory.rss / (1024**2),
+                'rss_bytes': process_memory.rss,
+                'cpu_percent': process.cpu_percent(),
+                'cpu_seconds': cpu_times.user + cpu_times.system,
+                'threads': process.num_threads(),
+                'open_files': len(process.open_files()),
+                'open_fds': process.num_fds() if hasattr(process, "num_fds") else None,
+                'start_time': process.create_time()
+            }
+
+        snapshot = {
+            'timestamp': datetime.utcnow().isoformat(),
+            'sampled_at': time.time(),
+            'system': {
+                'cpu_percent': psutil.cpu_percent(interval=None),
+                'memory_percent': memory.percent,
+                'memory_available_gb': memory.available / (1024**3),
+                'disk_percent': (disk.used / disk.total) * 100,
+                'disk_free_gb': disk.free / (1024**3)
+            },
+            'network': {
+                'bytes_sent': network.bytes_sent,
+                'bytes_recv': network.bytes_recv,
+                'packets_sent': network.packets_sent,
+                'packets_recv': network.packets_recv
+            },
+            'process': snapshot_process
+        }
+        self.last_sample_seconds = time.perf_counter() - started
+        return snapshot
+
+    async def sample(self) -> Dict[str, Any]:
+        """Take a sample now, off the event loop, and publish it"""
+        snapshot = await asyncio.to_thread(self._sample)
+        self.latest = snapshot
+        self.history.append(snapshot)
+        self.samples += 1
+        return snapshot
+
+    async def current(self) -> Dict[str, Any]:
+        """Latest snapshot, sampling once if the sampler has not run yet"""
+        if self.latest is None:
+            return await self.sample()
+        return self.latest
+
+    def window(self, seconds: float) -> List[Dict[str, Any]]:
+        since = time.time() - seconds
+        return [snapshot for snapshot in self.history if snapshot['sampled_at'] >= since]
+
+    def trends(self, seconds: float) -> Dict[str, Any]:
+        """Averages and process memory growth over recent history"""
+        snapshots = self.window(seconds)
+        if not snapshots:
+            return {'samples': 0, 'cpu_percent_avg': 0.0, 'memory_percent_avg': 0.0,
+                    'process_memory_growth_mb_per_hour': 0.0}
+
+        sampled_at = np.array([s['sampled_at'] for s in snapshots])
+        rss_mb = np.array([s['process']['memory_mb'] for s in snapshots])
+        growth = 0.0
+        if len(snapshots) >= 3 and sampled_at[-1] - sampled_at[0] >= seconds / 4:
+            # Least-squares slope over a meaningful span, so one spike or a
+            # freshly started worker does not read as a leak
+            growth = float(np.polyfit(sampled_at - sampled_at[0], rss_mb, 1)[0]) * 3600
+
+        return {
+            'samples': len(snapshots),
+            'cpu_percent_avg': round(float(np.mean([s['system']['cpu_percent'] for s in snapshots])), 2),
+            'memory_percent_avg': round(float(np.mean([s['system']['memory_percent'] for s in snapshots])), 2),
+            'process_memory_growth_mb_per_hour': round(growth, 2)
+        }
+
+    async def _run(self):
+        while True:
+            try:
+                await self.sample()
+            except Exception as e:
+                self.failed_samples += 1
+                logger.error(f"System metrics sample failed: {e}")
+            await asyncio.sleep(self.interval)
+
+    def start(self):
+        if self.task is None:
+            # Prime psutil's CPU counters; the first reading covers nothing
+            psutil.cpu_percent(interval=None)
+            self.process.cpu_percent()
+            self.task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self.task is not None:
+            self.task.cancel()
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
+            self.task = None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'interval_seconds': self.interval,
+            'samples': self.samples,
+            'failed_samples': self.failed_samples,
+            'history_size': len(self.history),
+            'last_sample': self.latest['timestamp'] if self.latest else None,
+            'last_sample_ms': round(self.last_sample_seconds * 1000, 2)
+        }
+
+# Global system metrics sampler instance
+system_metrics_sampler = SystemMetricsSampler(
+    settings.SYSTEM_METRICS_INTERVAL_SECONDS,
+    settings.SYSTEM_METRICS_HISTORY_SIZE
+)
@@ -0,0 +1,78 @@
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import delete, event, func, insert, inspect, select
+
+from app.core.database import async_engine
+from app.models.casestudy import CaseStudy, CaseStudyTag
+import logging
+
+logger = logging.getLogger(__name__)
+
+TECHNOLOGY = "technology"
+PROCESS_TYPE = "process_type"
+
+# JSON list attribute on CaseStudy -> tag_type stored in case_study_tags
+TAG_SOURCES = {
+    "technologies_used": TECHNOLOGY,
+    "process_types": PROCESS_TYPE
+}
+
+_TAG_LENGTH = CaseStudyTag.__table__.c.tag.type.length
+_tags = CaseStudyTag.__table__
+
+def tag_rows(case_study_id: int, technologies: Optional[List[Any]],
+             process_types: Optional[List[Any]]) -> List[Dict[str, Any]]:
+    """case_study_tags rows for one study, de-duplicated"""
+    rows = {}
+    for tag_type, values in ((TECHNOLOGY, technologies), (PROCESS_TYPE, process_types)):
+        for value in values or ():
+            tag = str(value).strip()[:_TAG_LENGTH]
+            if tag:
+                rows[(tag_type, tag)] = {"case_study_id": case_study_id, "tag_type": tag_type, "tag": tag}
+    return list(rows.values())
+
+def _write_tags(connection, target: CaseStudy):
+    connection.execute(delete(_tags).where(_tags.c.case_study_id == target.id))
+    rows = tag_rows(target.id, target.technologies_used, target.process_types)
+    if rows:
+        connection.execute(insert(_tags), rows)
+
+# Mapper events run inside the flush, so tags commit atomically with the study
+
+@event.listens_for(CaseStudy, "after_insert")
+def _tags_after_insert(mapper, connection, target):
+    _write_tags(connection, target)
+
+@event.listens_for(CaseStudy, "after_update")
+def _tags_after_update(mapper, connection, target):
+    state = inspect(target)
+    if any(state.attrs[attr].history.has_changes() for attr in TAG_SOURCES):
+        _write_tags(connection, target)
+
+@event.listens_for(CaseStudy, "after_delete")
+def _tags_after_delete(mapper, connection, target):
+    connection.execute(delete(_tags).where(_tags.c.case_study_id == target.id))
+
+async def rebuild_tags():
+    """Repopulate case_study_tags from the JSON columns"""
+    async with async_engine.begin() as conn:
+        result = await conn.execute(
+            select(CaseStudy.id, CaseStudy.technologies_used, CaseStudy.process_types)
+        )
+        rows = [row for study in result for row in tag_rows(*study)]
+
+        await conn.execute(delete(_tags))
+        if rows:
+            await conn.execute(insert(_tags), rows)
+
+    logger.info(f"Rebuilt {len(rows)} case study tags")
+
+async def ensure_tags_built():
+    """Backfill tags for studies written before the tag table existed"""
+    async with async_engine.connect() as conn:
+        stored = (await conn.execute(select(func.count()).select_from(_tags))).scalar()
+        if stored:
+            return
+        studies = (await conn.execute(select(func.count()).select_from(CaseStudy))).scalar()
+    if studies:
+        await rebuild_tags()
@@ -0,0 +1,86 @@
+"""JSON encode/decode cost on /roi/advanced-calculate payloads.
+
+Compares the stdlib encoder (Starlette's JSONResponse and SQLAlchemy's
+default json_serializer/json_deserializer) with app.core.serialization,
+which uses orjson when installed, for:
+
+- rendering the endpoint's response body
+- writing calculation_results to its JSON column
+- reading it back
+
+Usage (from backend/):
+    python -m benchmarks.bench_json [iterations]
+"""
+import json
+import sys
+import timeit
+import warnings
+
+from fastapi.encoders import jsonable_encoder
+from starlette.responses import JSONResponse as StarletteJSONResponse
+
+from app.core.serialization import JSON_BACKEND, JSONResponse, json_dumps_str, json_loads
+from app.schemas.roi import ROICalculationInput
+from app.utils.advanced_roi import AdvancedROICalculator
+
+PROFILES = {
+    "small/retail": {
+        "email": "ops@example.com", "industry": "retail", "company_size": "small",
+        "current_revenue": 2_000_000, "current_costs": 900_000, "process_type": "customer_service",
+        "current_processing_time": 0.5, "volume_processed": 800, "error_rate": 3.0, "labor_costs": 45_000
+    },
+    "enterprise/finance": {
+        "email": "cfo@example.com", "company": "Analytical Engines", "industry": "finance",
+        "company_size": "enterprise", "current_revenue": 250_000_000, "current_costs": 90_000_000,
+        "process_type": "financial_analysis", "current_processing_time": 3.5,
+        "volume_processed": 40_000, "error_rate": 6.5, "labor_costs": 1_200_000
+    },
+}
+
+def advanced_payload(profile: dict):
+    """calculation_results and the response body, as the endpoint builds them"""
+    roi_data = ROICalculationInput.model_validate(profile).model_dump()
+    result = AdvancedROICalculator().calculate_advanced_roi(roi_data)
+    response = jsonable_encoder({
+        "calculation_id": 1,
+        "advanced_metrics": result,
+        "summary": {
+            "recommendation": result["recommendation"]["recommendation"],
+            "confidence_score": result["confidence_score"],
+            "net_savings": result["net_savings"],
+            "risk_score": result["risk_score"]
+        }
+    })
+    return result, response
+
+def measure(fn, iterations: int) -> float:
+    """Best-of-5 microseconds per call"""
+    return min(timeit.repeat(fn, number=iterations, repeat=5)) / iterations * 1e6
+
+def main():
+    warnings.simplefilter("ignore", DeprecationWarning)
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    stdlib_response = StarletteJSONResponse.__new__(StarletteJSONResponse)
+    app_response = JSONResponse.__new__(JSONResponse)
+
+    print(f"backend: {JSON_BACKEND}")
+    print(f"{'payload':<20}{'step':<16}{'bytes':>8}{'stdlib µs':>12}{JSON_BACKEND + ' µs':>12}{'saved':>9}")
+    for name, profile in PROFILES.items():
+        result, response = advanced_payload(profile)
+        stored = json.dumps(result)
+        assert json.loads(app_response.render(response)) == json.loads(stdlib_response.render(response))
+        assert json_loads(json_dumps_str(result)) == json.loads(stored)
+
+        for step, size, before, after in (
+            ("response body", len(app_response.render(response)),
+             lambda: stdlib_response.render(response), lambda: app_response.render(response)),
+            ("column write", len(stored), lambda: json.dumps(result), lambda: json_dumps_str(result)),
+            ("column read", len(stored), lambda: json.loads(stored), lambda: json_loads(stored)),
+        ):
+            before_us = measure(before, iterations)
+            after_us = measure(after, iterations)
+            print(f"{name:<20}{step:<16}{size:>8}{before_us:>12.2f}{after_us:>12.2f}"
+                  f"{(1 - after_us / before_us) * 100:>8.1f}%")
+
+if __name__ == "__main__":
+    main()
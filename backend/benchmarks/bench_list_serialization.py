@@ -0,0 +1,100 @@
+"""Per-page cost of the case study list endpoint.
+
+Compares the previous path (load full CaseStudy entities, convert each with
+from_orm, then FastAPI's jsonable_encoder + json.dumps) with the projected
+path in app/api/v1/endpoints/casestudy.py: select only the list columns as
+row mappings and validate + serialize the page in one TypeAdapter call.
+
+Runs against a throwaway in-memory SQLite database seeded with long-form
+challenge/solution/results text, so the unused columns carry realistic weight.
+
+Usage (from backend/):
+    python -m benchmarks.bench_list_serialization [rows] [page_size]
+"""
+import json
+import sys
+import timeit
+import tracemalloc
+import warnings
+from datetime import datetime, timedelta
+
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import create_engine, insert, select
+from sqlalchemy.orm import Session
+
+from app.core.database import Base, schema_columns
+from app.models.casestudy import CaseStudy
+from app.api.v1.endpoints.casestudy import case_study_list_adapter
+from app.schemas.casestudy import CaseStudyListResponse
+
+LONG_TEXT = "Legacy document pipeline with manual review across regional teams. " * 60
+
+def seed(engine, rows: int):
+    now = datetime.utcnow()
+    with engine.begin() as conn:
+        conn.execute(insert(CaseStudy.__table__), [
+            {
+                "title": f"Invoice automation {i}", "slug": f"invoice-automation-{i}",
+                "client_name": f"Client {i}", "industry": ("finance", "healthcare", "retail")[i % 3],
+                "company_size": "enterprise", "challenge": LONG_TEXT, "solution": LONG_TEXT,
+                "results": LONG_TEXT, "client_testimonial": LONG_TEXT, "implementation_time": 30 + i % 60,
+                "cost_savings": 125000.0 + i, "efficiency_gain": 42.5, "roi_percentage": 310.0,
+                "technologies_used": ["ocr", "llm"], "process_types": ["document_analysis"],
+                "meta_description": "Automated invoice processing", "is_published": True,
+                "is_featured": i % 10 == 0, "view_count": i, "lead_generation_count": 0,
+                "publish_date": now - timedelta(days=i), "created_at": now
+            }
+            for i in range(rows)
+        ])
+
+def ordered(query):
+    return query.where(CaseStudy.is_published == True).order_by(
+        CaseStudy.is_featured.desc(), CaseStudy.publish_date.desc()
+    )
+
+def entity_page(engine, page_size: int) -> bytes:
+    with Session(engine) as session:
+        studies = session.execute(ordered(select(CaseStudy)).limit(page_size)).scalars().all()
+        items = [CaseStudyListResponse.from_orm(study) for study in studies]
+        return json.dumps(jsonable_encoder(items)).encode()
+
+def projected_page(engine, page_size: int, columns) -> bytes:
+    with Session(engine) as session:
+        rows = session.execute(ordered(select(*columns)).limit(page_size)).mappings().all()
+        return case_study_list_adapter.dump_json(case_study_list_adapter.validate_python(rows))
+
+def peak_kib(fn) -> float:
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak / 1024
+
+def measure(fn, iterations: int) -> float:
+    """Best-of-5 milliseconds per call"""
+    return min(timeit.repeat(fn, number=iterations, repeat=5)) / iterations * 1e3
+
+def main():
+    warnings.simplefilter("ignore", DeprecationWarning)
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    page_size = int(sys.argv[2]) if len(sys.argv) > 2 else 100
+
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    seed(engine, rows)
+    columns = schema_columns(CaseStudy, CaseStudyListResponse)
+
+    entity = lambda: entity_page(engine, page_size)
+    projected = lambda: projected_page(engine, page_size, columns)
+    assert json.loads(entity()) == json.loads(projected())
+
+    print(f"{rows} case studies, page of {page_size}")
+    print(f"{'path':<12}{'ms/page':>10}{'peak KiB':>12}")
+    before = (measure(entity, 20), peak_kib(entity))
+    after = (measure(projected, 20), peak_kib(projected))
+    for name, (ms, kib) in (("entity", before), ("projected", after)):
+        print(f"{name:<12}{ms:>10.2f}{kib:>12.1f}")
+    print(f"{'saved':<12}{(1 - after[0] / before[0]) * 100:>9.1f}%{(1 - after[1] / before[1]) * 100:>11.1f}%")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""Overhead of the /debug/profile sampling profiler.
+
+Runs a CPU-bound workload (the advanced ROI calculation) on the main
+thread, with a few idle executor-style threads alongside, first alone and
+then while app.utils.profiler samples every thread at each rate. It
+reports how much work gets done per second and the sampler's own cost per
+tick.
+
+Usage (from backend/):
+    python -m benchmarks.bench_profiler [seconds]
+"""
+import asyncio
+import sys
+import threading
+import time
+import warnings
+
+from app.schemas.roi import ROICalculationInput
+from app.utils.advanced_roi import AdvancedROICalculator
+from app.utils.profiler import SamplingProfiler
+
+PROFILE = {
+    "email": "cfo@example.com", "industry": "finance", "company_size": "enterprise",
+    "current_revenue": 250_000_000, "current_costs": 90_000_000, "process_type": "financial_analysis",
+    "current_processing_time": 3.5, "volume_processed": 40_000, "error_rate": 6.5, "labor_costs": 1_200_000
+}
+
+def throughput(seconds: float) -> float:
+    """Calculations per second on the calling thread"""
+    roi_data = ROICalculationInput.model_validate(PROFILE).model_dump()
+    calculator = AdvancedROICalculator()
+    done = 0
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        calculator.calculate_advanced_roi(roi_data)
+        done += 1
+    return done / seconds
+
+def main():
+    warnings.simplefilter("ignore", DeprecationWarning)
+    seconds = float(sys.argv[1]) if len(sys.argv) > 1 else 3.0
+    stop = threading.Event()
+    idle_threads = [threading.Thread(target=stop.wait, daemon=True) for _ in range(8)]
+    for thread in idle_threads:
+        thread.start()
+
+    baseline = throughput(seconds)
+    print(f"threads: {threading.active_count()}, baseline: {baseline:.0f} calculations/s")
+    print(f"{'hz':>6}{'calc/s':>10}{'slowdown':>10}{'ms/tick':>10}{'ticks':>8}")
+    for hz in (10, 100, 1000):
+        profiler = SamplingProfiler(hz, 60)
+        result = {}
+        sampler = threading.Thread(
+            target=lambda: result.update(asyncio.run(profiler.profile(seconds, hz, include_idle=True)))
+        )
+        sampler.start()
+        profiled = throughput(seconds)
+        sampler.join()
+        print(f"{hz:>6}{profiled:>10.0f}{(1 - profiled / baseline) * 100:>9.1f}%"
+              f"{result['sampling_ms_per_tick']:>10.3f}{result['samples']:>8}")
+    stop.set()
+
+if __name__ == "__main__":
+    main()